@@ -7,6 +7,7 @@ from alembic import context
 from app.core.config import settings
 from app.db.base import Base
 from app.db.models.category import Category
+from app.db.models.category_closure import CategoryClosure
 from app.db.models.comment import Comment
 from app.db.models.course import Course
 from app.db.models.rating import Rating
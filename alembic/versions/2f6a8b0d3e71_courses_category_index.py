@@ -0,0 +1,27 @@
+"""Index courses by category for counts and keyset listings
+
+Revision ID: 2f6a8b0d3e71
+Revises: 9d4c7a2e6f18
+Create Date: 2026-10-19 13:02:55.417690
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6a8b0d3e71'
+down_revision: Union[str, None] = '9d4c7a2e6f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_courses_category_id_id', 'courses', ['category_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_courses_category_id_id', table_name='courses')
@@ -0,0 +1,31 @@
+"""Pattern-ops index for username prefix filters
+
+Revision ID: 3c5d7f9b1e20
+Revises: 7e1b3c9d5a42
+Create Date: 2026-10-19 16:02:44.518207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5d7f9b1e20'
+down_revision: Union[str, None] = '7e1b3c9d5a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only Postgres needs it: under a non-C collation the plain btree cannot serve LIKE 'p%'
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_users_username_pattern', 'users', ['username'], unique=False,
+                        postgresql_ops={'username': 'varchar_pattern_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_users_username_pattern', table_name='users')
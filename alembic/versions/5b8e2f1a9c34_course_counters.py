@@ -0,0 +1,40 @@
+"""Denormalized comment and rating counters on courses
+
+Revision ID: 5b8e2f1a9c34
+Revises: c21c50855d70
+Create Date: 2026-10-19 09:12:41.305117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f1a9c34'
+down_revision: Union[str, None] = 'c21c50855d70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('courses', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('courses', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('courses', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE courses SET
+            comment_count = (SELECT count(*) FROM comments WHERE comments.course_id = courses.id),
+            rating_count = (SELECT count(*) FROM ratings WHERE ratings.course_id = courses.id),
+            rating_sum = (SELECT coalesce(sum(value), 0) FROM ratings WHERE ratings.course_id = courses.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('courses', 'rating_sum')
+    op.drop_column('courses', 'rating_count')
+    op.drop_column('courses', 'comment_count')
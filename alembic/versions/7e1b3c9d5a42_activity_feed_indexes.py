@@ -0,0 +1,35 @@
+"""Rating timestamps and per-user activity indexes
+
+Revision ID: 7e1b3c9d5a42
+Revises: 2f6a8b0d3e71
+Create Date: 2026-10-19 14:26:18.062931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1b3c9d5a42'
+down_revision: Union[str, None] = '2f6a8b0d3e71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing ratings have no recorded time; they are stamped with the migration time
+    op.add_column('ratings', sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+    op.create_index('ix_ratings_user_id_created_at', 'ratings', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_comments_user_id_created_at', 'comments', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_courses_creator_id_created_at', 'courses', ['creator_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_courses_creator_id_created_at', table_name='courses')
+    op.drop_index('ix_comments_user_id_created_at', table_name='comments')
+    op.drop_index('ix_ratings_user_id_created_at', table_name='ratings')
+    op.drop_column('ratings', 'created_at')
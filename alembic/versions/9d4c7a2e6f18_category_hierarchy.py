@@ -0,0 +1,54 @@
+"""Category hierarchy with a closure table
+
+Revision ID: 9d4c7a2e6f18
+Revises: 5b8e2f1a9c34
+Create Date: 2026-10-19 11:40:03.918274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4c7a2e6f18'
+down_revision: Union[str, None] = '5b8e2f1a9c34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('categories', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'categories_parent_id_fkey', 'categories', 'categories', ['parent_id'], ['id'],
+        ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_categories_parent_id'), 'categories', ['parent_id'], unique=False)
+    op.create_table('category_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index(
+        op.f('ix_category_closure_descendant_id'), 'category_closure', ['descendant_id'],
+        unique=False
+    )
+    # Existing categories are all roots: each is only its own ancestor
+    op.execute(
+        "INSERT INTO category_closure (ancestor_id, descendant_id, depth) "
+        "SELECT id, id, 0 FROM categories"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_category_closure_descendant_id'), table_name='category_closure')
+    op.drop_table('category_closure')
+    op.drop_index(op.f('ix_categories_parent_id'), table_name='categories')
+    op.drop_constraint('categories_parent_id_fkey', 'categories', type_='foreignkey')
+    op.drop_column('categories', 'parent_id')
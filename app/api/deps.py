@@ -5,6 +5,8 @@ from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.timing import timed
+from app.core.tracing import tracer
 from app.db.models.user import User
 from app.db.session import SessionLocal
 
@@ -13,11 +15,14 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 def get_db():
     """Get a database session for dependency injection."""
+    # Not the current span: it stays open across the yield, while the request runs
+    span = tracer.start_span("get_db")
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        span.end()
 
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
@@ -27,17 +32,20 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
-        username: str = payload.get("sub")
-        if username is None:
+    with tracer.start_as_current_span("get_current_user", set_status_on_exception=False) as span:
+        try:
+            with timed("auth"):
+                payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
+            username: str = payload.get("sub")
+            if username is None:
+                raise credentials_exception
+        except JWTError as exc:
+            raise credentials_exception from exc
+        span.set_attribute("enduser.id", username)
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
             raise credentials_exception
-    except JWTError as exc:
-        raise credentials_exception from exc
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        return user
 
 
 def require_admin(current_user: User = Depends(get_current_user)) -> User:
@@ -0,0 +1,16 @@
+"""Response classes for fast JSON serialization."""
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Used by the list endpoints' fast paths, which return plain dicts or slotted
+    dataclass rows and skip ORM object construction and response-model
+    validation. orjson encodes dataclasses, datetimes and enums natively, in the
+    same format the response models produce."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
@@ -0,0 +1,63 @@
+"""Admin-only operational routes."""
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import require_admin
+from app.api.responses import ORJSONResponse
+from app.core.profiling import profile_store
+from app.core.singleflight import flight_stats
+from app.core.slow_queries import slow_query_log
+from app.core.tracing import MemoryExporter, exporter
+from app.schemas.admin import CoalescingStats, ProfileSummary, SlowQueryStats, TraceSpan
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/coalescing", response_model=List[CoalescingStats])
+def coalescing_stats():
+    """Report, per route, how many reads ran and how many shared an in-flight one."""
+    return flight_stats()
+
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+def list_profiles():
+    """List this worker's stored request profiles, newest first."""
+    return [profile.summary() for profile in profile_store.list()]
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, format: Literal["folded", "speedscope"] = "folded"):
+    """Return a profile as folded stacks (flamegraph.pl, inferno) or speedscope JSON."""
+    # pylint: disable=redefined-builtin
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "speedscope":
+        return ORJSONResponse(profile.speedscope())
+    return PlainTextResponse(profile.folded())
+
+
+@router.get("/slow-queries", response_model=List[SlowQueryStats])
+def slow_queries(limit: int = Query(50, ge=1)):
+    """List this worker's slowest statement fingerprints by total time, with their plans."""
+    return slow_query_log.top(limit)
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    """Forget this worker's recorded slow queries, e.g. after shipping an index."""
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared."}
+
+
+@router.get("/traces/{trace_id}", response_model=List[TraceSpan])
+def get_trace(trace_id: str):
+    """Return the spans this worker recorded for a trace, in the order they ended.
+
+    Only the memory exporter keeps spans to serve; the file exporter's are in its file."""
+    spans = exporter.spans(trace_id.lower()) if isinstance(exporter, MemoryExporter) else []
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return spans
@@ -1,22 +1,154 @@
 """Categories API Routes"""
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Integer, any_, bindparam, delete, insert, or_, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session, aliased
 
 from app.api.deps import get_current_user, get_db
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.snapshots import category_counts_query, category_snapshot
 from app.db.models.category import Category
-from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryOut
+from app.db.models.category_closure import CategoryClosure, category_subtree
+from app.schemas.category import (
+    CategoryCoursesOut, CategoryCreate, CategoryOut, CategoryTree, CategoryUpdate
+)
+from app.schemas.course import CourseBrief
 from app.db.models.course import Course
 
 router = APIRouter()
 
 
+def _attach_subtree(db: Session, category_id: int, parent_id):
+    """Link every node of category_id's subtree under parent_id and all of its ancestors."""
+    if parent_id is None:
+        return
+    above = aliased(CategoryClosure)
+    below = aliased(CategoryClosure)
+    db.execute(
+        insert(CategoryClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            # Every ancestor of the parent pairs with every node of the subtree
+            select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+            .select_from(above)
+            .join(below, true())
+            .where(above.descendant_id == parent_id, below.ancestor_id == category_id),
+        )
+    )
+
+
+def _detach_subtree(db: Session, category_id: int):
+    """Drop the closure rows linking category_id's subtree to its former ancestors."""
+    subtree = category_subtree(category_id)
+    db.execute(
+        delete(CategoryClosure)
+        .where(CategoryClosure.descendant_id.in_(subtree))
+        .where(CategoryClosure.ancestor_id.not_in(subtree))
+    )
+
+
+def _check_parent(db: Session, parent_id, category_id=None):
+    """Validate a new parent, rejecting missing parents and moves into the own subtree."""
+    if parent_id is None:
+        return
+    if not db.query(Category.id).filter(Category.id == parent_id).first():
+        raise HTTPException(status_code=404, detail="Parent category not found")
+    if category_id is not None and db.scalar(
+        category_subtree(category_id).where(CategoryClosure.descendant_id == parent_id)
+    ) is not None:
+        raise HTTPException(
+            status_code=400, detail="A category cannot be moved under itself or its descendants."
+        )
+
+
+def _id_in(db: Session, column, ids):
+    """Match column against ids as `= ANY(:ids)` on Postgres and an IN list elsewhere."""
+    if db.get_bind().dialect.name == "postgresql":
+        return column == any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
+    return column.in_(list(ids))
+
+
+def _set_courses_category(db: Session, course_ids, category_id, only_from=None):
+    """Point the given courses at category_id in one UPDATE and return the ids it touched."""
+    statement = update(Course).where(_id_in(db, Course.id, course_ids))
+    if only_from is not None:
+        statement = statement.where(Course.category_id == only_from)
+    statement = statement\
+        .values(category_id=category_id)\
+        .returning(Course.id)\
+        .execution_options(synchronize_session=False)
+    return set(db.scalars(statement))
+
+
+def _assign_courses(db: Session, course_ids, category_id):
+    """Assign courses to a category, raising 404 if any of them do not exist."""
+    wanted = set(course_ids)
+    missing = wanted - _set_courses_category(db, wanted, category_id)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Courses not found: {sorted(missing)}")
+    return wanted
+
+
+def _invalidate_categories(moved_course_ids=()):
+    """Invalidate cached category reads and those of courses that changed category.
+
+    Category writes are rare and can shift course counts, parents and subtrees
+    across many categories, so every category entry goes."""
+    tags = ["categories"]
+    if moved_course_ids:
+        tags.append("courses")
+        tags.extend(f"course:{course_id}" for course_id in moved_course_ids)
+    invalidation_bus.publish(*tags)
+
+
+def _course_briefs(db: Session, category_id: int, limit: int, after_id: Optional[int] = None,
+                   include_subcategories: bool = False):
+    """Load up to limit course briefs of a category in id order, starting after after_id."""
+    if include_subcategories:
+        in_category = Course.category_id.in_(category_subtree(category_id))
+    else:
+        in_category = Course.category_id == category_id
+    statement = select(Course.id, Course.title).where(in_category)
+    if after_id is not None:
+        statement = statement.where(Course.id > after_id)
+    rows = db.execute(statement.order_by(Course.id).limit(limit))
+    return [CourseBrief(id=row.id, title=row.title) for row in rows]
+
+
+def _category_out(db: Session, category_id: int, include_courses: bool, courses_limit: int):
+    """Build a category response with its course count and, optionally, capped briefs."""
+    row = db.execute(category_counts_query().where(Category.id == category_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    category = CategoryOut(**row._mapping)
+    if include_courses:
+        category.courses = _course_briefs(db, category_id, courses_limit)
+    return category
+
+
+def _include_courses_query():
+    """Query parameter opting in to embedded course briefs."""
+    return Query(False, description="Embed the first courses of the category")
+
+
+def _courses_limit_query():
+    """Query parameter capping the number of embedded course briefs."""
+    return Query(
+        20, ge=1, le=settings.max_embedded_courses,
+        description="Maximum number of embedded courses per category",
+    )
+
+
 @router.post("/", response_model=CategoryOut)
 def create_category(
     category: CategoryCreate,
     db: Session = Depends(get_db),
-    _=Depends(get_current_user)
+    _=Depends(get_current_user),
+    include_courses: bool = _include_courses_query(),
+    courses_limit: int = _courses_limit_query(),
 ):
     """Create a new category, optionally assigning courses to it.
 
@@ -27,53 +159,114 @@ Args:
     category (CategoryCreate): The category data to create.
     db (Session): The database session dependency.
     _ (Any): The current authenticated user dependency.
+    include_courses (bool): Whether to embed the category's first course briefs.
+    courses_limit (int): Maximum number of embedded course briefs.
 
 Returns:
     CategoryOut: The newly created category.
 
 Raises:
-    HTTPException: If a category with the same name already exists (status code 400)."""
+    HTTPException: If a category with the same name already exists (status code 400),
+        or if any of the given course IDs do not exist (status code 404)."""
     existing = db.query(Category).filter(Category.name == category.name).first()
     if existing:
         raise HTTPException(status_code=400, detail="Category with this name already exists.")
-    db_category = Category(name=category.name, description=category.description)
+    _check_parent(db, category.parent_id)
+    db_category = Category(
+        name=category.name, description=category.description, parent_id=category.parent_id
+    )
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    db.flush()
+    db.execute(insert(CategoryClosure).values(
+        ancestor_id=db_category.id, descendant_id=db_category.id, depth=0
+    ))
+    _attach_subtree(db, db_category.id, category.parent_id)
 
     # Assign courses if provided
+    moved = set()
     if category.course_ids:
-        courses = db.query(Course).filter(Course.id.in_(category.course_ids)).all()
-        found_ids = {c.id for c in courses}
-        missing = set(category.course_ids) - found_ids
-        if missing:
-            raise HTTPException(status_code=404, detail=f"Courses not found: {sorted(missing)}")
-        for c in courses:
-            c.category_id = db_category.id
-        db.commit()
-        db.refresh(db_category)
+        moved = _assign_courses(db, category.course_ids, db_category.id)
 
-    return db_category
+    category_id = db_category.id
+    db.commit()
+    _invalidate_categories(moved)
+    return _category_out(db, category_id, include_courses, courses_limit)
 
 
 @router.get("/", response_model=List[CategoryOut])
-def list_categories(db: Session = Depends(get_db)):
-    """List all categories."""
+def list_categories(
+    db: Session = Depends(get_db),
+    include_courses: bool = _include_courses_query(),
+    courses_limit: int = _courses_limit_query(),
+):
+    """List all categories from the in-memory snapshot, cached as encoded JSON."""
 
-    return db.query(Category).all()
+    return response_cache.respond(
+        f"categories:list:{include_courses}:{courses_limit}",
+        lambda: category_snapshot.get(
+            db, include_courses=include_courses, courses_limit=courses_limit
+        ),
+        tags=lambda categories: {"categories"} | {
+            f"category:{category['id']}" for category in categories
+        },
+    )
+
+
+@router.get("/tree", response_model=List[CategoryTree])
+def category_tree(db: Session = Depends(get_db)):
+    """Return the whole category hierarchy, loaded with a single query."""
+    rows = db.execute(
+        select(Category.id, Category.name, Category.description, Category.parent_id)
+        .order_by(Category.name)
+    ).all()
+    nodes = {row.id: CategoryTree(**row._mapping) for row in rows}
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node.parent_id)
+        (parent.children if parent else roots).append(node)
+    return roots
 
 
 @router.get("/{category_id}", response_model=CategoryOut)
-def get_category(category_id: int, db: Session = Depends(get_db)):
-    """Get a category by ID."""
-
-    category = db\
-        .query(Category)\
-        .options(joinedload(Category.courses))\
-        .filter(Category.id == category_id).first()
-    if not category:
+def get_category(
+    category_id: int,
+    db: Session = Depends(get_db),
+    include_courses: bool = _include_courses_query(),
+    courses_limit: int = _courses_limit_query(),
+):
+    """Get a category by ID with its course count."""
+
+    return response_cache.respond(
+        f"category:{category_id}:{include_courses}:{courses_limit}",
+        lambda: _category_out(db, category_id, include_courses, courses_limit).model_dump(
+            mode="json"
+        ),
+        tags=("categories", f"category:{category_id}"),
+    )
+
+
+@router.get("/{category_id}/courses", response_model=CategoryCoursesOut)
+def list_category_courses(
+    category_id: int,
+    db: Session = Depends(get_db),
+    after_id: Optional[int] = Query(
+        None, description="Cursor: return courses with an ID above this"
+    ),
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    include_subcategories: bool = Query(
+        False, description="Also list courses of all descendant categories"
+    ),
+):
+    """List a category's courses in ID order using keyset pagination.
+
+    Only courses assigned directly to the category are listed unless
+    include_subcategories is set, which matches the subtree filter of
+    GET /courses/?category_id=."""
+    if not db.query(Category.id).filter(Category.id == category_id).first():
         raise HTTPException(status_code=404, detail="Category not found")
-    return category
+    items = _course_briefs(db, category_id, limit + 1, after_id, include_subcategories)
+    next_cursor = items[limit - 1].id if len(items) > limit else None
+    return {"items": items[:limit], "next_cursor": next_cursor}
 
 
 @router.put("/{category_id}", response_model=CategoryOut)
@@ -81,9 +274,11 @@ def update_category(
     category_id: int,
     category: CategoryUpdate,
     db: Session = Depends(get_db),
-    _=Depends(get_current_user)
+    _=Depends(get_current_user),
+    include_courses: bool = _include_courses_query(),
+    courses_limit: int = _courses_limit_query(),
 ):
-    """Update a category's name/description, and add/remove courses."""
+    """Update a category's name/description/parent, and add/remove courses."""
     # Check if the category exists
     db_category = db.query(Category).filter(Category.id == category_id).first()
     if not db_category:
@@ -104,34 +299,28 @@ def update_category(
     if category.description is not None:
         db_category.description = category.description
 
+    # Move the category, with its whole subtree, under a new parent
+    if "parent_id" in category.model_fields_set and category.parent_id != db_category.parent_id:
+        _check_parent(db, category.parent_id, category_id)
+        _detach_subtree(db, category_id)
+        _attach_subtree(db, category_id, category.parent_id)
+        db_category.parent_id = category.parent_id
+
     # Add courses to this category
+    moved = set()
     if category.add_course_ids:
-        courses = db.query(Course).filter(Course.id.in_(category.add_course_ids)).all()
-        found_ids = {c.id for c in courses}
-        missing = set(category.add_course_ids) - found_ids
-        if missing:
-            raise HTTPException(status_code=404, detail=f"Courses not found: {sorted(missing)}")
-        for c in courses:
-            c.category_id = db_category.id
+        moved |= _assign_courses(db, category.add_course_ids, db_category.id)
 
     # Remove courses from this category (sets category_id to None)
     if category.remove_course_ids:
-        courses = (
-            db.query(Course)
-            .filter(Course.id.in_(category.remove_course_ids), Course.category_id == db_category.id)
-            .all()
+        moved |= _set_courses_category(
+            db, category.remove_course_ids, None, only_from=db_category.id
         )
-        for c in courses:
-            c.category_id = None
+
+    category_id = db_category.id
     db.commit()
-    db.refresh(db_category)
-    # Return with courses included
-    return (
-        db.query(Category)
-        .options(joinedload(Category.courses))
-        .filter(Category.id == category_id)
-        .first()
-    )
+    _invalidate_categories(moved)
+    return _category_out(db, category_id, include_courses, courses_limit)
 
 
 @router.delete("/{category_id}")
@@ -140,11 +329,34 @@ def delete_category(
     db: Session = Depends(get_db),
     _=Depends(get_current_user)
 ):
-    """Delete a category by ID."""
+    """Delete a category by ID; its subcategories move up to its parent."""
 
     db_category = db.query(Category).filter(Category.id == category_id).first()
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
+    # Its courses are uncategorized by the foreign key's ON DELETE SET NULL
+    uncategorized = set(db.scalars(select(Course.id).where(Course.category_id == category_id)))
+    # Paths from the category's ancestors into its subtree lose one level
+    ancestors = select(CategoryClosure.ancestor_id).where(
+        CategoryClosure.descendant_id == category_id, CategoryClosure.depth > 0
+    )
+    db.execute(
+        update(CategoryClosure)
+        .where(CategoryClosure.descendant_id.in_(category_subtree(category_id)))
+        .where(CategoryClosure.ancestor_id.in_(ancestors))
+        .values(depth=CategoryClosure.depth - 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(CategoryClosure).where(or_(
+            CategoryClosure.ancestor_id == category_id,
+            CategoryClosure.descendant_id == category_id,
+        ))
+    )
+    db.query(Category)\
+        .filter(Category.parent_id == category_id)\
+        .update({Category.parent_id: db_category.parent_id}, synchronize_session=False)
     db.delete(db_category)
     db.commit()
+    _invalidate_categories(uncategorized)
     return {"detail": "Category deleted"}
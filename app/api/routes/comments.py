@@ -1,17 +1,87 @@
 """Comment management routes for courses in the application."""
+import asyncio
+import json
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_db
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.pubsub import DROPPED, comment_hub
+from app.core.singleflight import flight_group
+from app.db.counters import adjust_course_counters
 from app.db.models.comment import Comment
 from app.db.models.course import Course
+from app.db.readers import course_comments
+from app.db.session import SessionLocal
 from app.schemas.comment import CommentCreate, CommentOut
 
 router = APIRouter()
 
 
+def course_topic(course_id: int) -> str:
+    """Return the pub/sub topic carrying comment events for a course."""
+    return f"course:{course_id}"
+
+
+def invalidate_comments(course_id: int):
+    """Invalidate a course's cached comment list and, for its counters, the course itself."""
+    invalidation_bus.publish(f"course:{course_id}", f"course:{course_id}:comments")
+
+
+def publish_comment_event(event_type: str, db_comment: Comment):
+    """Publish a committed comment change to live stream subscribers."""
+    comment_hub.publish(course_topic(db_comment.course_id), {
+        "type": event_type,
+        "comment": CommentOut.model_validate(db_comment).model_dump(mode="json"),
+    })
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Format a server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _course_exists(course_id: int) -> bool:
+    """Check that a course exists using a short-lived session."""
+    db = SessionLocal()
+    try:
+        return db.query(Course.id).filter(Course.id == course_id).first() is not None
+    finally:
+        db.close()
+
+
+async def _comment_events(request: Request, topic: str):
+    """Yield SSE frames for a topic until the client goes away or is dropped.
+
+    The subscription is made on first iteration so that a response that never
+    starts streaming cannot leave it registered. Events whose comment was too
+    large to fan out are sent as "refetch" frames carrying the original event
+    type and the comment reference."""
+    subscription = comment_hub.subscribe(topic)
+    try:
+        while not await request.is_disconnected():
+            try:
+                event = await subscription.get(timeout=settings.stream_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is DROPPED:
+                yield format_sse("dropped", {"detail": "Subscriber fell behind, reconnect"})
+                return
+            if event.get("truncated"):
+                yield format_sse("refetch", {"event": event["type"], "comment": event["comment"]})
+                continue
+            yield format_sse(event["type"], event["comment"])
+    finally:
+        comment_hub.unsubscribe(subscription)
+
+
 @router.post("/courses/{course_id}/comments/", response_model=CommentOut)
 def add_comment(course_id: int, comment: CommentCreate, db: Session = Depends(get_db),
                 current_user=Depends(get_current_user)):
@@ -21,15 +91,35 @@ def add_comment(course_id: int, comment: CommentCreate, db: Session = Depends(ge
         raise HTTPException(status_code=404, detail="Course not found")
     db_comment = Comment(content=comment.content, user_id=current_user.id, course_id=course_id)
     db.add(db_comment)
+    adjust_course_counters(db, course_id, comment_count=1)
     db.commit()
+    invalidate_comments(course_id)
     db.refresh(db_comment)
+    publish_comment_event("created", db_comment)
     return db_comment
 
 
 @router.get("/courses/{course_id}/comments/", response_model=List[CommentOut])
 def list_comments(course_id: int, db: Session = Depends(get_db)):
-    """List all comments for a course."""
-    return db.query(Comment).filter(Comment.course_id == course_id).all()
+    """List all comments for a course, encoded straight from read-only rows and cached."""
+    return response_cache.respond(
+        f"course:{course_id}:comments",
+        lambda: course_comments(db, course_id),
+        tags=(f"course:{course_id}:comments",),
+        flight=flight_group("list_comments"),
+    )
+
+
+@router.get("/courses/{course_id}/comments/stream")
+async def stream_comments(course_id: int, request: Request):
+    """Stream comment changes for a course as server-sent events."""
+    if not await run_in_threadpool(_course_exists, course_id):
+        raise HTTPException(status_code=404, detail="Course not found")
+    return StreamingResponse(
+        _comment_events(request, course_topic(course_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/courses/{course_id}/comments/{comment_id}", response_model=List[CommentOut])
@@ -59,7 +149,9 @@ def edit_comment(
         raise HTTPException(status_code=403, detail="Not allowed to edit this comment")
     db_comment.content = comment.content
     db.commit()
+    invalidation_bus.publish(f"course:{course_id}:comments")
     db.refresh(db_comment)
+    publish_comment_event("updated", db_comment)
     return db_comment
 
 
@@ -81,5 +173,11 @@ def delete_comment(
     if db_comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed to delete this comment")
     db.delete(db_comment)
+    adjust_course_counters(db, course_id, comment_count=-1)
+    deleted = CommentOut.model_validate(db_comment)
     db.commit()
+    invalidate_comments(course_id)
+    comment_hub.publish(course_topic(course_id), {
+        "type": "deleted", "comment": deleted.model_dump(mode="json")
+    })
     return {"detail": "Comment deleted successfully"}
@@ -5,13 +5,36 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_db
+from app.core.cache import response_cache
+from app.core.invalidation import invalidation_bus
+from app.core.singleflight import flight_group
 from app.db.models.category import Category
+from app.db.models.category_closure import category_subtree
 from app.db.models.course import Course
+from app.db.readers import course_by_id, course_page
 from app.schemas.course import CourseCreate, CourseListOut, CourseOut, CourseUpdate
 
 router = APIRouter()
 
 
+def _course_tags(courses):
+    """Cache tags for entries embedding these courses: each course and its creator."""
+    tags = set()
+    for course in courses:
+        tags.add(f"course:{course.id}")
+        tags.add(f"user:{course.creator.id}")
+    return tags
+
+
+def _invalidate_course(course_id: int, *category_ids, extra=()):
+    """Invalidate cached reads of a course, the course lists and the touched categories."""
+    invalidation_bus.publish(
+        "courses",
+        f"course:{course_id}",
+        *(f"category:{category_id}" for category_id in category_ids if category_id is not None),
+        *extra,
+    )
+
 @router.post("/", response_model=CourseOut)
 def create_new_course(
     course: CourseCreate,
@@ -46,6 +69,7 @@ def create_new_course(
     )
     db.add(db_course)
     db.commit()
+    _invalidate_course(db_course.id, course.category_id)
     db.refresh(db_course)
     return db_course
 
@@ -56,26 +80,51 @@ def list_courses(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
     search: Optional[str] = Query(None, description="Search by title"),
-    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    category_id: Optional[int] = Query(
+        None, description="Filter by category ID, including its subcategories"
+    ),
 ):
-    """List courses with optional search and pagination."""
-    query = db.query(Course)
+    """List courses with optional search and pagination.
+
+    Rows come from the read-only query layer and are encoded directly with
+    orjson; the response model only documents the payload. Pages are cached
+    until a course is created, changed or deleted, or one of their courses
+    gains a comment or rating. A category filter spans a subtree, so filtered
+    pages also go whenever any category changes."""
+    filters = []
+    tags = {"courses"}
     if search:
-        query = query.filter(Course.title.ilike(f"%{search}%"))
+        filters.append(Course.title.ilike(f"%{search}%"))
     if category_id:
-        query = query.filter(Course.category_id == category_id)
-    total = query.count()
-    courses = query.offset((page - 1) * page_size).limit(page_size).all()
-    return {"items": courses, "total": total}
+        filters.append(Course.category_id.in_(category_subtree(category_id)))
+        tags.add("categories")
+
+    def build():
+        total, rows = course_page(db, filters, offset=(page - 1) * page_size, limit=page_size)
+        return {"items": rows, "total": total}
+
+    return response_cache.respond(
+        f"courses:list:{page}:{page_size}:{category_id}:{search}",
+        build,
+        tags=lambda payload: tags | _course_tags(payload["items"]),
+    )
 
 
 @router.get("/{course_id}", response_model=CourseOut)
 def get_course(course_id: int, db: Session = Depends(get_db)):
-    """Get a course by ID."""
-    course = db.query(list_courses.__globals__['Course']).filter_by(id=course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    return course
+    """Get a course by ID, cached until it or its creator changes."""
+    def build():
+        course = course_by_id(db, course_id)
+        if course is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return course
+
+    return response_cache.respond(
+        f"course:{course_id}",
+        build,
+        tags=lambda course: _course_tags([course]),
+        flight=flight_group("get_course"),
+    )
 
 
 @router.put("/{course_id}", response_model=CourseOut)
@@ -103,6 +152,8 @@ def update_course(
             detail="Another course with this title and YouTube URL already exists."
         )
 
+    old_category_id = db_course.category_id
+
     # Validate and apply category change if provided
     new_category_id = getattr(course_update, "category_id", None)
     if new_category_id is not None:
@@ -116,6 +167,8 @@ def update_course(
     db_course.youtube_url = course_update.youtube_url
 
     db.commit()
+    # Category listings embed course titles, so any change inside a category counts
+    _invalidate_course(course_id, old_category_id, db_course.category_id)
     db.refresh(db_course)
 
     return db_course
@@ -133,6 +186,11 @@ def delete_course(
         raise HTTPException(status_code=404, detail="Course not found")
     if course.creator_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this course")
+    category_id = course.category_id
     db.delete(course)
     db.commit()
+    _invalidate_course(
+        course_id, category_id,
+        extra=(f"course:{course_id}:comments", f"course:{course_id}:ratings"),
+    )
     return {"message": "Course deleted successfully."}
@@ -0,0 +1,17 @@
+"""Prometheus scrape endpoint."""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Render this worker's metrics in the Prometheus text format.
+
+    Async so that it runs on the event loop, where the threadpool limiter can be read."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -5,13 +5,22 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_db
+from app.core.cache import response_cache
+from app.core.invalidation import invalidation_bus
+from app.db.counters import adjust_course_counters
 from app.db.models.course import Course
 from app.db.models.rating import Rating
+from app.db.readers import ratings_where
 from app.schemas.rating import RatingCreate, RatingOut
 
 router = APIRouter()
 
 
+def _invalidate_ratings(course_id: int):
+    """Invalidate a course's cached rating list and, for its counters, the course itself."""
+    invalidation_bus.publish(f"course:{course_id}", f"course:{course_id}:ratings")
+
+
 @router.post("/courses/{course_id}/ratings/", response_model=RatingOut)
 def rate_course(course_id: int, rating: RatingCreate, db: Session = Depends(get_db),
                 current_user=Depends(get_current_user)):
@@ -24,21 +33,29 @@ def rate_course(course_id: int, rating: RatingCreate, db: Session = Depends(get_
         .filter(Rating.user_id == current_user.id, Rating.course_id == course_id)\
         .first()
     if existing:
+        adjust_course_counters(db, course_id, rating_sum=rating.value - existing.value)
         existing.value = rating.value
         db.commit()
+        _invalidate_ratings(course_id)
         db.refresh(existing)
         return existing
     db_rating = Rating(value=rating.value, user_id=current_user.id, course_id=course_id)
     db.add(db_rating)
+    adjust_course_counters(db, course_id, rating_count=1, rating_sum=rating.value)
     db.commit()
+    _invalidate_ratings(course_id)
     db.refresh(db_rating)
     return db_rating
 
 
 @router.get("/courses/{course_id}/ratings/", response_model=List[RatingOut])
 def course_ratings(course_id: int, db: Session = Depends(get_db)):
-    """List all ratings for a course."""
-    return db.query(Rating).filter(Rating.course_id == course_id).all()
+    """List all ratings for a course, encoded straight from read-only rows and cached."""
+    return response_cache.respond(
+        f"course:{course_id}:ratings",
+        lambda: ratings_where(db, Rating.course_id == course_id),
+        tags=(f"course:{course_id}:ratings",),
+    )
 
 
 @router.delete("/courses/{course_id}/ratings/{rating_id}", response_model=dict)
@@ -59,5 +76,7 @@ def delete_rating(
     if db_rating.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed to delete this rating")
     db.delete(db_rating)
+    adjust_course_counters(db, course_id, rating_count=-1, rating_sum=-db_rating.value)
     db.commit()
+    _invalidate_ratings(course_id)
     return {"detail": "Rating deleted successfully"}
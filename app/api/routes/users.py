@@ -1,20 +1,39 @@
 """User management routes for the FastAPI application."""
-from typing import List
+import base64
+import heapq
+import json
+import threading
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
-from passlib.context import CryptContext
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, and_, insert, literal, or_, select, type_coerce
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_db, require_admin
+from app.core.invalidation import invalidation_bus
+from app.core.config import settings
+from app.core.passwords import hash_passwords, pwd_context
+from app.db.models.comment import Comment
+from app.db.models.course import Course
 from app.db.models.rating import Rating
-from app.db.models.user import User
+from app.db.models.user import User, UserRole
+from app.db.readers import ratings_where, users_page
+from app.db.session import SessionLocal
+from app.schemas.activity import ActivityFeedOut, ActivityItem
 from app.schemas.rating import RatingOut
 from app.schemas.user import UserCreate
-from app.schemas.user import UserOut, UserUpdate
+from app.schemas.user import UserBulkCreate, UserBulkResult, UserListOut, UserOut, UserUpdate
+
+EXPORT_BATCH_SIZE = 1000
+INSERT_BATCH_SIZE = 500
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Bulk jobs share the hashing pool; capping them keeps cores free for the API
+_bulk_jobs = threading.BoundedSemaphore(settings.bulk_max_jobs)
 
 
 def get_user_by_username(db: Session, username: str):
@@ -32,6 +51,46 @@ def create_user(db: Session, user: UserCreate):
     return db_user
 
 
+def provision_users(db: Session, users, workers: int = None):
+    """Create many users at once, skipping usernames that are taken or repeated.
+
+    Existing usernames are found with one IN query, whose transaction is ended
+    before passwords are hashed in parallel so no connection sits idle through
+    the hashing. Rows are then inserted in multi-row batches in one transaction;
+    a username registered in the meantime surfaces as an IntegrityError.
+    Returns (created users, skipped usernames)."""
+    wanted = {}
+    skipped = []
+    for user in users:
+        if user.username in wanted:
+            skipped.append(user.username)
+        else:
+            wanted[user.username] = user
+    taken = set(db.scalars(select(User.username).where(User.username.in_(list(wanted)))))
+    db.rollback()
+    skipped += [username for username in wanted if username in taken]
+    new_users = [user for username, user in wanted.items() if username not in taken]
+
+    hashes = hash_passwords([user.password for user in new_users], workers)
+    rows = [
+        {
+            "username": user.username,
+            "hashed_password": hashed,
+            "full_name": user.full_name,
+            "bio": user.bio,
+            "role": UserRole(user.role.value),
+        }
+        for user, hashed in zip(new_users, hashes)
+    ]
+    created = []
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        created += db.scalars(
+            insert(User).returning(User), rows[start:start + INSERT_BATCH_SIZE]
+        ).all()
+    db.commit()
+    return created, skipped
+
+
 @router.get("/me", response_model=UserOut)
 def get_profile(current_user: User = Depends(get_current_user)):
     """Get the current user's profile."""
@@ -51,6 +110,8 @@ def update_profile(
     if user_update.bio is not None:
         db_user.bio = user_update.bio
     db.commit()
+    # Cached courses embed their creator's profile
+    invalidation_bus.publish(f"user:{db_user.id}")
     db.refresh(db_user)
     return db_user
 
@@ -58,13 +119,166 @@ def update_profile(
 @router.get("/me/ratings/", response_model=List[RatingOut])
 def user_ratings(current_user=Depends(get_current_user), db: Session = Depends(get_db)):
     """List all ratings made by the current user."""
-    return db.query(Rating).filter(Rating.user_id == current_user.id).all()
+    return ratings_where(db, Rating.user_id == current_user.id)
+
+
+@router.post("/bulk", response_model=UserBulkResult)
+def bulk_create_users(
+    payload: UserBulkCreate,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_admin),
+):
+    """Provision many users, with roles, in one request (admin only)."""
+    if not _bulk_jobs.acquire(blocking=False):
+        raise HTTPException(
+            status_code=429, detail="Too many bulk provisioning jobs running; retry later"
+        )
+    try:
+        created, skipped = provision_users(db, payload.users)
+    except IntegrityError as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=409, detail="A username was registered concurrently; retry the request"
+        ) from exc
+    finally:
+        _bulk_jobs.release()
+    return {"created": created, "skipped": skipped}
+
+
+@router.get("/", response_model=UserListOut)
+def list_users(
+    db: Session = Depends(get_db),
+    _: User = Depends(require_admin),
+    after_id: Optional[int] = Query(None, description="Cursor: return users with an ID above this"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    role: Optional[UserRole] = Query(None, description="Filter by role"),
+    username_prefix: Optional[str] = Query(None, description="Filter by username prefix"),
+):
+    """List users one keyset page at a time (admin only)."""
+    users = users_page(db, after_id, limit + 1, role, username_prefix)
+    next_cursor = users[limit - 1].id if len(users) > limit else None
+    return {"items": users[:limit], "next_cursor": next_cursor}
+
+
+def _export_users(role, username_prefix):
+    """Yield every matching user as an NDJSON line, reading in keyset batches."""
+    db = SessionLocal()
+    try:
+        after_id = None
+        while True:
+            users = users_page(db, after_id, EXPORT_BATCH_SIZE, role, username_prefix)
+            if not users:
+                return
+            yield "".join(
+                json.dumps(UserOut.model_validate(user).model_dump(mode="json")) + "\n"
+                for user in users
+            )
+            after_id = users[-1].id
+    finally:
+        db.close()
+
 
+@router.get("/export")
+def export_users(
+    _: User = Depends(require_admin),
+    role: Optional[UserRole] = Query(None, description="Filter by role"),
+    username_prefix: Optional[str] = Query(None, description="Filter by username prefix"),
+):
+    """Stream all matching users as newline-delimited JSON (admin only)."""
+    return StreamingResponse(
+        _export_users(role, username_prefix),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
+
+
+# Feed sources with their tie-break rank; items sharing a timestamp sort by (rank, id)
+ACTIVITY_SOURCES = (
+    ("course", 2, Course, Course.creator_id, (Course.title.label("title"),)),
+    ("comment", 1, Comment, Comment.user_id, (Comment.content.label("content"),)),
+    ("rating", 0, Rating, Rating.user_id, (Rating.value.label("value"),)),
+)
+
+
+def _encode_activity_cursor(item: ActivityItem, rank: int) -> str:
+    """Encode the sort key of the last item on a page as an opaque cursor."""
+    raw = json.dumps([item.created_at.isoformat(), rank, item.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_activity_cursor(cursor: str):
+    """Decode a cursor into its (created_at, rank, id) sort key."""
+    try:
+        created_at, rank, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(rank), int(item_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def _cursor_timestamp(db: Session, created_at: datetime):
+    """Bind a cursor timestamp so it compares correctly with stored values.
+
+    SQLite stores server-default timestamps as 'YYYY-MM-DD HH:MM:SS' text, while
+    bound datetimes always carry microseconds, so compare as text in that format."""
+    if db.get_bind().dialect.name == "sqlite":
+        return type_coerce(created_at.isoformat(sep=" "), String)
+    return created_at
+
+
+def _activity_stream(db: Session, user_id: int, source, cursor, limit: int):
+    """Read one source newest-first from its (user_id, created_at, id) index, past the cursor."""
+    kind, rank, model, user_column, columns = source
+    statement = select(
+        literal(kind).label("type"),
+        model.id,
+        model.created_at,
+        (model.id if model is Course else model.course_id).label("course_id"),
+        *columns,
+    ).where(user_column == user_id, model.created_at.is_not(None))
+    if cursor is not None:
+        created_at, cursor_rank, cursor_id = cursor
+        created_at = _cursor_timestamp(db, created_at)
+        if rank < cursor_rank:
+            statement = statement.where(model.created_at <= created_at)
+        elif rank > cursor_rank:
+            statement = statement.where(model.created_at < created_at)
+        else:
+            statement = statement.where(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < cursor_id),
+            ))
+    rows = db.execute(
+        statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+    )
+    for row in rows:
+        yield (row.created_at, rank, row.id), ActivityItem(**row._mapping)
+
+
+@router.get("/{user_id}/activity", response_model=ActivityFeedOut)
+def user_activity(
+    user_id: int,
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+):
+    """List a user's courses, comments and ratings interleaved newest first.
 
-@router.get("/", response_model=List[UserOut])
-def list_users(db: Session = Depends(get_db), _: User = Depends(require_admin)):
-    """List all users (admin only)."""
-    return db.query(User).all()
+    Each source is read in index order and only up to one page past the
+    cursor; the three streams are merged lazily."""
+    if not db.query(User.id).filter(User.id == user_id).first():
+        raise HTTPException(status_code=404, detail="User not found")
+    position = _decode_activity_cursor(cursor) if cursor else None
+    streams = [
+        _activity_stream(db, user_id, source, position, limit + 1)
+        for source in ACTIVITY_SOURCES
+    ]
+    merged = heapq.merge(*streams, key=lambda entry: entry[0], reverse=True)
+    page = [entry for _, entry in zip(range(limit + 1), merged)]
+    next_cursor = None
+    if len(page) > limit:
+        (_, rank, _), item = page[limit - 1]
+        next_cursor = _encode_activity_cursor(item, rank)
+    return {"items": [item for _, item in page[:limit]], "next_cursor": next_cursor}
 
 
 def verify_password(plain_password, hashed_password):
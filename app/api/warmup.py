@@ -0,0 +1,77 @@
+"""Startup warming: fill the caches and the connection pool before serving traffic.
+
+Warming goes through the cached route functions themselves, so the entries it
+stores carry exactly the keys and tags that real requests use, and running
+their queries compiles and caches the SQL of the hot read paths."""
+import logging
+import time
+
+from sqlalchemy import select, text
+
+from app.api.routes import categories, comments, courses, ratings
+from app.core.config import settings
+from app.db.models.course import Course
+from app.db.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+
+def top_course_ids(db, limit: int):
+    """Return the ids of the most engaged-with courses, by comment and rating counts.
+
+    Request traffic is not recorded, so the denormalized counters stand in for it."""
+    return list(db.scalars(
+        select(Course.id)
+        .order_by((Course.comment_count + Course.rating_count).desc(), Course.id)
+        .limit(limit)
+    ))
+
+
+def warm_pool(connections: int):
+    """Open up to connections pooled connections at once so the first requests skip connecting."""
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+def warm(top_courses: int = None, connections: int = None) -> dict:
+    """Warm the pool, the category list, the first course page and the top courses."""
+    top_courses = settings.warm_top_courses if top_courses is None else top_courses
+    connections = settings.warm_connections if connections is None else connections
+    started = time.perf_counter()
+    warmed = {"connections": warm_pool(connections)}
+    db = SessionLocal()
+    try:
+        categories.list_categories(db, include_courses=False, courses_limit=20)
+        courses.list_courses(db, page=1, page_size=10, search=None, category_id=None)
+        course_ids = top_course_ids(db, top_courses)
+        for course_id in course_ids:
+            courses.get_course(course_id, db)
+            comments.list_comments(course_id, db)
+            ratings.course_ratings(course_id, db)
+        warmed["courses"] = len(course_ids)
+    finally:
+        db.close()
+    warmed["seconds"] = round(time.perf_counter() - started, 3)
+    return warmed
+
+
+def warm_on_startup():
+    """Warm if enabled, logging instead of failing: a cold worker still serves."""
+    if not settings.warm_on_startup:
+        return None
+    try:
+        warmed = warm()
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Startup warming failed; serving with cold caches")
+        return None
+    logger.info("Warmed %(connections)d connections and %(courses)d courses "
+                "in %(seconds)ss", warmed)
+    return warmed
@@ -0,0 +1,336 @@
+"""Response cache with pluggable backends and tag-based invalidation."""
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from urllib.parse import urlparse
+
+import orjson
+from fastapi import Response
+
+from app.core.config import settings
+from app.core.timing import timed
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """LRU cache with per-entry expiry, local to this process.
+
+    Each tag maps to the keys stored under it so that invalidating a tag drops
+    exactly those entries. Evicted and expired entries are unlinked from their
+    tags as they go, so the tag index never outgrows the cache."""
+    shared = False
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float, tags=()):
+        """Store a value for ttl seconds under the given tags, evicting the least recently used."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags):
+        """Drop every entry stored under any of the tags."""
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._remove(key)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        """Remove an entry and unlink it from its tags; the lock must be held."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RespError(Exception):
+    """An error reply from a Redis-protocol server."""
+
+
+class _RespConnection:
+    """One socket speaking RESP2, the Redis wire protocol."""
+
+    def __init__(self, host: str, port: int, db: int, password, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile("rb")
+        if password:
+            self.execute([("AUTH", password)])
+        if db:
+            self.execute([("SELECT", db)])
+
+    def execute(self, commands):
+        """Send the commands in one write and return their replies, in order."""
+        payload = bytearray()
+        for command in commands:
+            payload += b"*%d\r\n" % len(command)
+            for arg in command:
+                if not isinstance(arg, bytes):
+                    arg = str(arg).encode()
+                payload += b"$%d\r\n%s\r\n" % (len(arg), arg)
+        self.sock.sendall(payload)
+        return [self._read_reply() for _ in commands]
+
+    def _read_reply(self):
+        """Read one reply; error replies raise RespError."""
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            raise RespError(body.decode(errors="replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection closed by the cache server")
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from the cache server: {line!r}")
+
+    def close(self):
+        """Close the socket."""
+        self.reader.close()
+        self.sock.close()
+
+
+class RedisBackend:
+    """Cache shared by every worker, kept in a Redis-compatible server.
+
+    Speaks RESP over plain sockets, so any server implementing GET, SET,
+    SADD, SREM, SMEMBERS, DEL and PEXPIRE will do. Each tag is a set of the
+    keys stored under it; tag sets expire after max_ttl, which is also the
+    longest an entry may live, so they never outlast their entries for long.
+    Connection errors are logged and treated as misses: the cache must never
+    take the API down with it."""
+    shared = True
+
+    def __init__(self, url: str, max_ttl: float = 300, timeout: float = 0.5,
+                 prefix: str = "darasa:cache:", max_idle: int = 8):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.max_ttl = max_ttl
+        self.timeout = timeout
+        self.prefix = prefix
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached value, or None if it is missing or the server is unreachable."""
+        replies = self._execute([("GET", self.prefix + key)])
+        return replies[0] if replies else None
+
+    def set(self, key: str, value: bytes, ttl: float, tags=()):
+        """Store a value and add its key to each tag's set, in one round trip."""
+        ttl_ms = int(min(ttl, self.max_ttl) * 1000)
+        commands = [("SET", self.prefix + key, value, "PX", ttl_ms)]
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            commands.append(("SADD", tag_key, key))
+            commands.append(("PEXPIRE", tag_key, int(self.max_ttl * 1000)))
+        self._execute(commands)
+
+    def invalidate_tags(self, tags):
+        """Delete the entries stored under the tags.
+
+        Only the keys that were read are removed from each tag set, so an entry
+        stored concurrently stays linked to its tag instead of being orphaned."""
+        tags = list(tags)
+        if not tags:
+            return
+        members = self._execute([("SMEMBERS", self._tag_key(tag)) for tag in tags])
+        commands = []
+        for tag, keys in zip(tags, members or ()):
+            if keys:
+                commands.append(("DEL", *(self.prefix + key.decode() for key in keys)))
+                commands.append(("SREM", self._tag_key(tag), *keys))
+        if commands:
+            self._execute(commands)
+
+    def clear(self):
+        """Drop every entry in the server's current database."""
+        self._execute([("FLUSHDB",)])
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _execute(self, commands):
+        """Run commands on a pooled connection, returning None if the server failed."""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        try:
+            if conn is None:
+                conn = _RespConnection(
+                    self.host, self.port, self.db, self.password, self.timeout
+                )
+            replies = conn.execute(commands)
+        except (OSError, RespError):
+            logger.exception("Cache server %s:%s failed", self.host, self.port)
+            if conn is not None:
+                conn.close()
+            return None
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+        return replies
+
+
+class NullBackend:
+    """Caches nothing; used when caching is disabled."""
+    shared = False
+    # pylint: disable=unused-argument
+
+    def get(self, key: str):
+        """Always a miss."""
+        return None
+
+    def set(self, key: str, value: bytes, ttl: float, tags=()):
+        """Discard the value."""
+
+    def invalidate_tags(self, tags):
+        """Nothing to invalidate."""
+
+    def clear(self):
+        """Nothing to clear."""
+
+
+class ResponseCache:
+    """Cache-aside helper for GET routes that return JSON.
+
+    A route passes a key and a build function returning its payload; on a miss
+    the payload is encoded once and the bytes are stored, so a hit skips both
+    the queries and the serialization. tags is either a list or a function of
+    the payload, for entries that depend on the rows they contain. Writers call
+    invalidate() with the affected tags after commit. As with the category
+    snapshot, a build that races with an invalidation is returned to its caller
+    but not stored.
+
+    Given a SingleFlight group, concurrent misses on the same key wait for one
+    build and share its encoded body instead of each querying the database."""
+
+    def __init__(self, backend, ttl: float = 30):
+        self.backend = backend
+        self.ttl = ttl
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def respond(self, key: str, build, tags=(), ttl: float = None, flight=None) -> Response:
+        """Return the cached response for key, building and storing it on a miss."""
+        body = self.backend.get(key)
+        if body is not None:
+            return Response(body, media_type="application/json", headers={"X-Cache": "hit"})
+
+        def miss():
+            generation = self._generation
+            payload = build()
+            with timed("serialize"), tracer.start_as_current_span("cache.serialize"):
+                encoded = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+            if generation == self._generation:
+                entry_tags = tags(payload) if callable(tags) else tags
+                self.backend.set(key, encoded, self.ttl if ttl is None else ttl, entry_tags)
+            return encoded
+
+        body = miss() if flight is None else flight.do(key, miss)
+        return Response(body, media_type="application/json", headers={"X-Cache": "miss"})
+
+    def invalidate(self, *tags):
+        """Drop every entry stored under any of the tags; call after commit."""
+        with self._lock:
+            self._generation += 1
+        try:
+            self.backend.invalidate_tags(tags)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # The write has committed; a failed invalidation must not fail it
+            logger.exception("Failed to invalidate cache tags %s", tags)
+
+    def apply_invalidation(self, tags, local: bool):
+        """Invalidation bus subscriber: drop the entries stored under the tags.
+
+        A shared backend has already been invalidated by the worker that
+        published the tags, so another worker's event only fences off the
+        builds in flight here."""
+        if local or not self.backend.shared:
+            self.invalidate(*tags)
+        else:
+            with self._lock:
+                self._generation += 1
+
+    def flush(self):
+        """Invalidation bus subscriber: drop what this worker holds after missed events."""
+        with self._lock:
+            self._generation += 1
+        if not self.backend.shared:
+            self.backend.clear()
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._generation += 1
+        self.backend.clear()
+
+
+def build_backend(name: str):
+    """Return the cache backend configured by name ("memory", "redis" or "none")."""
+    if name == "redis":
+        return RedisBackend(settings.cache_url, max_ttl=settings.cache_ttl_seconds)
+    if name == "none":
+        return NullBackend()
+    return MemoryBackend(settings.cache_max_entries)
+
+
+response_cache = ResponseCache(
+    build_backend(settings.cache_backend), ttl=settings.cache_ttl_seconds
+)
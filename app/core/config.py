@@ -19,6 +19,58 @@ class Settings:
     """Application settings class that holds configuration values."""
     database_url: str = SQLALCHEMY_DATABASE_URL
     secret_key: str = os.getenv("SECRET_KEY", "test-key")
+    # Defaults to half the cores so bulk hashing leaves room for serving requests
+    hash_workers: int = int(os.getenv("HASH_WORKERS", str(max(1, (os.cpu_count() or 1) // 2))))
+    bulk_max_jobs: int = int(os.getenv("BULK_MAX_JOBS", "1"))
+    pubsub_backend: str = os.getenv("PUBSUB_BACKEND", "memory")
+    # Cache invalidation across workers; LISTEN/NOTIFY whenever the database is Postgres
+    invalidation_backend: str = os.getenv(
+        "INVALIDATION_BACKEND",
+        "postgres" if (SQLALCHEMY_DATABASE_URL or "").startswith("postgres") else "memory",
+    )
+    stream_queue_size: int = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+    max_embedded_courses: int = int(os.getenv("MAX_EMBEDDED_COURSES", "100"))
+    stream_heartbeat_seconds: float = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+    snapshot_max_age_seconds: float = float(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "30"))
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+    gzip_level: int = int(os.getenv("GZIP_LEVEL", "6"))
+    brotli_quality: int = int(os.getenv("BROTLI_QUALITY", "4"))
+    cache_backend: str = os.getenv("CACHE_BACKEND", "memory")
+    cache_url: str = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+    cache_ttl_seconds: float = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    # Startup warming: the top courses by engagement and pooled connections to preload
+    warm_on_startup: bool = os.getenv("WARM_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+    warm_top_courses: int = int(os.getenv("WARM_TOP_COURSES", "50"))
+    warm_connections: int = int(os.getenv("WARM_CONNECTIONS", "5"))
+    # Routes whose concurrent identical reads share one query ("" disables coalescing)
+    coalesce_routes: frozenset = frozenset(
+        name.strip() for name in os.getenv("COALESCE_ROUTES", "get_course,list_comments").split(",")
+        if name.strip()
+    )
+    # Server-Timing header on every response, and the per-request query log of debug mode
+    server_timing: bool = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+    debug: bool = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+
+    # Request profiling: the share of requests profiled at random (admins can always ask with
+    # X-Profile), the sampling interval, and how many profiles are kept, and where as files
+    profile_sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    profile_interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+    profile_keep: int = int(os.getenv("PROFILE_KEEP", "50"))
+    profile_dir: str = os.getenv("PROFILE_DIR", "")
+
+    # Statements at least this slow (ms) are logged with their plan; 0 logs all, -1 disables.
+    # The slowest SLOW_QUERY_TOP fingerprints by total time are kept for the admin view
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    slow_query_top: int = int(os.getenv("SLOW_QUERY_TOP", "50"))
+
+    # Tracing: where finished spans go ("memory", "file" or "none" to turn tracing off), the
+    # spans the memory exporter keeps, the file exporter's path, and the share of requests
+    # without a traceparent that start a trace (those with one follow its sampled flag)
+    trace_exporter: str = os.getenv("TRACE_EXPORTER", "memory")
+    trace_buffer: int = int(os.getenv("TRACE_BUFFER", "10000"))
+    trace_file: str = os.getenv("TRACE_FILE", "traces.jsonl")
+    trace_sample_rate: float = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
 
 
 settings = Settings()
@@ -0,0 +1,182 @@
+"""Cross-worker invalidation bus for the in-process caches.
+
+Write routes publish the tags they changed after commit. The publishing worker
+applies them at once; every other worker receives them through the backend and
+applies them too. Each worker numbers its events, so a receiver that sees a
+gap in a sender's sequence, or whose LISTEN connection dropped, knows it may
+have missed something and flushes everything instead."""
+import json
+import logging
+import threading
+import uuid
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.snapshots import category_snapshot
+from app.db.notify import MAX_PAYLOAD_BYTES, PgListener, pg_notify
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Delivers events to every bus started on this backend, within one process.
+
+    Sharing one instance between several buses stands in for several workers."""
+
+    def __init__(self):
+        self._receivers = []
+        self._lock = threading.Lock()
+
+    def start(self, receive, on_reconnect):  # pylint: disable=unused-argument
+        """Register a bus's receive callback."""
+        with self._lock:
+            self._receivers.append(receive)
+
+    def stop(self, receive):
+        """Unregister a bus's receive callback."""
+        with self._lock:
+            if receive in self._receivers:
+                self._receivers.remove(receive)
+
+    def publish(self, payload: str):
+        """Hand the payload to every registered bus, the publisher included."""
+        with self._lock:
+            receivers = list(self._receivers)
+        for receive in receivers:
+            receive(payload)
+
+
+class PostgresBackend:
+    """Fans events out to every worker through Postgres LISTEN/NOTIFY."""
+
+    def __init__(self, engine, channel: str = "cache_invalidation"):
+        self.engine = engine
+        self.channel = channel
+        self.listener = None
+
+    def start(self, receive, on_reconnect):
+        """Start this worker's LISTEN thread."""
+        self.listener = PgListener(self.engine, self.channel, receive, on_reconnect=on_reconnect)
+        self.listener.start()
+
+    def stop(self, receive):  # pylint: disable=unused-argument
+        """Stop the LISTEN thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def publish(self, payload: str):
+        """NOTIFY all workers, including this one."""
+        pg_notify(self.engine, self.channel, payload)
+
+
+class InvalidationBus:
+    """Publishes invalidated tags to every worker and applies those it receives.
+
+    Subscribers register two callbacks: on_tags(tags, local), called with the
+    tags of each event (local is True in the worker that published it), and
+    on_flush(), called when events may have been missed. Events from the
+    worker itself are applied when published, not again when they come back
+    through the backend."""
+
+    def __init__(self, backend, origin: str = None):
+        self.backend = backend
+        self.origin = origin or uuid.uuid4().hex
+        self.received = 0
+        self.flushes = 0
+        self._sequence = 0
+        self._last_seen = {}
+        self._subscribers = []
+        self._publish_lock = threading.Lock()
+        self._seen_lock = threading.Lock()
+        self._started = False
+
+    def subscribe(self, on_tags, on_flush):
+        """Register callbacks for received tags and for flushes."""
+        self._subscribers.append((on_tags, on_flush))
+
+    def start(self):
+        """Start receiving other workers' events; later calls are no-ops."""
+        if not self._started:
+            self.backend.start(self._receive, self.flush)
+            self._started = True
+
+    def stop(self):
+        """Stop receiving events."""
+        if self._started:
+            self.backend.stop(self._receive)
+            self._started = False
+
+    def publish(self, *tags):
+        """Apply the tags here, then send them to the other workers; call after commit."""
+        self._notify(tags, local=True)
+        # Numbering and sending under one lock keeps each worker's events in order
+        with self._publish_lock:
+            self._sequence += 1
+            event = {"origin": self.origin, "seq": self._sequence, "tags": list(tags)}
+            payload = json.dumps(event)
+            if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+                # Too large for NOTIFY: tell the other workers to drop everything
+                del event["tags"]
+                event["flush"] = True
+                payload = json.dumps(event)
+            try:
+                self.backend.publish(payload)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # The write has committed; other workers fall back on their TTLs
+                logger.exception("Failed to publish invalidation of %s", tags)
+
+    def flush(self):
+        """Tell every subscriber to drop everything it holds."""
+        self.flushes += 1
+        for _, on_flush in self._subscribers:
+            try:
+                on_flush()
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Invalidation flush subscriber failed")
+
+    def _receive(self, payload: str):
+        """Apply an event from the backend, flushing if the sender's sequence skipped."""
+        event = json.loads(payload)
+        origin, sequence = event["origin"], event["seq"]
+        if origin == self.origin:
+            return
+        with self._seen_lock:
+            last = self._last_seen.get(origin)
+            if last is not None and sequence <= last:
+                return  # a duplicate, or overtaken by a later event
+            self._last_seen[origin] = sequence
+            self.received += 1
+        if event.get("flush") or (last is not None and sequence != last + 1):
+            self.flush()
+            return
+        self._notify(event["tags"], local=False)
+
+    def _notify(self, tags, local: bool):
+        """Hand tags to every subscriber."""
+        for on_tags, _ in self._subscribers:
+            try:
+                on_tags(tags, local)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Invalidation subscriber failed for %s", tags)
+
+
+def _invalidate_snapshot(tags, local: bool):  # pylint: disable=unused-argument
+    """Drop the category snapshot when any category-level tag changed."""
+    if any(tag == "categories" or tag.startswith("category:") for tag in tags):
+        category_snapshot.invalidate()
+
+
+def build_backend(name: str):
+    """Return the invalidation backend configured by name ("memory" or "postgres")."""
+    if name == "postgres":
+        # pylint: disable=import-outside-toplevel
+        from app.db.session import engine
+
+        return PostgresBackend(engine)
+    return MemoryBackend()
+
+
+invalidation_bus = InvalidationBus(build_backend(settings.invalidation_backend))
+invalidation_bus.subscribe(response_cache.apply_invalidation, response_cache.flush)
+invalidation_bus.subscribe(_invalidate_snapshot, category_snapshot.invalidate)
@@ -0,0 +1,263 @@
+"""Process-local metrics in the Prometheus text exposition format.
+
+A deliberately small registry: counters, gauges and histograms keyed by label
+values, each guarded by its own lock, with the text rendered only when
+scraped. Recording is a dict lookup and a few additions, cheap enough to leave
+on in production. Every worker keeps its own numbers, as with any Prometheus
+client running under several processes; scrape each worker or aggregate in
+the query."""
+import bisect
+import contextvars
+import threading
+import time
+
+import anyio.to_thread
+from sqlalchemy import event
+
+from app.core.singleflight import flight_stats
+
+# Seconds; the Prometheus client defaults, for whole requests
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds; individual queries are expected to be much faster
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Route label for requests that matched no route, so raw paths never become labels
+UNMATCHED = "unmatched"
+# Route label for queries run outside any request, such as warming or LISTEN threads
+NO_ROUTE = "none"
+
+# The ASGI scope of the request being served; the router records the matched route in it
+request_scope = contextvars.ContextVar("request_scope", default=None)
+
+
+def route_template(scope) -> str:
+    """Return the matched route's full path template for a scope, or UNMATCHED.
+
+    FastAPI resolves routes of included routers through a per-request context
+    carrying the prefixed template; scope["route"] then holds the route as
+    declared on its router, without the prefix."""
+    route = (scope.get("fastapi") or {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED
+
+
+def current_route() -> str:
+    """Return the route template of the request being served, or NO_ROUTE."""
+    scope = request_scope.get()
+    return NO_ROUTE if scope is None else route_template(scope)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Shared bookkeeping: name, help text, label names and per-label-values state.
+
+    collect, if given, is called at scrape time and yields (label values, value)
+    pairs, for numbers that are read from elsewhere rather than recorded."""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels=(), collect=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.collect = collect
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        """Return the HELP and TYPE lines."""
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self):
+        """Return the exposition lines for every label combination."""
+        if self.collect is not None:
+            collected = dict(self.collect())
+            with self._lock:
+                self._values = collected
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self.header()
+        for values, value in items:
+            lines.append(f"{self.name}{_labels(self.label_names, values)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        """Add amount to the counter for the label values."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    """A value that goes up and down."""
+    kind = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        """Add amount to the gauge for the label values."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        """Subtract amount from the gauge for the label values."""
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels):
+        """Set the gauge for the label values."""
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels=(), buckets=REQUEST_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        """Record one observation for the label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), then the sum
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def render(self):
+        with self._lock:
+            items = sorted((values, list(state)) for values, state in self._values.items())
+        lines = self.header()
+        for values, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                labels = _labels(self.label_names, values, [("le", _number(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {_number(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The set of metrics rendered at /metrics."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        """Add a metric and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests served.", ("method", "route", "status"),
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to serve an HTTP request.",
+    ("method", "route", "status"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being served.", ("method",),
+))
+db_queries = registry.register(Counter(
+    "db_queries_total", "SQL statements executed, by the route that ran them.", ("route",),
+))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "Time to execute one SQL statement.", ("route",),
+    buckets=QUERY_BUCKETS,
+))
+
+
+def instrument_engine(engine):
+    """Count and time every statement the engine executes, labelled by the current route."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        # pylint: disable=unused-argument,too-many-arguments,too-many-positional-arguments
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        # pylint: disable=unused-argument,too-many-arguments,too-many-positional-arguments
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        route = current_route()
+        db_queries.inc(route)
+        db_query_duration.observe(elapsed, route)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+
+
+def instrument_pool(engine):
+    """Expose the engine's connection pool as gauges read at scrape time."""
+    pool = engine.pool
+
+    def collect():
+        # NullPool and StaticPool keep no counts
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            reader = getattr(pool, name, None)
+            if reader is not None:
+                yield (name,), reader()
+
+    registry.register(Gauge(
+        "db_pool_connections", "Connection pool state: size, checkedout, checkedin, overflow.",
+        ("state",), collect=collect,
+    ))
+
+
+def _collect_threadpool():
+    """Read the worker threadpool's limiter; must run on the event loop, as /metrics does."""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    yield ("busy",), limiter.borrowed_tokens
+    yield ("limit",), limiter.total_tokens
+    yield ("waiting",), limiter.statistics().tasks_waiting
+
+
+def _collect_coalescing():
+    """Read each request coalescing group's counter."""
+    for group in flight_stats():
+        yield (group["name"],), group["coalesced"]
+
+
+registry.register(Gauge(
+    "threadpool_threads", "Threads running sync endpoints (busy), the cap (limit) and tasks "
+    "queued for a thread (waiting).", ("state",), collect=_collect_threadpool,
+))
+registry.register(Counter(
+    "coalesced_requests_total", "Reads that shared another request's in-flight query.",
+    ("group",), collect=_collect_coalescing,
+))
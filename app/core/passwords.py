@@ -0,0 +1,54 @@
+"""Password hashing, with a shared process pool for bulk work."""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+# Below this many passwords the pool round trip costs more than it saves
+POOL_THRESHOLD = 8
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def hash_password(password: str) -> str:
+    """Hash a password; module-level so process pool workers can run it."""
+    return pwd_context.hash(password)
+
+
+def _hash_pool() -> ProcessPoolExecutor:
+    """Return the shared hashing pool, creating it on first use.
+
+    Workers are spawned rather than forked: the API process runs threads and
+    holds open database connections, neither of which may leak into a child."""
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.hash_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_hash_pool():
+    """Stop the shared hashing pool, if it was started."""
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def hash_passwords(passwords, workers: int = None):
+    """Hash passwords in order, on the shared pool unless workers is 1 or the batch is small."""
+    workers = workers or settings.hash_workers
+    if workers <= 1 or len(passwords) < POOL_THRESHOLD:
+        return [hash_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (settings.hash_workers * 4))
+    return list(_hash_pool().map(hash_password, passwords, chunksize=chunksize))
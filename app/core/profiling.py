@@ -0,0 +1,178 @@
+"""A statistical profiler for single requests, and the store of recent profiles.
+
+While a profiled request runs, a sampler thread reads every thread's current
+stack at a fixed interval and counts identical stacks. Threads that are idle,
+waiting on a lock, a queue or the event loop's selector, are left out, so the
+samples show where the request's event loop and worker threads spent their
+time. Other requests being served concurrently by the same worker appear too;
+profile on a quiet worker, or compare several profiles.
+
+Profiles are kept as folded stacks ("frame;frame;frame count"), the input of
+flamegraph.pl and inferno and a format speedscope imports, and can be
+converted to speedscope's own JSON."""
+import collections
+import os
+import sys
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+
+# Innermost frames of a thread with nothing to do, by file name and function
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Sample the stacks of every busy thread until stopped."""
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.samples = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        """Start sampling in a background thread."""
+        self._thread.start()
+
+    def stop(self) -> collections.Counter:
+        """Stop sampling and return the count of each stack, as tuples of frame names."""
+        self._stopped.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stopped.wait(self.interval):
+            for ident, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if ident == me:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                if ident not in names:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread {ident}"))
+                self.samples[tuple(reversed(stack))] += 1
+        for stack in list(self.samples):
+            named = (stack[0],) + tuple(_frame_name(code) for code in stack[1:])
+            self.samples[named] += self.samples.pop(stack)
+
+
+def new_profile_id() -> str:
+    """Return an id for a profile, known before the request it profiles has finished."""
+    return uuid.uuid4().hex[:12]
+
+
+class Profile:
+    """One profiled request: what was served, how long it took and its folded stacks."""
+
+    def __init__(self, profile_id: str, method: str, path: str, route: str, status: int,
+                 duration: float, interval: float, samples):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self.id = profile_id
+        self.created = time.time()
+        self.method = method
+        self.path = path
+        self.route = route
+        self.status = status
+        self.duration = duration
+        self.interval = interval
+        self.samples = samples
+
+    def summary(self) -> dict:
+        """Describe the profile without its stacks."""
+        return {
+            "id": self.id, "created": self.created, "method": self.method, "path": self.path,
+            "route": self.route, "status": self.status, "duration_ms": self.duration * 1000,
+            "samples": sum(self.samples.values()),
+        }
+
+    def folded(self) -> str:
+        """Render the stacks in the folded format, one "frame;frame count" line each."""
+        return "".join(f"{';'.join(stack)} {count}\n"
+                       for stack, count in sorted(self.samples.items()))
+
+    def speedscope(self) -> dict:
+        """Render the stacks as a speedscope sampled profile, weighted in milliseconds."""
+        frames, index, samples, weights = [], {}, [], []
+        for stack, count in sorted(self.samples.items()):
+            for name in stack:
+                if name not in index:
+                    index[name] = len(frames)
+                    frames.append({"name": name})
+            samples.append([index[name] for name in stack])
+            weights.append(count * self.interval * 1000)
+        name = f"{self.method} {self.path}"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "codedarasa",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled", "name": name, "unit": "milliseconds",
+                "startValue": 0, "endValue": sum(weights),
+                "samples": samples, "weights": weights,
+            }],
+        }
+
+
+class ProfileStore:
+    """The most recent profiles of this worker, also written as .folded files to directory."""
+
+    def __init__(self, keep: int = 50, directory: str = ""):
+        self.keep = keep
+        self.directory = directory
+        self._profiles = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile):
+        """Keep a profile, dropping (and deleting the file of) the oldest beyond keep."""
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path(profile.id), "w", encoding="utf-8") as file:
+                file.write(profile.folded())
+        with self._lock:
+            self._profiles[profile.id] = profile
+            dropped = []
+            while len(self._profiles) > self.keep:
+                dropped.append(self._profiles.popitem(last=False)[0])
+        for profile_id in dropped:
+            if self.directory:
+                try:
+                    os.remove(self.path(profile_id))
+                except FileNotFoundError:
+                    pass
+
+    def path(self, profile_id: str) -> str:
+        """Return the file a profile is written to."""
+        return os.path.join(self.directory, f"{profile_id}.folded")
+
+    def get(self, profile_id: str):
+        """Return a kept profile, or None."""
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self):
+        """Return the kept profiles, newest first."""
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore(keep=settings.profile_keep, directory=settings.profile_dir)
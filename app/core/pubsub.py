@@ -0,0 +1,171 @@
+"""In-process pub/sub hub used to push live comment events to streaming clients."""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Queued in place of an event when a subscriber falls too far behind
+DROPPED = object()
+
+
+class Subscription:
+    """A single consumer of one topic, backed by a bounded asyncio queue."""
+
+    def __init__(self, hub, topic: str, max_queue: int):
+        self.hub = hub
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue + 1)
+        self.max_queue = max_queue
+        self.dropped = False
+
+    def offer(self, event):
+        """Enqueue an event on the subscriber's loop, dropping the subscriber if it is full."""
+        if self.dropped:
+            return
+        if self.queue.qsize() >= self.max_queue:
+            self.dropped = True
+            self.queue.put_nowait(DROPPED)
+            self.hub.unsubscribe(self)
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float = None):
+        """Wait for the next event; returns DROPPED once the subscriber has been cut off."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class MemoryBackend:
+    """Delivers published events to subscribers of this process only."""
+
+    def __init__(self):
+        self.hub = None
+
+    def bind(self, hub):
+        """Attach the backend to the hub it delivers to."""
+        self.hub = hub
+
+    def start(self):
+        """Nothing to start for in-process delivery."""
+
+    def publish(self, topic: str, event: dict):
+        """Deliver the event straight to local subscribers."""
+        self.hub.deliver(topic, event)
+
+
+class PostgresBackend:
+    """Fans events out to every worker through Postgres LISTEN/NOTIFY."""
+
+    def __init__(self, engine, channel: str = "comment_events"):
+        # pylint: disable=import-outside-toplevel
+        from app.db.notify import PgListener
+
+        self.engine = engine
+        self.channel = channel
+        self.hub = None
+        self.listener = PgListener(engine, channel, self._on_notify)
+
+    def bind(self, hub):
+        """Attach the backend to the hub it delivers to."""
+        self.hub = hub
+
+    def start(self):
+        """Start the LISTEN thread for this worker."""
+        self.listener.start()
+
+    def publish(self, topic: str, event: dict):
+        """NOTIFY all workers, including this one, about the event."""
+        # pylint: disable=import-outside-toplevel
+        from app.db.notify import MAX_PAYLOAD_BYTES, pg_notify
+
+        payload = json.dumps({"topic": topic, "event": event})
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            # Too large for NOTIFY: send a reference and let clients refetch
+            event = {"type": event["type"], "comment": {
+                "id": event["comment"]["id"], "course_id": event["comment"]["course_id"]
+            }, "truncated": True}
+            payload = json.dumps({"topic": topic, "event": event})
+        pg_notify(self.engine, self.channel, payload)
+
+    def _on_notify(self, payload: str):
+        """Hand a NOTIFY payload to the local hub."""
+        message = json.loads(payload)
+        self.hub.deliver(message["topic"], message["event"])
+
+
+class Hub:
+    """Topic-based pub/sub with bounded per-subscriber queues.
+
+    Publishing is safe from any thread; events are handed to each subscriber's
+    event loop. Subscribers whose queue is full are dropped rather than allowed
+    to slow down publishers or grow without bound."""
+
+    def __init__(self, backend=None, max_queue: int = 100):
+        self.backend = backend or MemoryBackend()
+        self.backend.bind(self)
+        self.max_queue = max_queue
+        self._topics = defaultdict(set)
+        self._lock = threading.Lock()
+        self._started = False
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Register a new subscriber for the topic; must be called from an event loop."""
+        if not self._started:
+            self.backend.start()
+            self._started = True
+        subscription = Subscription(self, topic, self.max_queue)
+        with self._lock:
+            self._topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber; unknown subscribers are ignored."""
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[subscription.topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        """Return the number of live subscribers for the topic."""
+        with self._lock:
+            return len(self._topics.get(topic, ()))
+
+    def publish(self, topic: str, event: dict):
+        """Publish an event through the configured backend."""
+        try:
+            self.backend.publish(topic, event)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Live updates are best effort; never fail the write that triggered them
+            logger.exception("Failed to publish event on %s", topic)
+
+    def deliver(self, topic: str, event: dict):
+        """Hand an event to every local subscriber of the topic."""
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The subscriber's event loop is gone
+                self.unsubscribe(subscription)
+
+
+def build_backend(name: str):
+    """Return the pub/sub backend configured by name ("memory" or "postgres")."""
+    if name == "postgres":
+        # pylint: disable=import-outside-toplevel
+        from app.db.session import engine
+
+        return PostgresBackend(engine)
+    return MemoryBackend()
+
+
+comment_hub = Hub(build_backend(settings.pubsub_backend), max_queue=settings.stream_queue_size)
@@ -0,0 +1,91 @@
+"""Request coalescing: concurrent identical reads share one in-flight call."""
+import threading
+
+from app.core.config import settings
+
+
+class _Call:
+    """One in-flight call and the outcome its followers wait for."""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time within this worker.
+
+    The first caller of a key runs the function; callers arriving while it
+    is in flight wait and receive the same result, or the same exception.
+    Nothing is remembered once the call returns, so this only deduplicates
+    concurrent work and never serves stale data. Disabled groups run every
+    call directly and count nothing."""
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self.executed = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """Return function(), sharing the call with concurrent callers of the same key."""
+        if not self.enabled:
+            return function()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = function()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        """Return the group's configuration and counters."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "enabled": self.enabled,
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def flight_group(name: str) -> SingleFlight:
+    """Return the coalescing group for a route, enabled if listed in COALESCE_ROUTES."""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name, name in settings.coalesce_routes)
+        return group
+
+
+def flight_stats():
+    """Return the stats of every coalescing group, by name."""
+    with _groups_lock:
+        groups = sorted(_groups.values(), key=lambda group: group.name)
+    return [group.stats() for group in groups]
@@ -0,0 +1,196 @@
+"""Slow query log: statements over a threshold, with their plans, grouped by fingerprint.
+
+Engine hooks time every statement. One that takes at least the threshold is
+handed to a background thread with its parameters, duration and route; the
+thread logs it and adds it to a table keyed by the statement's fingerprint,
+its SQL with literals and placeholder lists normalized away, so the same query
+with different values or IN-list lengths counts as one. The first time a
+fingerprint is seen the thread runs EXPLAIN (never ANALYZE) for it on a
+connection of its own: the request is not slowed down, and a failing EXPLAIN
+cannot abort the request's transaction.
+
+The table keeps the top_k fingerprints by total time spent."""
+import hashlib
+import logging
+import queue
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import current_route
+
+logger = logging.getLogger(__name__)
+
+# Statements worth an EXPLAIN; anything else (BEGIN, SAVEPOINT, LISTEN) only gets logged
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+# Longest parameter rendering kept with an example
+MAX_PARAMETERS_LENGTH = 500
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|%s|(?<![:\w]):\w+|\$\d+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Return statement with literals and placeholders as ? and IN lists as (...)."""
+    normalized = _STRING.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(...)", normalized)
+    return _SPACE.sub(" ", normalized).strip()
+
+
+def fingerprint(normalized: str) -> str:
+    """Return a short stable id for a normalized statement."""
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def explain_prefix(dialect: str) -> str:
+    """Return the EXPLAIN prefix that plans a statement without running it."""
+    if dialect == "postgresql":
+        return "EXPLAIN (ANALYZE off) "
+    if dialect == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    return "EXPLAIN "
+
+
+class SlowQueryLog:
+    """Log statements slower than threshold_ms and keep the top_k by total time.
+
+    A negative threshold turns the log off; zero logs every statement."""
+
+    def __init__(self, threshold_ms: float = 200, top_k: int = 50, queue_size: int = 1000):
+        self.threshold = threshold_ms / 1000
+        self.top_k = top_k
+        self.engine = None
+        self.dropped = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether statements are being timed against the threshold."""
+        return self.threshold >= 0
+
+    def instrument(self, engine):
+        """Time every statement the engine executes; EXPLAINs run on the same engine."""
+        self.engine = engine
+        if not self.enabled:
+            return
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            # pylint: disable=unused-argument,too-many-arguments,too-many-positional-arguments
+            conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            # pylint: disable=unused-argument,too-many-arguments,too-many-positional-arguments
+            elapsed = time.perf_counter() - conn.info["slow_query_started"].pop()
+            if elapsed >= self.threshold:
+                self.record(statement, None if executemany else parameters, elapsed,
+                            current_route())
+
+        @event.listens_for(engine, "handle_error")
+        def _error(context):
+            started = (context.connection.info.get("slow_query_started")
+                       if context.connection else None)
+            if started:
+                started.pop()
+
+    def record(self, statement: str, parameters, elapsed: float, route: str):
+        """Queue a slow statement for the background thread; dropped if it is behind."""
+        if statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="slow-query-log", daemon=True
+                    )
+                    self._thread.start()
+        try:
+            self._queue.put_nowait((statement, parameters, elapsed, route))
+        except queue.Full:
+            self.dropped += 1
+
+    def drain(self):
+        """Wait until every queued statement has been logged and explained."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            statement, parameters, elapsed, route = self._queue.get()
+            try:
+                self._process(statement, parameters, elapsed, route)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Could not record a slow query")
+            finally:
+                self._queue.task_done()
+
+    def _process(self, statement, parameters, elapsed, route):
+        normalized = normalize(statement)
+        key = fingerprint(normalized)
+        rendered = repr(parameters)[:MAX_PARAMETERS_LENGTH]
+        with self._lock:
+            entry = self._entries.get(key)
+            plan = entry["plan"] if entry else None
+        if plan is None:
+            plan = self._explain(statement, parameters)
+        with self._lock:
+            entry = self._entries.setdefault(key, {
+                "fingerprint": key, "statement": normalized, "calls": 0, "total_ms": 0.0,
+                "max_ms": 0.0, "routes": [], "plan": None, "first_seen": time.time(),
+            })
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed * 1000
+            entry["max_ms"] = max(entry["max_ms"], elapsed * 1000)
+            entry["last_ms"] = elapsed * 1000
+            entry["last_seen"] = time.time()
+            entry["parameters"] = rendered
+            entry["plan"] = entry["plan"] or plan
+            if route not in entry["routes"]:
+                entry["routes"].append(route)
+            while len(self._entries) > self.top_k:
+                del self._entries[min(self._entries, key=lambda k: self._entries[k]["total_ms"])]
+        logger.warning("Slow query %.1fms on %s [%s]: %s\nParameters: %s\nPlan:\n%s",
+                       elapsed * 1000, route, key, " ".join(statement.split()), rendered,
+                       plan or "(not available)")
+
+    def _explain(self, statement: str, parameters):
+        """Return the plan of statement as text, or None if it cannot be explained."""
+        if self.engine is None or parameters is None:
+            return None
+        if statement.split(None, 1)[0].lower() not in EXPLAINABLE:
+            return None
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.exec_driver_sql(
+                    explain_prefix(self.engine.dialect.name) + statement, parameters
+                ).all()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.debug("Could not EXPLAIN a slow query", exc_info=True)
+            return None
+        # Postgres returns one line of text per row; SQLite the step's detail in the last column
+        return "\n".join(str(row[-1]) for row in rows)
+
+    def top(self, limit: int = None):
+        """Return the recorded fingerprints, most total time first."""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e["total_ms"], reverse=True)
+            return [dict(entry, routes=list(entry["routes"])) for entry in entries[:limit]]
+
+    def clear(self):
+        """Forget every recorded fingerprint."""
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(threshold_ms=settings.slow_query_ms, top_k=settings.slow_query_top)
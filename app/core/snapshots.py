@@ -0,0 +1,114 @@
+"""In-memory snapshots of rarely changing, frequently read data."""
+import threading
+import time
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.models.category import Category
+from app.db.models.course import Course
+
+
+def category_counts_query():
+    """Select every category's columns together with its course count in one aggregate."""
+    return (
+        select(
+            Category.id,
+            Category.name,
+            Category.description,
+            Category.parent_id,
+            func.count(Course.id).label("course_count"),
+        )
+        .outerjoin(Course, Course.category_id == Category.id)
+        .group_by(Category.id)
+        .order_by(Category.id)
+    )
+
+
+class CategorySnapshot:
+    """Immutable snapshot of the category list, rebuilt lazily after invalidation.
+
+    Readers get the current snapshot without touching the database. Writers call
+    invalidate() after commit; the next reader rebuilds it with one aggregate
+    query for categories and course counts and one windowed query for the first
+    course briefs of each category. A rebuild that races with an invalidation is
+    returned to its caller but not kept.
+
+    Entries are stored as plain dicts shaped like CategoryOut so they can be
+    encoded directly, without a model round trip per request.
+
+    With several workers, writes reach the others through the invalidation
+    bus. A snapshot is also rebuilt once it is older than max_age seconds,
+    which bounds how long a worker serves stale data if the bus is down."""
+
+    def __init__(self, max_age: float = None):
+        self.max_age = settings.snapshot_max_age_seconds if max_age is None else max_age
+        self._snapshot = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._state_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def invalidate(self):
+        """Discard the current snapshot."""
+        with self._state_lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def get(self, db, include_courses: bool = False, courses_limit: int = None):
+        """Return the category list, rebuilding it from the database if needed."""
+        categories, briefs = self._current(db)
+        if not include_courses:
+            return categories
+        limit = courses_limit or settings.max_embedded_courses
+        return [
+            {**category, "courses": list(briefs.get(category["id"], ())[:limit])}
+            for category in categories
+        ]
+
+    def _current(self, db):
+        """Return the current (categories, briefs) pair, building it if missing."""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._expired():
+            return snapshot
+        with self._build_lock:
+            with self._state_lock:
+                generation = self._generation
+                if self._snapshot is not None and not self._expired():
+                    return self._snapshot
+            snapshot = self._build(db)
+            with self._state_lock:
+                if generation == self._generation:
+                    self._snapshot = snapshot
+                    self._built_at = time.monotonic()
+        return snapshot
+
+    def _expired(self) -> bool:
+        """Return whether the current snapshot has outlived max_age."""
+        return time.monotonic() - self._built_at >= self.max_age
+
+    @staticmethod
+    def _build(db):
+        """Load categories with course counts and each category's first course briefs."""
+        categories = tuple(
+            {**row._asdict(), "courses": []} for row in db.execute(category_counts_query())
+        )
+        ranked = select(
+            Course.id,
+            Course.title,
+            Course.category_id,
+            func.row_number()
+            .over(partition_by=Course.category_id, order_by=Course.id)
+            .label("position"),
+        ).where(Course.category_id.is_not(None)).subquery()
+        briefs = {}
+        for row in db.execute(
+            select(ranked.c.id, ranked.c.title, ranked.c.category_id)
+            .where(ranked.c.position <= settings.max_embedded_courses)
+            .order_by(ranked.c.category_id, ranked.c.id)
+        ):
+            briefs.setdefault(row.category_id, []).append({"id": row.id, "title": row.title})
+        return categories, {key: tuple(value) for key, value in briefs.items()}
+
+
+category_snapshot = CategorySnapshot()
@@ -0,0 +1,162 @@
+"""Per-request phase timings, reported to the client in a Server-Timing header.
+
+The middleware opens a RequestTimings for every request and publishes it in a
+context variable; the phases add to it from wherever they run, including the
+worker threads sync endpoints are run in, since those copy the context:
+
+- auth: decoding and verifying the bearer token (get_current_user)
+- db: every statement executed while serving the request (engine hooks)
+- serialize: turning the endpoint's return value into the response body,
+  timed from FastAPI's own serialization operation and the response cache
+
+FastAPI reports its operations to an OpenTelemetry tracer; the tracer here
+records none of them, it only times the ones named in OPERATION_METRICS."""
+import contextlib
+import contextvars
+import logging
+import time
+
+from opentelemetry import trace
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# FastAPI operation spans that are timed, by the Server-Timing metric they count towards
+OPERATION_METRICS = {"fastapi.serialization": "serialize"}
+# Order of the metrics in the header; anything else follows in the order first timed
+METRIC_ORDER = ("auth", "db", "serialize")
+
+# The timings of the request being served; None outside requests
+request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Seconds spent per phase of one request, and how many times each ran.
+
+    queries, when enabled, also keeps every statement with its parameters and
+    duration for the debug query log."""
+
+    def __init__(self, log_queries: bool = False):
+        self.started = time.perf_counter()
+        self.durations = {}
+        self.counts = {}
+        self.queries = [] if log_queries else None
+
+    def add(self, name: str, seconds: float):
+        """Add one run of a phase."""
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def header(self) -> str:
+        """Render the Server-Timing header value, in milliseconds, ending with the total."""
+        names = [name for name in METRIC_ORDER if name in self.durations]
+        names.extend(name for name in self.durations if name not in METRIC_ORDER)
+        parts = []
+        for name in names:
+            part = f"{name};dur={self.durations[name] * 1000:.2f}"
+            if name == "db":
+                part += f';desc="{self.counts[name]} queries"'
+            parts.append(part)
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+@contextlib.contextmanager
+def timed(name: str):
+    """Add the time spent in the block to the current request's phase name, if any."""
+    timings = request_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def instrument_engine(engine):
+    """Time every statement the engine executes for the request being served."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        # pylint: disable=unused-argument,too-many-arguments,too-many-positional-arguments
+        if request_timings.get() is not None:
+            conn.info.setdefault("timing_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        # pylint: disable=unused-argument,too-many-arguments,too-many-positional-arguments
+        timings = request_timings.get()
+        if timings is None:
+            return
+        elapsed = time.perf_counter() - conn.info["timing_started"].pop()
+        timings.add("db", elapsed)
+        if timings.queries is not None:
+            timings.queries.append((statement, parameters, elapsed))
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("timing_started") if context.connection else None
+        if started:
+            started.pop()
+
+
+def log_queries(method: str, path: str, timings: RequestTimings):
+    """Log the statements one request executed, slowest first; the debug query log."""
+    queries = sorted(timings.queries, key=lambda query: query[2], reverse=True)
+    lines = [f"{method} {path}: {len(queries)} queries in "
+             f"{timings.durations.get('db', 0.0) * 1000:.2f}ms"]
+    for statement, parameters, elapsed in queries:
+        lines.append(f"  {elapsed * 1000:.2f}ms {' '.join(statement.split())} {parameters!r}")
+    logger.info("\n".join(lines))
+
+
+class OperationSpan(trace.NonRecordingSpan):
+    """A span that records nothing but its duration, into the request's timings."""
+
+    def __init__(self, metric: str, context: trace.SpanContext = trace.INVALID_SPAN_CONTEXT):
+        super().__init__(context)
+        self.metric = metric
+        self.timings = request_timings.get()
+        self.started = time.perf_counter()
+
+    def end(self, end_time=None):
+        if self.timings is not None:
+            self.timings.add(self.metric, time.perf_counter() - self.started)
+
+
+class OperationTracer(trace.Tracer):
+    """Times the FastAPI operations in OPERATION_METRICS; every other span is a no-op."""
+
+    def start_span(self, name, context=None, kind=trace.SpanKind.INTERNAL, attributes=None,
+                   links=None, start_time=None, record_exception=True,
+                   set_status_on_exception=True):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments,unused-argument
+        metric = OPERATION_METRICS.get(name)
+        return trace.INVALID_SPAN if metric is None else OperationSpan(metric)
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name, context=None, kind=trace.SpanKind.INTERNAL,
+                              attributes=None, links=None, start_time=None,
+                              record_exception=True, set_status_on_exception=True,
+                              end_on_exit=True):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        span = self.start_span(name, context, kind, attributes, links, start_time)
+        with trace.use_span(span, end_on_exit=end_on_exit, record_exception=record_exception,
+                            set_status_on_exception=set_status_on_exception):
+            yield span
+
+
+class OperationTracerProvider(trace.TracerProvider):
+    """Hands FastAPI the operation tracer; passed as its telemetry tracer_provider."""
+
+    def __init__(self):
+        self._tracer = OperationTracer()
+
+    def get_tracer(self, instrumenting_module_name, *args, **kwargs):
+        # pylint: disable=unused-argument
+        return self._tracer
+
+
+operation_tracer_provider = OperationTracerProvider()
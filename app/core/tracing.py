@@ -0,0 +1,241 @@
+"""Request tracing: spans for each request and its steps, exported locally.
+
+FastAPI opens a server span per request, continuing the trace of an incoming
+W3C traceparent header, and child spans for resolving dependencies, running
+the endpoint and serializing the response. The app adds spans for get_db (the
+session's lifetime), get_current_user, every SQL statement and the response
+cache's serialization.
+
+The tracer here implements the OpenTelemetry API without its SDK or a
+collector: finished spans go to an exporter, an in-memory ring buffer (the
+default, served to admins at /admin/traces/{trace_id}) or a JSON Lines file.
+
+Sampling follows the parent: a request whose traceparent is sampled is traced,
+one whose traceparent is not is not, and TRACE_SAMPLE_RATE of the requests
+without one start a trace. Spans of an unsampled request are not recorded;
+they still time FastAPI's serialization for the Server-Timing header."""
+import collections
+import random
+import threading
+import time
+
+import orjson
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.timing import OPERATION_METRICS, OperationSpan, OperationTracer, request_timings
+
+
+class MemoryExporter:
+    """Keeps the latest finished spans in memory, for the admin view and tests."""
+
+    def __init__(self, size: int = 10000):
+        self._spans = collections.deque(maxlen=size)
+
+    def export(self, span: "Span"):
+        """Keep a finished span, forgetting the oldest once full."""
+        self._spans.append(span)
+
+    def spans(self, trace_id: str = None):
+        """Return the kept spans as dicts, of one trace if given, in the order they ended."""
+        return [span.to_dict() for span in list(self._spans)
+                if trace_id is None or span.trace_id == trace_id]
+
+    def clear(self):
+        """Forget every kept span."""
+        self._spans.clear()
+
+
+class FileExporter:
+    """Appends each finished span to a JSON Lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: "Span"):
+        """Write a finished span as one line."""
+        line = orjson.dumps(span.to_dict(), default=str) + b"\n"
+        with self._lock, open(self.path, "ab") as file:
+            file.write(line)
+
+
+class Span(trace.Span):
+    """A recorded span: its identity, timing, attributes, events and status."""
+
+    def __init__(self, tracer: "Tracer", name: str, context: trace.SpanContext,
+                 parent_id: int = None, kind: SpanKind = SpanKind.INTERNAL, attributes=None,
+                 start_time: int = None):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self.tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.status = Status(StatusCode.UNSET)
+        self.start_time = start_time or time.time_ns()
+        self.end_time = None
+        # FastAPI's serialization span also counts towards Server-Timing
+        self.metric = OPERATION_METRICS.get(name)
+        self.timings = request_timings.get() if self.metric else None
+        self.started = time.perf_counter()
+
+    @property
+    def trace_id(self) -> str:
+        """The trace id as 32 hex digits, as in traceparent."""
+        return trace.format_trace_id(self.context.trace_id)
+
+    def get_span_context(self):
+        return self.context
+
+    def is_recording(self) -> bool:
+        return self.end_time is None
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def add_event(self, name, attributes=None, timestamp=None):
+        self.events.append({"name": name, "time": timestamp or time.time_ns(),
+                            "attributes": dict(attributes or {})})
+
+    def add_link(self, context, attributes=None):
+        """Links are not kept."""
+
+    def update_name(self, name):
+        self.name = name
+
+    def set_status(self, status, description=None):
+        if isinstance(status, Status):
+            self.status = status
+        else:
+            self.status = Status(status, description)
+
+    def record_exception(self, exception, attributes=None, timestamp=None, escaped=False):
+        self.add_event("exception", {"exception.type": type(exception).__qualname__,
+                                     "exception.message": str(exception),
+                                     **(attributes or {})}, timestamp)
+
+    def end(self, end_time=None):
+        if self.end_time is not None:
+            return
+        self.end_time = end_time or time.time_ns()
+        if self.timings is not None:
+            self.timings.add(self.metric, time.perf_counter() - self.started)
+        self.tracer.exporter.export(self)
+
+    def to_dict(self) -> dict:
+        """Return the span as JSON-ready data; ids in hex, times in epoch nanoseconds."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": trace.format_span_id(self.context.span_id),
+            "parent_id": None if self.parent_id is None else trace.format_span_id(self.parent_id),
+            "name": self.name,
+            "kind": self.kind.name,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_ms": None if self.end_time is None
+            else (self.end_time - self.start_time) / 1e6,
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": self.status.status_code.name,
+        }
+
+
+class Tracer(OperationTracer):
+    """Records sampled spans to the exporter; unsampled ones only propagate the decision."""
+
+    def __init__(self, exporter, sample_rate: float = 0.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_span(self, name, context=None, kind=SpanKind.INTERNAL, attributes=None,
+                   links=None, start_time=None, record_exception=True,
+                   set_status_on_exception=True):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments,unused-argument
+        parent = trace.get_current_span(context).get_span_context()
+        if parent.is_valid:
+            trace_id, sampled = parent.trace_id, parent.trace_flags.sampled
+        else:
+            trace_id = random.getrandbits(128) or 1
+            sampled = random.random() < self.sample_rate
+        span_context = trace.SpanContext(
+            trace_id, random.getrandbits(64) or 1, is_remote=False,
+            trace_flags=trace.TraceFlags(trace.TraceFlags.SAMPLED if sampled
+                                         else trace.TraceFlags.DEFAULT),
+        )
+        if sampled:
+            return Span(self, name, span_context, parent.span_id if parent.is_valid else None,
+                        kind, attributes, start_time)
+        metric = OPERATION_METRICS.get(name)
+        # Children of an unsampled span find its decision in the context and follow it
+        return (trace.NonRecordingSpan(span_context) if metric is None
+                else OperationSpan(metric, span_context))
+
+
+class TracerProvider(trace.TracerProvider):
+    """Hands FastAPI and the app the one tracer; passed as FastAPI's telemetry tracer_provider."""
+
+    def __init__(self, tracer: Tracer):
+        self._tracer = tracer
+
+    def get_tracer(self, instrumenting_module_name, *args, **kwargs):
+        # pylint: disable=unused-argument
+        return self._tracer
+
+
+def instrument_engine(engine, span_tracer: trace.Tracer):
+    """Record a client span for every statement executed within a recorded span."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        # pylint: disable=unused-argument,too-many-arguments,too-many-positional-arguments
+        span = None
+        if trace.get_current_span().is_recording():
+            operation = statement.split(None, 1)[0].upper() if statement.strip() else "SQL"
+            span = span_tracer.start_span(operation, kind=SpanKind.CLIENT, attributes={
+                "db.system.name": engine.dialect.name,
+                "db.operation.name": operation,
+                "db.query.text": statement,
+            })
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        # pylint: disable=unused-argument,too-many-arguments,too-many-positional-arguments
+        span = conn.info["trace_spans"].pop()
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.response.returned_rows", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        spans = context.connection.info.get("trace_spans") if context.connection else None
+        span = spans.pop() if spans else None
+        if span is not None:
+            span.record_exception(context.original_exception)
+            span.set_status(StatusCode.ERROR)
+            span.end()
+
+
+def make_exporter(name: str):
+    """Return the exporter TRACE_EXPORTER names, or None when tracing is off."""
+    if name == "memory":
+        return MemoryExporter(settings.trace_buffer)
+    if name == "file":
+        return FileExporter(settings.trace_file)
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown trace exporter: {name}")
+
+
+exporter = make_exporter(settings.trace_exporter)
+tracer = Tracer(exporter, settings.trace_sample_rate) if exporter else trace.NoOpTracer()
+tracer_provider = TracerProvider(tracer) if exporter else None
@@ -0,0 +1,14 @@
+"""Helpers for the denormalized counters kept on courses."""
+from app.db.models.course import Course
+
+
+def adjust_course_counters(db, course_id: int, **deltas):
+    """Add deltas to a course's counters, e.g. comment_count=1, in the current transaction.
+
+    Course.updated_at has an onupdate default; it is assigned to itself here so
+    that comments and ratings on a course do not count as edits to it."""
+    values = {getattr(Course, name): getattr(Course, name) + delta for name, delta in deltas.items()}
+    values[Course.updated_at] = Course.updated_at
+    db.query(Course)\
+        .filter(Course.id == course_id)\
+        .update(values, synchronize_session=False)
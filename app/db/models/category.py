@@ -1,5 +1,5 @@
 """Category model for the course management system."""
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -19,10 +19,14 @@ class Category(Base):
             "id": self.id,
             "name": self.name,
             "description": self.description,
+            "parent_id": self.parent_id,
             "courses": [course.id for course in self.courses] if self.courses else []
         }
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     description = Column(String, nullable=True)
+    parent_id = Column(
+        Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True, index=True
+    )
     courses = relationship("Course", back_populates="category")
@@ -0,0 +1,23 @@
+"""Closure table recording every ancestor/descendant pair of the category tree."""
+from sqlalchemy import Column, ForeignKey, Integer, select
+
+from app.db.base import Base
+
+
+class CategoryClosure(Base):
+    """One row per (ancestor, descendant) pair, including each category with itself."""
+    __tablename__ = "category_closure"
+
+    ancestor_id = Column(
+        Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id = Column(
+        Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    depth = Column(Integer, nullable=False)
+
+
+def category_subtree(category_id: int):
+    """Select the IDs of a category and all of its descendants from the closure table."""
+    return select(CategoryClosure.descendant_id)\
+        .where(CategoryClosure.ancestor_id == category_id)
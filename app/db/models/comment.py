@@ -1,5 +1,5 @@
 """Comment model for the application."""
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -31,3 +31,5 @@ class Comment(Base):
 
     user = relationship("User")
     course = relationship("Course")
+
+    __table_args__ = (Index("ix_comments_user_id_created_at", "user_id", "created_at", "id"),)
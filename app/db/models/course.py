@@ -1,5 +1,5 @@
 """Course model for the database."""
-from sqlalchemy import Column, DateTime, func, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, func, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -26,6 +26,9 @@ class Course(Base):
             "creator": self.creator.to_dict() if self.creator else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "comment_count": self.comment_count,
+            "rating_count": self.rating_count,
+            "rating_sum": self.rating_sum,
         }
 
     id = Column(Integer, primary_key=True, index=True)
@@ -38,3 +41,15 @@ class Course(Base):
     creator = relationship("User", back_populates="courses")
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    # Denormalized counters, kept in step by the comment and rating routes
+    comment_count = Column(Integer, nullable=False, server_default="0", default=0)
+    rating_count = Column(Integer, nullable=False, server_default="0", default=0)
+    rating_sum = Column(Integer, nullable=False, server_default="0", default=0)
+
+    __table_args__ = (
+        # Serves per-category listings ordered by id (keyset pagination) and counts
+        Index("ix_courses_category_id_id", "category_id", "id"),
+        # Serves the per-user activity feed
+        Index("ix_courses_creator_id_created_at", "creator_id", "created_at", "id"),
+    )
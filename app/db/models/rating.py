@@ -1,5 +1,5 @@
 """Rating model for storing user ratings of courses."""
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -18,15 +18,20 @@ class Rating(Base):
         return {
             "id": self.id,
             "value": self.value,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
             "user_id": self.user_id,
             "course_id": self.course_id
         }
 
     id = Column(Integer, primary_key=True, index=True)
     value = Column(Integer, nullable=False)  # 1-5
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
 
     user = relationship("User")
     course = relationship("Course")
-    __table_args__ = (UniqueConstraint('user_id', 'course_id', name='_user_course_uc'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'course_id', name='_user_course_uc'),
+        Index("ix_ratings_user_id_created_at", "user_id", "created_at", "id"),
+    )
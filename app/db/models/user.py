@@ -1,7 +1,7 @@
 """User model for the application."""
 from enum import Enum as PyEnum
 
-from sqlalchemy import Column, Integer, String, Enum as SQLEnum
+from sqlalchemy import Column, Index, Integer, String, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -44,3 +44,12 @@ class User(Base):
         default=UserRole.USER
     )
     courses = relationship("Course", back_populates="creator")
+
+    __table_args__ = (
+        # Serves username prefix filters (LIKE 'p%') on Postgres whatever the database
+        # collation; the plain ix_users_username only does so under the C collation
+        Index(
+            "ix_users_username_pattern", "username",
+            postgresql_ops={"username": "varchar_pattern_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
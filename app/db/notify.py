@@ -0,0 +1,83 @@
+"""Postgres LISTEN/NOTIFY helpers shared by the cross-worker fan-out backends."""
+import logging
+import select
+import threading
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7900
+
+
+def pg_notify(engine, channel: str, payload: str):
+    """Send a NOTIFY on the given channel using a short-lived autocommit connection."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                     {"channel": channel, "payload": payload})
+
+
+class PgListener:
+    """Background thread that LISTENs on a channel and hands payloads to a callback.
+
+    Notifications sent while the connection is down are lost; on_reconnect, if
+    given, is called each time LISTEN is re-established after a failure so the
+    owner can resynchronise."""
+
+    def __init__(self, engine, channel: str, callback, poll_interval: float = 1.0,
+                 on_reconnect=None):
+        self.engine = engine
+        self.channel = channel
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.on_reconnect = on_reconnect
+        self._listened = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start listening, once; later calls are no-ops."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name=f"pg-listen-{self.channel}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Ask the listener thread to exit and wait for it."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval * 2)
+            self._thread = None
+
+    def _run(self):
+        """Listen loop; reconnects after connection errors until stopped."""
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("LISTEN %s failed, reconnecting", self.channel)
+                self._stop.wait(self.poll_interval)
+
+    def _listen(self):
+        """Hold one raw DBAPI connection in LISTEN mode and dispatch notifications."""
+        raw = self.engine.raw_connection()
+        try:
+            dbapi_conn = raw.driver_connection
+            dbapi_conn.autocommit = True
+            with dbapi_conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            if self._listened and self.on_reconnect is not None:
+                self.on_reconnect()
+            self._listened = True
+            while not self._stop.is_set():
+                if select.select([dbapi_conn], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                dbapi_conn.poll()
+                while dbapi_conn.notifies:
+                    notification = dbapi_conn.notifies.pop(0)
+                    self.callback(notification.payload)
+        finally:
+            raw.close()
@@ -0,0 +1,138 @@
+"""Read-only query layer returning lightweight rows instead of ORM instances.
+
+Each reader selects only the columns its response needs and runs the statement
+on the session's connection, so no mapped objects are built, nothing enters the
+identity map and nothing is tracked for flushes. Results are slotted dataclasses
+shaped like the matching response schemas: orjson encodes them natively and
+Pydantic validates them with from_attributes."""
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from app.db.models.comment import Comment
+from app.db.models.course import Course
+from app.db.models.rating import Rating
+from app.db.models.user import User, UserRole
+
+
+@dataclass(slots=True)
+class UserRow:
+    """A user, shaped like UserOut."""
+    id: int
+    username: str
+    full_name: Optional[str]
+    bio: Optional[str]
+    role: UserRole
+
+
+@dataclass(slots=True)
+class CourseRow:
+    """A course with its creator, shaped like CourseOut."""
+    id: int
+    title: str
+    description: Optional[str]
+    youtube_url: str
+    category_id: Optional[int]
+    created_at: datetime
+    comment_count: int
+    rating_count: int
+    rating_sum: int
+    creator: UserRow
+
+
+@dataclass(slots=True)
+class CommentRow:
+    """A comment, shaped like CommentOut."""
+    id: int
+    content: str
+    created_at: datetime
+    user_id: int
+    course_id: int
+
+
+@dataclass(slots=True)
+class RatingRow:
+    """A rating, shaped like RatingOut."""
+    id: int
+    value: int
+    created_at: Optional[datetime]
+    user_id: int
+    course_id: int
+
+
+def _columns(model, row_class):
+    """Return the model's columns named by the row class's fields, in field order."""
+    table_columns = model.__table__.c
+    return tuple(
+        table_columns[field.name] for field in fields(row_class) if field.name in table_columns
+    )
+
+
+USER_COLUMNS = _columns(User, UserRow)
+COURSE_COLUMNS = _columns(Course, CourseRow)
+COMMENT_COLUMNS = _columns(Comment, CommentRow)
+RATING_COLUMNS = _columns(Rating, RatingRow)
+
+
+def _execute(db, statement):
+    """Run a Core select on the session's connection, bypassing ORM loading."""
+    return db.connection().execute(statement)
+
+
+def _course_rows(db, statement):
+    """Run a select of course and creator columns and build CourseRows from it."""
+    width = len(COURSE_COLUMNS)
+    return [CourseRow(*row[:width], UserRow(*row[width:])) for row in _execute(db, statement)]
+
+
+def _courses_with_creators():
+    """Select course columns followed by their creator's columns."""
+    return select(*COURSE_COLUMNS, *USER_COLUMNS).join(User, User.id == Course.creator_id)
+
+
+def course_page(db, filters=(), offset: int = 0, limit: int = 20):
+    """Return (total, rows) for one offset page of courses, in ID order."""
+    total = _execute(db, select(func.count()).select_from(Course).where(*filters)).scalar()
+    rows = _course_rows(
+        db,
+        _courses_with_creators().where(*filters).order_by(Course.id).offset(offset).limit(limit),
+    )
+    return total, rows
+
+
+def course_by_id(db, course_id: int):
+    """Return one course with its creator, or None if it does not exist."""
+    rows = _course_rows(db, _courses_with_creators().where(Course.id == course_id))
+    return rows[0] if rows else None
+
+
+def course_comments(db, course_id: int):
+    """Return every comment on a course, oldest first."""
+    result = _execute(
+        db,
+        select(*COMMENT_COLUMNS).where(Comment.course_id == course_id).order_by(Comment.id),
+    )
+    return [CommentRow(*row) for row in result]
+
+
+def ratings_where(db, *criteria):
+    """Return the ratings matching the criteria, in ID order."""
+    result = _execute(db, select(*RATING_COLUMNS).where(*criteria).order_by(Rating.id))
+    return [RatingRow(*row) for row in result]
+
+
+def users_page(db, after_id=None, limit: int = 100, role=None, username_prefix=None):
+    """Return up to limit users in ID order, after the after_id cursor, with optional filters.
+
+    The username prefix becomes LIKE 'prefix%', served on Postgres by the
+    varchar_pattern_ops index ix_users_username_pattern."""
+    statement = select(*USER_COLUMNS).order_by(User.id).limit(limit)
+    if after_id is not None:
+        statement = statement.where(User.id > after_id)
+    if role is not None:
+        statement = statement.where(User.role == role)
+    if username_prefix:
+        statement = statement.where(User.username.startswith(username_prefix, autoescape=True))
+    return [UserRow(*row) for row in _execute(db, statement)]
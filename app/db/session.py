@@ -3,6 +3,14 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core import timing, tracing
+from app.core.metrics import instrument_engine, instrument_pool
+from app.core.slow_queries import slow_query_log
 
 engine = create_engine(settings.database_url)
+instrument_engine(engine)
+instrument_pool(engine)
+timing.instrument_engine(engine)
+tracing.instrument_engine(engine, tracing.tracer)
+slow_query_log.instrument(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,310 @@
+"""This script fills an empty database with a large, deterministic synthetic dataset.
+
+Rows are written straight to the tables, with COPY on Postgres and batched
+executemany INSERTs elsewhere, bypassing the API and the ORM, so millions of
+rows take minutes rather than days. The same seed always produces the same rows.
+
+Engagement is skewed as in real catalogues: each course gets a popularity
+rank, and its expected share of comments and ratings falls off as
+1 / rank ** skew (Zipf), so a few courses collect most of the activity and
+most courses get little or none. Creators are skewed the same way. The data
+respects the models' constraints: every foreign key points at an earlier row,
+each user rates a course at most once (_user_course_uc), which caps a course's
+ratings at the number of users, the category closure table matches the
+category tree, and the courses' comment_count, rating_count and rating_sum
+are filled in to match the inserted rows.
+
+Run with: python -m app.generate_data --courses 1000000 --ratings 10000000 --comments 5000000
+"""
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import math
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.core.passwords import pwd_context
+from app.db.base import Base
+from app.db.models.category import Category
+from app.db.models.category_closure import CategoryClosure
+from app.db.models.comment import Comment
+from app.db.models.course import Course
+from app.db.models.rating import Rating
+from app.db.models.user import User
+
+# Courses are created over this period; comments and ratings follow their course
+START = datetime(2023, 1, 1)
+SPAN = timedelta(days=730)
+# Rating values 1-5, weighted towards the favourable end as real ratings are
+RATING_WEIGHTS = (1, 1, 3, 6, 6)
+# bcrypt's base64 alphabet; a salt is 22 of these, the last one carrying only two bits
+BCRYPT_SALT_CHARS = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+# Characters psycopg2 reads from the CSV stream per COPY message
+COPY_READ_SIZE = 1 << 16
+WORDS = ("python", "fastapi", "sql", "postgres", "design", "testing", "async", "data", "web",
+         "cloud", "security", "react", "docker", "algorithms", "machine", "learning", "rust",
+         "go", "linux", "networks")
+
+
+class _CsvStream:
+    """A file-like reader over rows, rendered as CSV on demand for COPY FROM STDIN."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._chunk = ""
+        self._offset = 0
+
+    def read(self, size: int = -1) -> str:
+        """Return at most size characters (size < 0: a whole chunk); "" once exhausted."""
+        if self._offset >= len(self._chunk):
+            self._writer.writerows(itertools.islice(self._rows, 1000))
+            self._chunk, self._offset = self._buffer.getvalue(), 0
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        end = len(self._chunk) if size < 0 else self._offset + size
+        data = self._chunk[self._offset:end]
+        self._offset += len(data)
+        return data
+
+
+def _copy(conn, table, columns, rows):
+    """Stream rows into table with COPY; None becomes NULL."""
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            _CsvStream(rows), size=COPY_READ_SIZE,
+        )
+    finally:
+        cursor.close()
+
+
+def _insert(conn, table, columns, rows, batch_size: int):
+    """Insert rows into table in batches of executemany INSERTs."""
+    statement = insert(table)
+    while True:
+        batch = [dict(zip(columns, row)) for row in itertools.islice(rows, batch_size)]
+        if not batch:
+            return
+        conn.execute(statement, batch)
+
+
+def popularity(rng: random.Random, items: int, skew: float):
+    """Return each item's share of all activity: Zipf over a random ranking of the items."""
+    ranks = list(range(1, items + 1))
+    rng.shuffle(ranks)
+    norm = sum(1 / rank ** skew for rank in range(1, items + 1))
+    return [1 / rank ** skew / norm for rank in ranks]
+
+
+def spread(rng: random.Random, shares, total: int, cap: int):
+    """Split about total events by shares, each count capped at cap.
+
+    What the cap takes from the most popular items is handed to the others in
+    proportion to their shares. Expected counts are rounded up or down at
+    random, so the sum stays close to total however many items expect less
+    than one event."""
+    capped, scale = set(), 1.0
+    while True:
+        newly = {index for index, share in enumerate(shares)
+                 if index not in capped and total * share * scale >= cap}
+        if not newly:
+            break
+        capped |= newly
+        uncapped = 1 - sum(shares[index] for index in capped)
+        if uncapped <= 0:
+            break
+        scale = max(0, total - cap * len(capped)) / (total * uncapped)
+    counts = array("l")
+    for index, share in enumerate(shares):
+        if index in capped:
+            counts.append(cap)
+            continue
+        expected = total * share * scale
+        whole = math.floor(expected)
+        counts.append(min(cap, whole + (rng.random() < expected - whole)))
+    return counts
+
+
+def _cumulative(weights):
+    total, cumulative = 0.0, []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def generate(engine, users: int = 10000, categories: int = 50, courses: int = 100000,
+             comments: int = 500000, ratings: int = 1000000, seed: int = 0, skew: float = 1.0,
+             password: str = "password", batch_size: int = 10000) -> dict:
+    """Write the dataset into engine's empty tables and return the number of rows of each.
+
+    User 1 is an admin; every user's password is password."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    # pylint: disable=too-many-statements
+    rng = random.Random(seed)
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        for model in (User, Category, Course):
+            if conn.execute(select(func.count()).select_from(model)).scalar():
+                raise ValueError(f"{model.__tablename__} is not empty; generate needs an empty "
+                                 "database")
+
+    # Activity per course first, so the course rows can carry their counters. Comments and
+    # ratings share one popularity; a course gets at most one rating per user
+    shares = popularity(rng, courses, skew)
+    comment_counts = spread(rng, shares, comments, cap=comments)
+    rating_counts = spread(rng, shares, ratings, cap=users)
+    del shares
+    values = bytearray()
+    rating_sums = array("l")
+    value_weights = _cumulative(RATING_WEIGHTS)
+    for count in rating_counts:
+        drawn = rng.choices(range(1, 6), cum_weights=value_weights, k=count)
+        values.extend(drawn)
+        rating_sums.append(sum(drawn))
+    creator_weights = _cumulative(1 / rank ** skew for rank in range(1, users + 1))
+    roots = max(1, categories // 3)
+    category_list = [
+        (category_id, f"Category {category_id}", f"All about topic {category_id}",
+         None if category_id <= roots else rng.randint(1, roots))
+        for category_id in range(1, categories + 1)
+    ]
+    # A salt from the seed too, so the users rows are as reproducible as the rest
+    salt = "".join(rng.choices(BCRYPT_SALT_CHARS, k=21)) + "."
+    hashed = pwd_context.handler().using(salt=salt).hash(password)
+
+    def course_created(course_id):
+        return START + SPAN * (course_id - 1) / max(1, courses)
+
+    def after(created):
+        return created + (START + SPAN - created) * rng.random()
+
+    def user_rows():
+        for user_id in range(1, users + 1):
+            yield (user_id, f"user{user_id}", hashed, f"User {user_id}", None,
+                   "ADMIN" if user_id == 1 else "USER")
+
+    def closure_rows():
+        for category_id, _, _, parent in category_list:
+            yield (category_id, category_id, 0)
+            if parent is not None:
+                yield (parent, category_id, 1)
+
+    def course_rows():
+        for index in range(courses):
+            course_id = index + 1
+            created = course_created(course_id)
+            title = " ".join(rng.sample(WORDS, 3)).title()
+            creator = bisect.bisect_left(creator_weights, rng.random() * creator_weights[-1]) + 1
+            yield (course_id, f"{title} {course_id}", f"Learn {title.lower()} step by step.",
+                   f"https://youtube.com/watch?v={course_id:011d}",
+                   rng.randint(1, categories) if categories else None, min(creator, users),
+                   created, created, comment_counts[index], rating_counts[index],
+                   rating_sums[index])
+
+    def comment_rows():
+        comment_id = 0
+        for index, count in enumerate(comment_counts):
+            created = course_created(index + 1)
+            for _ in range(count):
+                comment_id += 1
+                yield (comment_id, f"Comment {comment_id} on course {index + 1}",
+                       after(created), rng.randint(1, users), index + 1)
+
+    def rating_rows():
+        rating_id = 0
+        for index, count in enumerate(rating_counts):
+            created = course_created(index + 1)
+            for user_id in rng.sample(range(1, users + 1), count):
+                yield (rating_id + 1, values[rating_id], after(created), user_id, index + 1)
+                rating_id += 1
+
+    tables = (
+        (User, ("id", "username", "hashed_password", "full_name", "bio", "role"), user_rows()),
+        (Category, ("id", "name", "description", "parent_id"), iter(category_list)),
+        (CategoryClosure, ("ancestor_id", "descendant_id", "depth"), closure_rows()),
+        (Course, ("id", "title", "description", "youtube_url", "category_id", "creator_id",
+                  "created_at", "updated_at", "comment_count", "rating_count", "rating_sum"),
+         course_rows()),
+        (Comment, ("id", "content", "created_at", "user_id", "course_id"), comment_rows()),
+        (Rating, ("id", "value", "created_at", "user_id", "course_id"), rating_rows()),
+    )
+    written = {}
+    postgres = engine.dialect.name == "postgresql"
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        for model, columns, rows in tables:
+            counted = _Counted(rows)
+            if postgres:
+                _copy(conn, model.__table__, columns, counted)
+            else:
+                _insert(conn, model.__table__, columns, counted, batch_size)
+            written[model.__tablename__] = counted.count
+        if postgres:
+            # Explicit ids leave the sequences behind; move them past the generated rows
+            for model in (User, Category, Course, Comment, Rating):
+                table = model.__tablename__
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), false)"
+                ))
+    return written
+
+
+class _Counted:  # pylint: disable=too-few-public-methods
+    """Iterate rows while counting them."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self._rows)
+        self.count += 1
+        return row
+
+
+def main():
+    """Generate the dataset into DATABASE_URL, or the database given with --database-url."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--courses", type=int, default=1000000)
+    parser.add_argument("--comments", type=int, default=5000000)
+    parser.add_argument("--ratings", type=int, default=10000000)
+    parser.add_argument("--seed", type=int, default=0, help="same seed, same rows")
+    parser.add_argument("--skew", type=float, default=1.0,
+                        help="Zipf exponent of course popularity; 0 spreads activity evenly")
+    parser.add_argument("--password", default="password", help="every user's password")
+    parser.add_argument("--database-url", help="defaults to the app's database")
+    args = parser.parse_args()
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from app.db.session import engine  # pylint: disable=import-outside-toplevel
+    started = time.perf_counter()
+    written = generate(engine, users=args.users, categories=args.categories,
+                       courses=args.courses, comments=args.comments, ratings=args.ratings,
+                       seed=args.seed, skew=args.skew, password=args.password)
+    elapsed = time.perf_counter() - started
+    for table, count in written.items():
+        print(f"{table:<18} {count:>12,}")
+    print(f"Generated in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,49 @@
 """CodeDarasa API Main Application"""
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import auth, courses, categories, comments, ratings, users
+from app.api.routes import admin, auth, courses, categories, comments, metrics, ratings, users
+from app.api.warmup import warm_on_startup
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.passwords import shutdown_hash_pool
+from app.core.timing import operation_tracer_provider
+from app.core.tracing import tracer_provider
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.messagepack import MessagePackMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Join the invalidation bus and warm the caches before serving; release resources after.
+
+    Uvicorn accepts connections only once startup has finished, so the first
+    requests after a deploy find warm caches."""
+    invalidation_bus.start()
+    await run_in_threadpool(warm_on_startup)
+    yield
+    invalidation_bus.stop()
+    shutdown_hash_pool()
+
+
+# FastAPI reports its requests and operations to this tracer: the one recording sampled
+# requests' spans, or without tracing the one that only times serialization for Server-Timing
+telemetry_provider = tracer_provider or (
+    operation_tracer_provider if settings.server_timing else None
+)
 
 app = FastAPI(
     title="CodeDarasa API",
     description="Code Darasa Backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    telemetry={"tracer_provider": telemetry_provider} if telemetry_provider else None,
 )
 
 # Allow all origins (for development)
@@ -19,6 +55,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Speak MessagePack to clients that ask for it; JSON stays the default
+app.add_middleware(MessagePackMiddleware)
+
+# Compress large text bodies
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality,
+)
+
+# Report auth, database and serialization time in a Server-Timing header
+if settings.server_timing:
+    app.add_middleware(ServerTimingMiddleware, log_queries=settings.debug)
+
+# Profile requests admins ask for with X-Profile, and PROFILE_SAMPLE_RATE of the rest
+app.add_middleware(
+    ProfilingMiddleware,
+    sample_rate=settings.profile_sample_rate,
+    interval=settings.profile_interval_ms / 1000,
+)
+
+# Count and time requests; added last so the timings include every other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Versioned API prefix
 API_PREFIX = "/api/v1"
 
@@ -57,3 +118,12 @@ app.include_router(
     prefix=f"{API_PREFIX}",
     tags=["ratings"]
 )
+
+app.include_router(
+    admin.router,
+    prefix=f"{API_PREFIX}/admin",
+    tags=["admin"]
+)
+
+# Prometheus scrape endpoint, outside the versioned API
+app.include_router(metrics.router, tags=["metrics"])
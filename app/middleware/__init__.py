@@ -0,0 +1 @@
+"""ASGI middleware for the CodeDarasa API."""
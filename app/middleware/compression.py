@@ -0,0 +1,203 @@
+"""Response compression negotiated from Accept-Encoding."""
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Media types worth compressing; everything else (images, video, archives) is
+# usually compressed already
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/msgpack",
+    "application/xml",
+    "image/svg+xml",
+}
+# Responses that never carry a body to compress
+SKIPPED_STATUSES = {204, 206, 304}
+
+
+class GzipEncoder:
+    """Incremental gzip encoder."""
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk; output may be buffered until flush()."""
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far without ending the stream."""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """End the stream and return the trailing bytes."""
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    """Incremental brotli encoder."""
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk; output may be buffered until flush()."""
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far without ending the stream."""
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        """End the stream and return the trailing bytes."""
+        return self._compressor.finish()
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def is_compressible(content_type: str) -> bool:
+    """Return whether a Content-Type is worth compressing."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith("+json")
+        or media_type.endswith("+xml")
+    )
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, whichever the client prefers.
+
+    Bodies smaller than minimum_size, non-text media types, responses that are
+    already encoded and bodiless statuses (204, 206, 304) pass through
+    untouched. Streaming responses are compressed chunk by chunk and flushed
+    after each one, so server-sent events still reach clients as they happen.
+    Brotli is only offered when the optional brotli package is installed."""
+
+    def __init__(self, app, minimum_size: int = 500, gzip_level: int = 6,
+                 brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoder_factory = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        await _CompressedResponse(self, encoder_factory, send).run(scope, receive)
+
+    def _negotiate(self, header: str):
+        """Return a factory for the preferred encoder, or None for identity."""
+        codings = parse_accept_encoding(header)
+        wildcard = codings.get("*", 0.0)
+        candidates = []
+        if brotli is not None:
+            candidates.append((codings.get("br", wildcard), 1, BrotliEncoder, self.brotli_quality))
+        candidates.append((codings.get("gzip", wildcard), 0, GzipEncoder, self.gzip_level))
+        quality, _, encoder, level = max(candidates, key=lambda item: item[:2])
+        if quality <= 0:
+            return None
+        return lambda: encoder(level)
+
+
+class _CompressedResponse:
+    """Per-request state wrapping send() to compress the response body.
+
+    encoder_factory is None when the client accepts no coding; the body is then
+    passed through with only the Vary header added."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoder_factory, send):
+        self.middleware = middleware
+        self.encoder_factory = encoder_factory
+        self.send = send
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def run(self, scope, receive):
+        """Run the wrapped app with the compressing send()."""
+        await self.middleware.app(scope, receive, self.wrapped_send)
+
+    async def wrapped_send(self, message):
+        """Hold the start message until the first body chunk decides the encoding."""
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                message["status"] in SKIPPED_STATUSES
+                or message["status"] < 200
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                await self.send(message)
+            elif self.encoder_factory is None:
+                # The client refused every coding, but the body still varies by it
+                self.passthrough = True
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # The whole body is known and too small to be worth it
+                self.passthrough = True
+                headers = MutableHeaders(raw=self.start_message["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.encoder = self.encoder_factory()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoder.name
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self.start_message)
+
+        if more_body:
+            chunk = self.encoder.compress(body) + self.encoder.flush()
+        else:
+            chunk = self.encoder.compress(body) + self.encoder.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,132 @@
+"""MessagePack request decoding and response negotiation."""
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # without msgpack the API speaks JSON only
+    msgpack = None
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+from app.middleware.compression import parse_accept_encoding
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+JSON_RANGES = ("application/json", "application/*", "*/*")
+
+
+def wants_msgpack(accept: str) -> bool:
+    """Return whether an Accept header prefers MessagePack over JSON.
+
+    MessagePack has to be asked for explicitly; on a q-value tie it wins, since
+    a client only lists it when it can decode it."""
+    # Accept uses the same "type;q=value" syntax as Accept-Encoding
+    ranges = parse_accept_encoding(accept)
+    msgpack_quality = max(ranges.get(media_type, 0.0) for media_type in MSGPACK_TYPES)
+    json_quality = max(ranges.get(media_type, 0.0) for media_type in JSON_RANGES)
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def _media_type(headers: Headers) -> str:
+    """Return the bare media type of a Content-Type header."""
+    return headers.get("content-type", "").split(";", 1)[0].strip().lower()
+
+
+class MessagePackMiddleware:
+    """Let clients exchange MessagePack instead of JSON with every router.
+
+    Request bodies sent as application/msgpack are decoded and handed to the
+    application as JSON, so the usual body validation applies unchanged. JSON
+    responses are re-encoded as MessagePack when the Accept header asks for it;
+    anything else (streams, NDJSON, errors from outside the app) passes through.
+    Datetimes stay ISO 8601 strings, exactly as in the JSON payloads. JSON stays
+    the default, and without the optional msgpack package it is the only format:
+    MessagePack bodies are refused with 415 and Accept falls back to JSON."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if _media_type(headers) in MSGPACK_TYPES:
+            if msgpack is None:
+                await JSONResponse(
+                    {"detail": "MessagePack is not supported by this server"}, status_code=415
+                )(scope, receive, send)
+                return
+            try:
+                scope, receive = await self._decode_request(scope, receive)
+            except (ValueError, TypeError):
+                await JSONResponse(
+                    {"detail": "Malformed MessagePack body"}, status_code=400
+                )(scope, receive, send)
+                return
+        if msgpack is not None and wants_msgpack(headers.get("accept", "")):
+            send = _MsgpackSend(send).send
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _decode_request(scope, receive):
+        """Read the MessagePack body and return a scope and receive() replaying it as JSON."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = orjson.dumps(msgpack.unpackb(b"".join(chunks), timestamp=3))
+        headers = MutableHeaders(scope={**scope, "headers": list(scope["headers"])})
+        headers["content-type"] = "application/json"
+        headers["content-length"] = str(len(body))
+        scope = {**scope, "headers": headers.raw}
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return scope, replay
+
+
+class _MsgpackSend:
+    """Wraps send() to re-encode a JSON response body as MessagePack."""
+
+    def __init__(self, send):
+        self._send = send
+        self._start = None
+        self._chunks = []
+        self._passthrough = False
+
+    async def send(self, message):
+        """Hold JSON responses until the whole body is known, then re-encode them."""
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            headers.add_vary_header("Accept")
+            if _media_type(headers) != "application/json" or "content-encoding" in headers:
+                self._passthrough = True
+                await self._send(message)
+            else:
+                self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+        self._chunks.append(message.get("body", b""))
+        if message.get("more_body", False):
+            return
+        body = b"".join(self._chunks)
+        if body:
+            body = msgpack.packb(orjson.loads(body))
+        headers = MutableHeaders(raw=self._start["headers"])
+        headers["content-type"] = "application/msgpack"
+        headers["content-length"] = str(len(body))
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": body})
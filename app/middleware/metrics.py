@@ -0,0 +1,44 @@
+"""Request metrics recorded around every HTTP request."""
+import time
+
+from app.core.metrics import (
+    http_request_duration, http_requests, http_requests_in_flight, request_scope, route_template
+)
+
+
+class MetricsMiddleware:
+    """Count and time requests by method, route template and status code.
+
+    The route is read from the scope once the request has been routed, so the
+    label is the template (/api/v1/courses/{course_id}) rather than the raw
+    path. The scope is also published in a context variable for the database
+    hooks, which label queries by the same route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+        token = request_scope.set(scope)
+        http_requests_in_flight.inc(method)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec(method)
+            request_scope.reset(token)
+            route = route_template(scope)
+            http_requests.inc(method, route, status)
+            http_request_duration.observe(elapsed, method, route, status)
@@ -0,0 +1,93 @@
+"""On-demand sampling profiler around single requests."""
+import random
+import time
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.api.deps import get_current_user, require_admin
+from app.api.responses import ORJSONResponse
+from app.core.metrics import route_template
+from app.core.profiling import Profile, SamplingProfiler, new_profile_id, profile_store
+from app.db.session import SessionLocal
+
+# Request header asking for a profile: "speedscope" returns it in place of the response,
+# any other value stores it
+PROFILE_HEADER = "x-profile"
+
+
+def _is_admin(authorization: str) -> bool:
+    """Tell whether an Authorization header carries an admin's bearer token."""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    db = SessionLocal()
+    try:
+        require_admin(get_current_user(token, db))
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+    return True
+
+
+class ProfilingMiddleware:
+    """Profile requests that an admin asks for with X-Profile, and a random sample of the rest.
+
+    The profile is stored and its id returned in X-Profile-Id, for the admin
+    profile routes; with X-Profile: speedscope it is sent back instead of the
+    response, as speedscope JSON. X-Profile from anyone but an admin is ignored,
+    so the header costs others a token check and nothing more."""
+
+    def __init__(self, app, sample_rate: float = 0.0, interval: float = 0.002,
+                 store=profile_store):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self.app = app
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        requested = headers.get(PROFILE_HEADER)
+        if requested is not None:
+            if not await run_in_threadpool(_is_admin, headers.get("authorization", "")):
+                requested = None
+        elif self.sample_rate and random.random() < self.sample_rate:
+            requested = "sampled"
+        if requested is None:
+            await self.app(scope, receive, send)
+            return
+        await self._profile(scope, receive, send, inline=requested == "speedscope")
+
+    async def _profile(self, scope, receive, send, inline: bool):
+        profile_id = new_profile_id()
+        status = 500
+
+        async def send_with_profile(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(raw=message.setdefault("headers", [])).append(
+                    "X-Profile-Id", profile_id)
+            if not inline:
+                await send(message)
+
+        profiler = SamplingProfiler(self.interval)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            samples = profiler.stop()
+            profile = Profile(profile_id, scope["method"], scope["path"], route_template(scope),
+                              status, time.perf_counter() - started, self.interval, samples)
+            # Writing the folded file is disk I/O; keep it off the event loop
+            await run_in_threadpool(self.store.add, profile)
+        if inline:
+            response = ORJSONResponse(profile.speedscope(), headers={"X-Profile-Id": profile_id})
+            await response(scope, receive, send)
@@ -0,0 +1,36 @@
+"""Server-Timing header reporting where each request spent its time."""
+from starlette.datastructures import MutableHeaders
+
+from app.core.timing import RequestTimings, log_queries, request_timings
+
+
+class ServerTimingMiddleware:
+    """Collect a request's phase timings and send them as a Server-Timing header.
+
+    The header is added when the response starts, so it covers the work done
+    before the first byte; browsers show it in the network panel. With
+    log_queries, the statements each request ran are logged once it ends."""
+
+    def __init__(self, app, log_queries: bool = False):
+        self.app = app
+        self.log_queries = log_queries
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings(log_queries=self.log_queries)
+        token = request_timings.set(timings)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message.setdefault("headers", []))
+                headers.append("Server-Timing", timings.header())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            if timings.queries is not None:
+                log_queries(scope["method"], scope["path"], timings)
@@ -0,0 +1,87 @@
+"""This script recomputes the denormalized comment and rating counters on courses."""
+from sqlalchemy import bindparam, func, literal, or_, select, union_all, update
+
+from app.db.models.comment import Comment
+from app.db.models.course import Course
+from app.db.models.rating import Rating
+from app.db.session import SessionLocal
+
+
+def recompute(db):
+    """Recompute comment_count, rating_count and rating_sum for every course.
+
+    Comments and ratings are folded into a single GROUP BY pass. Courses with
+    non-zero counters but no activity are reset and the aggregated values are
+    written back by primary key, all in one transaction. The updates go through
+    the Core table with updated_at assigned to itself, so repairing counters
+    does not look like an edit of every course. Returns the number of courses
+    that have comments or ratings."""
+    activity = union_all(
+        select(
+            Comment.course_id.label("course_id"),
+            literal(1).label("comments"),
+            literal(0).label("ratings"),
+            literal(0).label("score"),
+        ),
+        select(
+            Rating.course_id.label("course_id"),
+            literal(0).label("comments"),
+            literal(1).label("ratings"),
+            Rating.value.label("score"),
+        ),
+    ).subquery()
+    rows = db.execute(
+        select(
+            activity.c.course_id,
+            func.sum(activity.c.comments),
+            func.sum(activity.c.ratings),
+            func.sum(activity.c.score),
+        ).group_by(activity.c.course_id)
+    ).all()
+
+    courses = Course.__table__
+    db.execute(
+        update(courses)
+        .where(
+            or_(courses.c.comment_count != 0, courses.c.rating_count != 0,
+                courses.c.rating_sum != 0),
+            courses.c.id.not_in(select(activity.c.course_id)),
+        )
+        .values(comment_count=0, rating_count=0, rating_sum=0, updated_at=courses.c.updated_at)
+    )
+    if rows:
+        db.execute(
+            update(courses)
+            .where(courses.c.id == bindparam("course_id"))
+            .values(
+                comment_count=bindparam("new_comment_count"),
+                rating_count=bindparam("new_rating_count"),
+                rating_sum=bindparam("new_rating_sum"),
+                updated_at=courses.c.updated_at,
+            ),
+            [
+                {
+                    "course_id": course_id,
+                    "new_comment_count": comment_count,
+                    "new_rating_count": rating_count,
+                    "new_rating_sum": rating_sum,
+                }
+                for course_id, comment_count, rating_count, rating_sum in rows
+            ],
+        )
+    db.commit()
+    return len(rows)
+
+
+def main():
+    """Recompute the course counters using a fresh database session."""
+    db = SessionLocal()
+    try:
+        updated = recompute(db)
+    finally:
+        db.close()
+    print(f"Recomputed counters for {updated} courses")
+
+
+if __name__ == "__main__":
+    main()
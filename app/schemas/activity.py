@@ -0,0 +1,22 @@
+"""Schemas for the per-user activity feed."""
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class ActivityItem(BaseModel):
+    """One course, comment or rating in a user's activity feed."""
+    type: Literal["course", "comment", "rating"]
+    id: int
+    created_at: datetime
+    course_id: int
+    title: Optional[str] = None
+    content: Optional[str] = None
+    value: Optional[int] = None
+
+
+class ActivityFeedOut(BaseModel):
+    """Schema for one page of a user's activity feed."""
+    items: List[ActivityItem]
+    next_cursor: Optional[str] = None
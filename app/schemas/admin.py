@@ -0,0 +1,55 @@
+"""Schemas for the admin routes."""
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class CoalescingStats(BaseModel):
+    """Counters of one request coalescing group."""
+    name: str
+    enabled: bool
+    executed: int
+    coalesced: int
+    in_flight: int
+
+
+class ProfileSummary(BaseModel):
+    """One stored request profile, without its stacks."""
+    id: str
+    created: float
+    method: str
+    path: str
+    route: str
+    status: int
+    duration_ms: float
+    samples: int
+
+
+class SlowQueryStats(BaseModel):
+    """One statement fingerprint in the slow query log."""
+    fingerprint: str
+    statement: str
+    calls: int
+    total_ms: float
+    max_ms: float
+    last_ms: float
+    routes: List[str]
+    parameters: str
+    plan: Optional[str] = None
+    first_seen: float
+    last_seen: float
+
+
+class TraceSpan(BaseModel):
+    """One finished span of a trace; ids in hex, times in epoch nanoseconds."""
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    kind: str
+    start_time: int
+    end_time: int
+    duration_ms: float
+    attributes: Dict[str, Any]
+    events: List[Dict[str, Any]]
+    status: str
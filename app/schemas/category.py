@@ -15,6 +15,7 @@ class CategoryCreate(BaseModel):
     """Schema for creating a new Category."""
     name: str
     description: Optional[str] = None
+    parent_id: Optional[int] = None
     course_ids: Optional[List[int]] = []
 
 
@@ -22,6 +23,8 @@ class CategoryUpdate(BaseModel):
     """Schema for updating an existing Category."""
     name: Optional[str] = None
     description: Optional[str] = None
+    # Only applied when present in the payload; an explicit null moves the category to the root
+    parent_id: Optional[int] = None
     add_course_ids: Optional[List[int]] = None
     remove_course_ids: Optional[List[int]] = None
 
@@ -31,8 +34,24 @@ class CategoryOut(CategoryBase):
     id: int
     name: str
     description: Optional[str] = None
+    parent_id: Optional[int] = None
+    # Courses assigned directly to this category; subcategories are not included
+    course_count: int = 0
     courses: List[CourseBrief] = []
 
     model_config = {
         "from_attributes": True
     }
+
+
+class CategoryTree(CategoryBase):
+    """Schema for a category node with its nested subcategories."""
+    id: int
+    parent_id: Optional[int] = None
+    children: List["CategoryTree"] = []
+
+
+class CategoryCoursesOut(BaseModel):
+    """Schema for one keyset page of a category's courses."""
+    items: List[CourseBrief]
+    next_cursor: Optional[int] = None
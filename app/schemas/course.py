@@ -39,6 +39,9 @@ class CourseOut(CourseBase):
     category_id: Optional[int] = None
     creator: UserOut
     created_at: datetime.datetime
+    comment_count: int = 0
+    rating_count: int = 0
+    rating_sum: int = 0
 
     model_config = {
         "from_attributes": True
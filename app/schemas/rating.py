@@ -1,4 +1,7 @@
 """Schemas for rating-related operations."""
+from datetime import datetime
+from typing import Optional
+
 from pydantic import BaseModel, conint
 
 
@@ -11,6 +14,7 @@ class RatingOut(BaseModel):
     """Schema for outputting rating data."""
     id: int
     value: int
+    created_at: Optional[datetime] = None
     user_id: int
     course_id: int
 
@@ -1,8 +1,8 @@
 """User schemas for Pydantic validation and serialization."""
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class UserRole(str, Enum):
@@ -34,6 +34,30 @@ class UserOut(UserBase):
     }
 
 
+class UserProvision(UserCreate):
+    """Schema for one user in a bulk provisioning request."""
+    role: UserRole = UserRole.USER
+
+
+class UserBulkCreate(BaseModel):
+    """Schema for provisioning many users at once."""
+    # Kept small enough to finish within one HTTP request; larger cohorts go through
+    # scripts/provision_users.py
+    users: List[UserProvision] = Field(..., min_length=1, max_length=1000)
+
+
+class UserBulkResult(BaseModel):
+    """Schema for the outcome of a bulk provisioning request."""
+    created: List[UserOut]
+    skipped: List[str]
+
+
+class UserListOut(BaseModel):
+    """Schema for one keyset page of users."""
+    items: List[UserOut]
+    next_cursor: Optional[int] = None
+
+
 class UserUpdate(UserBase):
     """Schema for updating an existing User."""
     username: str
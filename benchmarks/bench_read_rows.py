@@ -0,0 +1,128 @@
+"""Measure per-request allocations and peak RSS of the course list read paths.
+
+Compares the ORM path (mapped Course instances, lazily loaded creators,
+CourseListOut validation and dump) with the read-only query layer (slotted rows
+from column selects, encoded with orjson) on large pages. Each path runs in its
+own subprocess against the same seeded SQLite database so peak RSS figures do
+not contaminate each other. Run with: python -m benchmarks.bench_read_rows
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.models.course import Course
+from app.db.models.user import User
+
+MODES = ("orm", "rows")
+
+
+def seed(url: str, courses: int, users: int = 50):
+    """Create the schema and insert users and courses in bulk."""
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": index, "username": f"bench{index}", "hashed_password": "x",
+             "full_name": f"Bench User {index}", "role": "USER"}
+            for index in range(1, users + 1)
+        ])
+        conn.execute(insert(Course), [
+            {"id": index, "title": f"Course {index}", "description": "Lorem ipsum " * 10,
+             "youtube_url": f"https://youtube.com/watch?v={index:011d}",
+             "creator_id": index % users + 1, "created_at": now}
+            for index in range(1, courses + 1)
+        ])
+    engine.dispose()
+
+
+def orm_request(db, page_size: int) -> bytes:
+    """The ORM read path: load mapped instances and validate them into the response model."""
+    # pylint: disable=import-outside-toplevel
+    from app.schemas.course import CourseListOut
+
+    courses = db.query(Course).order_by(Course.id).limit(page_size).all()
+    return CourseListOut.model_validate(
+        {"items": courses, "total": db.query(Course).count()}
+    ).model_dump_json().encode()
+
+
+def rows_request(db, page_size: int) -> bytes:
+    """The read-only layer: slotted rows from a column select, encoded with orjson."""
+    # pylint: disable=import-outside-toplevel
+    from app.api.responses import ORJSONResponse
+    from app.db.readers import course_page
+
+    total, rows = course_page(db, limit=page_size)
+    return ORJSONResponse({"items": rows, "total": total}).body
+
+
+def measure(url: str, mode: str, page_size: int, requests: int) -> dict:
+    """Serve the page repeatedly with a fresh session per request and record allocations."""
+    handler = orm_request if mode == "orm" else rows_request
+    engine = create_engine(url)
+    with Session(engine) as db:
+        handler(db, page_size)  # warm up imports, statement caches and the pool
+    peaks, blocks = [], []
+    for _ in range(requests):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        with Session(engine) as db:
+            body = handler(db, page_size)
+            after = tracemalloc.take_snapshot()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        blocks.append(sum(stat.count_diff for stat in after.compare_to(before, "filename")))
+        tracemalloc.stop()
+    return {
+        "mode": mode,
+        "page_size": page_size,
+        "body_bytes": len(body),
+        "peak_alloc_kib": round(min(peaks) / 1024, 1),
+        "live_blocks": min(blocks),
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    """Seed a scratch database and measure each read path in a child process."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=5000, help="courses per request")
+    parser.add_argument("--requests", type=int, default=5, help="measured requests per path")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.url, args.mode, args.page_size, args.requests)))
+        return
+
+    with tempfile.TemporaryDirectory() as scratch:
+        url = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+        seed(url, args.page_size)
+        print(f"{'path':<6} {'page':>6} {'peak alloc KiB':>15} {'live blocks':>12} "
+              f"{'peak RSS MiB':>13}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_read_rows", "--mode", mode,
+                 "--url", url, "--page-size", str(args.page_size),
+                 "--requests", str(args.requests)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f"{result['mode']:<6} {result['page_size']:>6} {result['peak_alloc_kib']:>15} "
+                  f"{result['live_blocks']:>12} {result['peak_rss_mib']:>13}")
+
+
+if __name__ == "__main__":
+    main()
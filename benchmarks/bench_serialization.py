@@ -0,0 +1,77 @@
+"""Benchmark payload encode time for one 100-item page of courses.
+
+Compares the response-model path (ORM objects validated into CourseListOut and
+dumped to JSON by Pydantic) with the fast path used by list_courses (row dicts
+encoded by orjson). Run with: python -m benchmarks.bench_serialization
+"""
+import argparse
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.api.responses import ORJSONResponse
+from app.schemas.course import CourseListOut
+
+PAGE_SIZE = 100
+
+
+def make_rows(count: int):
+    """Build course rows shaped like the fast path's selected columns."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [
+        {
+            "id": index,
+            "title": f"Course {index}",
+            "description": "An introduction to the subject, with worked examples. " * 3,
+            "youtube_url": f"https://youtube.com/watch?v={index:011d}",
+            "category_id": index % 7 or None,
+            "created_at": now,
+            "comment_count": index * 3,
+            "rating_count": index,
+            "rating_sum": index * 4,
+            "creator": {
+                "id": index % 10,
+                "username": f"teacher{index % 10}",
+                "full_name": f"Teacher {index % 10}",
+                "bio": None,
+                "role": "USER",
+            },
+        }
+        for index in range(1, count + 1)
+    ]
+
+
+def make_objects(rows):
+    """Build attribute-style objects standing in for loaded ORM instances."""
+    return [
+        SimpleNamespace(**{**row, "creator": SimpleNamespace(**row["creator"])})
+        for row in rows
+    ]
+
+
+def main():
+    """Time both encode paths and print the per-page cost in microseconds."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="iterations per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs; the best one is reported")
+    args = parser.parse_args()
+
+    rows = make_rows(PAGE_SIZE)
+    objects = make_objects(rows)
+    payload = {"items": rows, "total": len(rows)}
+    response = ORJSONResponse(payload)
+
+    cases = {
+        "response_model (validate + dump_json)": lambda: CourseListOut.model_validate(
+            {"items": objects, "total": len(objects)}, from_attributes=True
+        ).model_dump_json(),
+        "fast path (row dicts + orjson)": lambda: response.render(payload),
+    }
+    assert CourseListOut.model_validate_json(response.render(payload)).total == PAGE_SIZE
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+        print(f"{name:<40} {best / args.number * 1e6:8.1f} us/page")
+
+
+if __name__ == "__main__":
+    main()
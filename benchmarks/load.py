@@ -0,0 +1,292 @@
+"""Load test: a mixed read/write workload against a seeded synthetic dataset.
+
+Seeds a scratch database with app.generate_data (engagement skewed towards a
+few popular courses), then drives the API with concurrent clients, either in-process through httpx's ASGI transport
+or against a local uvicorn started on the same database. Reports throughput
+and p50/p95/p99 latency per endpoint as JSON and, given a baseline report,
+exits non-zero when any endpoint regressed beyond the tolerance.
+Run with: python -m benchmarks.load
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+from sqlalchemy import create_engine, select
+
+from app.db.models.course import Course
+
+API_PREFIX = "/api/v1"
+
+# Endpoint name -> relative weight in the mix; reads dominate, as in production
+WORKLOAD = {
+    "GET /courses/": 25,
+    "GET /courses/?search=": 5,
+    "GET /courses/{course_id}": 25,
+    "GET /courses/{course_id}/comments/": 15,
+    "GET /courses/{course_id}/ratings/": 10,
+    "GET /categories/": 10,
+    "GET /users/me": 4,
+    "POST /courses/{course_id}/comments/": 4,
+    "POST /courses/{course_id}/ratings/": 2,
+}
+
+
+def seed(url: str, users: int, categories: int, courses: int, comments: int, ratings: int,
+         seed_value: int = 0):
+    """Fill the empty database with app.generate_data's dataset.
+
+    Returns the row counts and each course's weight in the workload: its
+    comments and ratings plus one, so the popular courses get most requests."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    # Imported late: it reads the settings, which main() points at the database first
+    from app.generate_data import generate  # pylint: disable=import-outside-toplevel
+    engine = create_engine(url)
+    try:
+        written = generate(engine, users=users, categories=categories, courses=courses,
+                           comments=comments, ratings=ratings, seed=seed_value)
+    except ValueError as exc:
+        raise SystemExit(f"{url}: {exc}") from exc
+    with engine.connect() as conn:
+        weights = [comment_count + rating_count + 1 for comment_count, rating_count in conn.execute(
+            select(Course.comment_count, Course.rating_count).order_by(Course.id)
+        )]
+    engine.dispose()
+    return {"users": written["users"], "categories": written["categories"],
+            "courses": written["courses"], "comments": written["comments"],
+            "ratings": written["ratings"]}, weights
+
+
+def percentile(ordered, fraction: float) -> float:
+    """Return the nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(samples, elapsed: float) -> dict:
+    """Summarize (endpoint, seconds, status) samples per endpoint and overall."""
+    by_endpoint = {}
+    for name, seconds, status in samples:
+        by_endpoint.setdefault(name, []).append((seconds, status))
+    by_endpoint["total"] = [(seconds, status) for _, seconds, status in samples]
+    summary = {}
+    for name, results in sorted(by_endpoint.items()):
+        ordered = sorted(seconds for seconds, _ in results)
+        summary[name] = {
+            "requests": len(results),
+            "errors": sum(1 for _, status in results if status >= 400),
+            "throughput_rps": round(len(results) / elapsed, 1),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        }
+    return summary
+
+
+class Workload:
+    """Picks requests from the mix: popular courses more often, as real traffic does."""
+
+    def __init__(self, dataset: dict, weights, tokens):
+        self.dataset = dataset
+        self.course_ids = range(1, dataset["courses"] + 1)
+        self.weights = weights
+        self.tokens = tokens
+        self.names = list(WORKLOAD)
+        self.mix = list(WORKLOAD.values())
+
+    def next(self, rng: random.Random):
+        """Return (endpoint name, method, path, headers, body) for one request."""
+        # pylint: disable=too-many-return-statements
+        name = rng.choices(self.names, self.mix)[0]
+        course_id = rng.choices(self.course_ids, self.weights)[0]
+        auth = {"Authorization": f"Bearer {rng.choice(self.tokens)}"}
+        if name == "GET /courses/":
+            pages = max(1, self.dataset["courses"] // 10)
+            page = min(pages, int(rng.paretovariate(1.5)))
+            return name, "GET", f"/courses/?page={page}", None, None
+        if name == "GET /courses/?search=":
+            term = rng.choice(("python", "sql", "async", "design"))
+            return name, "GET", f"/courses/?search={term}", None, None
+        if name == "GET /categories/":
+            return name, "GET", "/categories/", None, None
+        if name == "GET /users/me":
+            return name, "GET", "/users/me", auth, None
+        if name == "POST /courses/{course_id}/comments/":
+            body = {"content": f"Load test comment {rng.random():.6f}"}
+            return name, "POST", f"/courses/{course_id}/comments/", auth, body
+        if name == "POST /courses/{course_id}/ratings/":
+            body = {"value": rng.randint(1, 5)}
+            return name, "POST", f"/courses/{course_id}/ratings/", auth, body
+        path = name.split(" ", 1)[1].replace("{course_id}", str(course_id))
+        return name, "GET", path, None, None
+
+
+async def drive(client: httpx.AsyncClient, workload: Workload, requests: int, concurrency: int,
+                seed_value: int):
+    """Send requests from concurrency clients; return the samples and the elapsed seconds."""
+    samples = []
+    remaining = iter(range(requests))
+
+    async def client_loop(index):
+        rng = random.Random(seed_value * 1000 + index)
+        for _ in remaining:
+            name, method, path, headers, body = workload.next(rng)
+            started = time.perf_counter()
+            resp = await client.request(method, API_PREFIX + path, headers=headers, json=body)
+            samples.append((name, time.perf_counter() - started, resp.status_code))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(index) for index in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def free_port() -> int:
+    """Return a TCP port nobody is listening on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn(url: str, workers: int):
+    """Start uvicorn serving the app on url's database; return the process and base URL."""
+    port = free_port()
+    env = dict(os.environ, ENV="app", DATABASE_URL=url, WARM_ON_STARTUP="false")
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"], env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/metrics").status_code == 200:
+                return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("uvicorn did not start within 30 seconds")
+
+
+async def run(args, url: str) -> dict:
+    """Seed, warm up, drive the workload and return the report."""
+    # pylint: disable=import-outside-toplevel
+    dataset, weights = seed(url, args.users, args.categories, args.courses, args.comments,
+                            args.ratings, args.seed)
+    from app.core.security import create_access_token
+    tokens = [create_access_token({"sub": f"user{index}"})
+              for index in range(1, min(args.users, 100) + 1)]
+    workload = Workload(dataset, weights, tokens)
+
+    process = None
+    if args.target == "uvicorn":
+        process, base_url = start_uvicorn(url, args.workers)
+        client = httpx.AsyncClient(base_url=base_url, timeout=30)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://bench", timeout=30)
+    try:
+        async with client:
+            await drive(client, workload, args.warmup, args.concurrency, args.seed + 1)
+            samples, elapsed = await drive(client, workload, args.requests, args.concurrency,
+                                           args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    return {
+        "meta": {
+            "commit": git_commit(), "date": datetime.now().isoformat(timespec="seconds"),
+            "target": args.target, "database": url.split(":", 1)[0],
+            "concurrency": args.concurrency, "requests": args.requests, "seed": args.seed,
+            "elapsed_s": round(elapsed, 3), "dataset": dataset,
+        },
+        "endpoints": summarize(samples, elapsed),
+    }
+
+
+def git_commit() -> str:
+    """Return the current commit, or "unknown" outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report: dict, baseline: dict, tolerance: float):
+    """List the endpoints whose p95 latency or throughput regressed beyond tolerance."""
+    regressions = []
+    for name, before in baseline["endpoints"].items():
+        after = report["endpoints"].get(name)
+        if after is None:
+            continue
+        if after["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {after['p95_ms']}ms, baseline {before['p95_ms']}ms")
+        if after["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {after['throughput_rps']} req/s, "
+                               f"baseline {before['throughput_rps']} req/s")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{name}: {after['errors']} errors, baseline {before['errors']}")
+    return regressions
+
+
+def main():
+    """Parse arguments, run the load test and compare it against the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--ratings", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1, help="seeds the dataset and the mix")
+    parser.add_argument("--requests", type=int, default=3000, help="measured requests")
+    parser.add_argument("--warmup", type=int, default=300, help="unmeasured requests first")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi",
+                        help="in-process ASGI transport, or a local uvicorn over HTTP")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", help="an empty database to seed (default: scratch "
+                        "SQLite file)")
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    parser.add_argument("--baseline", help="fail if worse than this earlier report")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative regression against the baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        url = args.database_url or f"sqlite:///{os.path.join(scratch, 'load.db')}"
+        # The app reads its database URL at import, so point it at the scratch one first
+        os.environ.update(ENV="app", DATABASE_URL=url, WARM_ON_STARTUP="false")
+        report = asyncio.run(run(args, url))
+
+    text_report = json.dumps(report, indent=2)
+    print(text_report)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text_report + "\n")
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; record one with --output {args.baseline}",
+                  file=sys.stderr)
+            return
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Micro-benchmarks of per-request overheads, with a history kept across commits.
+
+Times token creation, the JWT decode get_current_user does, password hashing
+and verification, CourseOut and CategoryOut validation of a page of ORM
+objects, and Course.to_dict, each on fixed inputs, as the best of several
+runs with garbage collection off. Every run is appended to a JSON Lines
+history together with the commit and the library versions, so a slowdown can
+be traced to the commit or upgrade that caused it; --compare fails when a case
+got slower than the last recorded commit on the same machine.
+Run with: python -m benchmarks.micro
+"""
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import datetime
+from typing import List
+
+from jose import jwt
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.passwords import pwd_context
+from app.core.security import create_access_token
+from app.db.models.category import Category
+from app.db.models.course import Course
+from app.db.models.user import User
+from app.schemas.category import CategoryOut
+from app.schemas.course import CourseOut
+
+# Libraries whose upgrades move these numbers
+PACKAGES = ("pydantic", "pydantic-core", "passlib", "bcrypt", "python-jose", "cryptography",
+            "sqlalchemy", "fastapi")
+DEFAULT_HISTORY = os.path.join("benchmarks", "results", "micro_history.jsonl")
+
+
+def make_courses(count: int):
+    """Build transient Course instances with their creators and categories attached."""
+    creators = [User(id=index, username=f"teacher{index}", full_name=f"Teacher {index}",
+                     bio=None, role="USER") for index in range(10)]
+    categories = [Category(id=index, name=f"Category {index}", description="Things",
+                           parent_id=None) for index in range(1, 6)]
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    return [
+        Course(id=index, title=f"Course {index}",
+               description="An introduction to the subject, with worked examples. " * 3,
+               youtube_url=f"https://youtube.com/watch?v={index:011d}",
+               category=categories[index % 5], category_id=categories[index % 5].id,
+               creator=creators[index % 10], creator_id=creators[index % 10].id,
+               created_at=now, updated_at=now, comment_count=index * 3, rating_count=index,
+               rating_sum=index * 4)
+        for index in range(1, count + 1)
+    ]
+
+
+def cases(objects: int):
+    """Return {name: callable} for every benchmarked path."""
+    token = create_access_token({"sub": "bench"})
+    hashed = pwd_context.hash("correct horse battery staple")
+    courses = make_courses(objects)
+    categories = []
+    for index in range(objects):
+        category = Category(id=index, name=f"Category {index}", description="Things",
+                            parent_id=None)
+        category.course_count = 5
+        category.courses = courses[index % len(courses):][:5]
+        categories.append(category)
+    course_list = TypeAdapter(List[CourseOut])
+    category_list = TypeAdapter(List[CategoryOut])
+    return {
+        "create_access_token": lambda: create_access_token({"sub": "bench"}),
+        # The decode get_current_user does for every authenticated request
+        "jwt_decode": lambda: jwt.decode(token, settings.secret_key, algorithms=["HS256"]),
+        "pwd_context.hash": lambda: pwd_context.hash("correct horse battery staple"),
+        "pwd_context.verify": lambda: pwd_context.verify("correct horse battery staple", hashed),
+        f"CourseOut x{objects}": lambda: course_list.validate_python(courses,
+                                                                     from_attributes=True),
+        f"CategoryOut x{objects}": lambda: category_list.validate_python(categories,
+                                                                         from_attributes=True),
+        "Course.to_dict": lambda: courses[0].to_dict(),
+    }
+
+
+def calibrate(function, budget: float) -> int:
+    """Return how many calls fit in roughly budget seconds, at least one."""
+    number = 1
+    while True:
+        elapsed = timeit.timeit(function, number=number)
+        if elapsed >= budget / 10 or number >= 1_000_000:
+            return max(1, int(number * budget / max(elapsed, 1e-9)))
+        number *= 10
+
+
+def measure(function, repeat: int, budget: float) -> dict:
+    """Time function over repeat runs; report the best and median microseconds per call."""
+    number = calibrate(function, budget)
+    runs = sorted(total / number * 1e6 for total in timeit.repeat(function, number=number,
+                                                                    repeat=repeat))
+    return {"best_us": round(runs[0], 3), "median_us": round(runs[len(runs) // 2], 3),
+            "number": number, "repeat": repeat}
+
+
+def environment() -> dict:
+    """Describe what the numbers depend on: the machine, Python and library versions."""
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    return {"machine": f"{platform.node()} {platform.machine()} {os.cpu_count()} cpus",
+            "python": platform.python_version(), "packages": versions}
+
+
+def git_commit() -> str:
+    """Return the current commit, marked dirty when there are uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def read_history(path: str):
+    """Return the recorded runs, oldest first."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def previous_run(history, record):
+    """Return the latest run of another commit on the same machine and Python, or None."""
+    for entry in reversed(history):
+        if (entry["commit"] != record["commit"]
+                and entry["environment"]["machine"] == record["environment"]["machine"]
+                and entry["environment"]["python"] == record["environment"]["python"]):
+            return entry
+    return None
+
+
+def print_history(history):
+    """Print each case's best time per recorded commit, oldest first."""
+    names = list(dict.fromkeys(name for entry in history for name in entry["results"]))
+    print(f"{'commit':<16} {'date':<20} " + " ".join(f"{name[:22]:>22}" for name in names))
+    for entry in history:
+        times = " ".join(
+            f"{entry['results'][name]['best_us']:>22.1f}" if name in entry["results"]
+            else f"{'-':>22}" for name in names
+        )
+        print(f"{entry['commit']:<16} {entry['date']:<20} {times}")
+
+
+def main():
+    """Run the benchmarks, append them to the history and compare with the last commit."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=100, help="objects per validation")
+    parser.add_argument("--repeat", type=int, default=7, help="runs per case")
+    parser.add_argument("--budget", type=float, default=0.2, help="seconds per run")
+    parser.add_argument("--only", action="append", help="run only cases containing this")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON Lines history file")
+    parser.add_argument("--no-record", action="store_true", help="do not append to history")
+    parser.add_argument("--compare", action="store_true",
+                        help="exit 1 if a case is slower than the previous commit's run")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown --compare tolerates")
+    parser.add_argument("--show", action="store_true", help="print the history and exit")
+    args = parser.parse_args()
+
+    history = read_history(args.history)
+    if args.show:
+        print_history(history)
+        return
+
+    results = {}
+    for name, function in cases(args.objects).items():
+        if args.only and not any(part in name for part in args.only):
+            continue
+        results[name] = measure(function, args.repeat, args.budget)
+        print(f"{name:<28} {results[name]['best_us']:>12.1f} us  "
+              f"(median {results[name]['median_us']:.1f})")
+
+    record = {"commit": git_commit(), "date": datetime.now().isoformat(timespec="seconds"),
+              "environment": environment(), "results": results}
+    if not args.no_record:
+        os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+    previous = previous_run(history, record)
+    if previous is None:
+        return
+    slower = []
+    print(f"\nAgainst {previous['commit']} ({previous['date']}):")
+    for name, result in results.items():
+        before = previous["results"].get(name)
+        if before is None:
+            continue
+        change = result["best_us"] / before["best_us"] - 1
+        print(f"{name:<28} {change:>+8.1%}")
+        if change > args.threshold:
+            slower.append(name)
+    if args.compare and slower:
+        print(f"Slower than {previous['commit']} by more than {args.threshold:.0%}: "
+              f"{', '.join(slower)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Script to provision many users at once from a CSV file.
+
+The CSV needs a header row with username and password columns; role, full_name
+and bio are optional. Usage: python scripts/provision_users.py cohort.csv
+"""
+import argparse
+import csv
+import sys
+
+from pydantic import ValidationError
+
+from app.api.routes.users import provision_users
+from app.core.config import settings
+from app.core.passwords import shutdown_hash_pool
+from app.db.session import SessionLocal
+from app.schemas.user import UserProvision
+
+
+def read_users(path: str):
+    """Parse the CSV into UserProvision objects; returns (users, [(line, error), ...])."""
+    users, errors = [], []
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        for row in reader:
+            try:
+                users.append(UserProvision(**{key: value for key, value in row.items() if value}))
+            except ValidationError as exc:
+                details = "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in exc.errors()
+                )
+                errors.append((reader.line_num, details))
+    return users, errors
+
+
+def main():
+    """Read users from the CSV file and provision them in one pass."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv_file", help="CSV file with username,password[,role,full_name,bio]")
+    parser.add_argument("--workers", type=int, default=None, help="Password hashing processes")
+    args = parser.parse_args()
+
+    users, errors = read_users(args.csv_file)
+    if errors:
+        for line, message in errors:
+            print(f"{args.csv_file}:{line}: {message}", file=sys.stderr)
+        sys.exit(f"{len(errors)} invalid rows; nothing was provisioned")
+
+    if args.workers:
+        settings.hash_workers = args.workers
+    db = SessionLocal()
+    try:
+        created, skipped = provision_users(db, users)
+    finally:
+        db.close()
+        shutdown_hash_pool()
+    print(f"Created {len(created)} users, skipped {len(skipped)}")
+    for username in skipped:
+        print(f"  skipped: {username}")
+
+
+if __name__ == "__main__":
+    main()
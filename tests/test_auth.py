@@ -268,8 +268,187 @@ def test_list_all_users():
     # List users as admin
     resp = client.get(f"{API_PREFIX}/users/", headers=auth_headers(admin_token))
     assert resp.status_code == 200
-    users = resp.json()
+    users = resp.json()["items"]
     assert isinstance(users, list)
-    usernames = [u["username"] for u in users]
-    assert username2 in usernames
-    assert admin_username in usernames
+    for username in (username2, admin_username):
+        resp = client.get(
+            f"{API_PREFIX}/users/?username_prefix={username}", headers=auth_headers(admin_token)
+        )
+        assert [u["username"] for u in resp.json()["items"]] == [username]
+
+
+def make_admin_token():
+    """Register a user, promote it to admin and return its token."""
+    from app.db.session import SessionLocal
+    from app.db.models.user import User
+    username = unique_username()
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "adminpass"})
+    db = SessionLocal()
+    db.query(User).filter_by(username=username).update({User.role: UserRole.ADMIN})
+    db.commit()
+    db.close()
+    resp = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "adminpass"}
+    )
+    return resp.json()["access_token"]
+
+
+def test_list_users_keyset_pages_and_filters():
+    """Test walking user pages with the cursor and filtering by role and prefix."""
+    token = make_admin_token()
+    prefix = unique_name("cohort")
+    created = [f"{prefix}_{i}" for i in range(3)]
+    for username in created:
+        client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+
+    seen = []
+    url = f"{API_PREFIX}/users/?limit=2&username_prefix={prefix}"
+    resp = client.get(url, headers=auth_headers(token)).json()
+    seen += [u["username"] for u in resp["items"]]
+    assert resp["next_cursor"] is not None
+    resp = client.get(f"{url}&after_id={resp['next_cursor']}", headers=auth_headers(token)).json()
+    seen += [u["username"] for u in resp["items"]]
+    assert resp["next_cursor"] is None
+    assert seen == created
+
+    resp = client.get(
+        f"{API_PREFIX}/users/?role=ADMIN&username_prefix={prefix}", headers=auth_headers(token)
+    )
+    assert resp.json()["items"] == []
+    resp = client.get(f"{API_PREFIX}/users/?role=ADMIN", headers=auth_headers(token))
+    assert all(u["role"] == "ADMIN" for u in resp.json()["items"])
+
+
+def test_export_users_ndjson():
+    """Test the NDJSON export streams one user object per line."""
+    import json
+    token = make_admin_token()
+    prefix = unique_name("export")
+    for i in range(2):
+        client.post(f"{API_PREFIX}/auth/register", json={"username": f"{prefix}_{i}", "password": "pw"})
+    resp = client.get(
+        f"{API_PREFIX}/users/export?username_prefix={prefix}", headers=auth_headers(token)
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [u["username"] for u in lines] == [f"{prefix}_0", f"{prefix}_1"]
+
+
+def test_export_users_requires_admin(user_token):
+    """Test that non-admin users cannot export users."""
+    resp = client.get(f"{API_PREFIX}/users/export", headers=auth_headers(user_token))
+    assert resp.status_code == 403
+
+
+def test_bulk_create_users():
+    """Test bulk provisioning creates users with roles and skips taken usernames."""
+    token = make_admin_token()
+    prefix = unique_name("bulk")
+    taken = f"{prefix}_taken"
+    client.post(f"{API_PREFIX}/auth/register", json={"username": taken, "password": "pw"})
+    payload = {"users": [
+        {"username": f"{prefix}_a", "password": "pw-a"},
+        {"username": f"{prefix}_b", "password": "pw-b", "role": "ADMIN", "full_name": "B"},
+        {"username": f"{prefix}_a", "password": "dup"},
+        {"username": taken, "password": "pw"},
+    ]}
+    resp = client.post(f"{API_PREFIX}/users/bulk", json=payload, headers=auth_headers(token))
+    assert resp.status_code == 200
+    data = resp.json()
+    assert {u["username"]: u["role"] for u in data["created"]} == {
+        f"{prefix}_a": "USER", f"{prefix}_b": "ADMIN"
+    }
+    assert sorted(data["skipped"]) == sorted([f"{prefix}_a", taken])
+
+    login = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": f"{prefix}_b", "password": "pw-b"}
+    )
+    assert login.status_code == 200
+
+
+def test_bulk_create_users_requires_admin(user_token):
+    """Test that non-admin users cannot provision users."""
+    resp = client.post(
+        f"{API_PREFIX}/users/bulk",
+        json={"users": [{"username": unique_username(), "password": "pw"}]},
+        headers=auth_headers(user_token)
+    )
+    assert resp.status_code == 403
+
+
+def test_hash_passwords_with_process_pool():
+    """Test that pooled hashing is ordered, verifiable and reuses one spawned pool."""
+    from app.api.routes.users import verify_password
+    from app.core import passwords as hashing
+    batch = [f"secret-{i}" for i in range(8)]
+    try:
+        hashes = hashing.hash_passwords(batch, workers=2)
+        pool = hashing._hash_pool()
+        assert pool._mp_context.get_start_method() == "spawn"
+        hashing.hash_passwords(batch, workers=2)
+        assert hashing._hash_pool() is pool
+    finally:
+        hashing.shutdown_hash_pool()
+    assert hashing._pool is None
+    assert all(verify_password(p, h) for p, h in zip(batch, hashes))
+
+
+def test_bulk_create_users_rejects_concurrent_jobs(monkeypatch):
+    """Test that a bulk request beyond the concurrent job cap gets 429."""
+    import threading
+    from app.api.routes import users
+    token = make_admin_token()
+    monkeypatch.setattr(users, "_bulk_jobs", threading.BoundedSemaphore(1))
+    users._bulk_jobs.acquire()
+    resp = client.post(
+        f"{API_PREFIX}/users/bulk",
+        json={"users": [{"username": unique_username(), "password": "pw"}]},
+        headers=auth_headers(token)
+    )
+    assert resp.status_code == 429
+    users._bulk_jobs.release()
+    resp = client.post(
+        f"{API_PREFIX}/users/bulk",
+        json={"users": [{"username": unique_username(), "password": "pw"}]},
+        headers=auth_headers(token)
+    )
+    assert resp.status_code == 200
+
+
+def test_user_activity_feed_pages_through_all_sources(user_token, course_id):
+    """Test that the activity feed interleaves courses, comments and ratings with a cursor."""
+    me = client.get(f"{API_PREFIX}/users/me", headers=auth_headers(user_token)).json()
+    client.post(f"{API_PREFIX}/courses/{course_id}/comments/", json={"content": "one"},
+                headers=auth_headers(user_token))
+    client.post(f"{API_PREFIX}/courses/{course_id}/ratings/", json={"value": 4},
+                headers=auth_headers(user_token))
+    client.post(f"{API_PREFIX}/courses/{course_id}/comments/", json={"content": "two"},
+                headers=auth_headers(user_token))
+
+    items = []
+    cursor = None
+    for _ in range(5):
+        url = f"{API_PREFIX}/users/{me['id']}/activity?limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        resp = client.get(url)
+        assert resp.status_code == 200
+        items += resp.json()["items"]
+        cursor = resp.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(item["type"] for item in items) == ["comment", "comment", "course", "rating"]
+    assert len({(item["type"], item["id"]) for item in items}) == 4
+    keys = [item["created_at"] for item in items]
+    assert keys == sorted(keys, reverse=True)
+    assert {item["content"] for item in items if item["type"] == "comment"} == {"one", "two"}
+
+
+def test_user_activity_unknown_user_and_bad_cursor(user_token):
+    """Test the activity feed's 404 for missing users and 400 for malformed cursors."""
+    assert client.get(f"{API_PREFIX}/users/999999/activity").status_code == 404
+    me = client.get(f"{API_PREFIX}/users/me", headers=auth_headers(user_token)).json()
+    resp = client.get(f"{API_PREFIX}/users/{me['id']}/activity?cursor=not-a-cursor")
+    assert resp.status_code == 400
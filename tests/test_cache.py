@@ -0,0 +1,236 @@
+"""Test cases for the response cache and its invalidation by the write routes."""
+import socketserver
+import threading
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.cache import MemoryBackend, RedisBackend, ResponseCache
+from app.main import app
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+
+class _RespStandIn(socketserver.ThreadingTCPServer):
+    """A tiny in-memory server answering the RESP commands the cache uses."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.strings = {}  # key -> (value, expires_at)
+        self.sets = {}
+        self.lock = threading.Lock()
+
+    def run_command(self, name, args):
+        """Apply one command to the store and return its reply."""
+        # pylint: disable=too-many-return-statements
+        with self.lock:
+            if name == b"GET":
+                value, expires_at = self.strings.get(args[0], (None, None))
+                if expires_at is not None and expires_at <= time.monotonic():
+                    del self.strings[args[0]]
+                    return None
+                return value
+            if name == b"SET":
+                ttl = int(args[3]) / 1000 if len(args) > 3 else None
+                self.strings[args[0]] = (args[1], ttl and time.monotonic() + ttl)
+                return "OK"
+            if name == b"SADD":
+                members = self.sets.setdefault(args[0], set())
+                added = len(set(args[1:]) - members)
+                members.update(args[1:])
+                return added
+            if name == b"SREM":
+                members = self.sets.get(args[0], set())
+                removed = len(members & set(args[1:]))
+                members.difference_update(args[1:])
+                return removed
+            if name == b"SMEMBERS":
+                return sorted(self.sets.get(args[0], ()))
+            if name == b"DEL":
+                removed = [self.strings.pop(key, None) or self.sets.pop(key, None)
+                           for key in args]
+                return sum(item is not None for item in removed)
+            if name == b"PEXPIRE":
+                return 1
+            if name == b"FLUSHDB":
+                self.strings.clear()
+                self.sets.clear()
+                return "OK"
+            return ValueError(f"ERR unknown command {name!r}")
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """Reads RESP arrays and writes RESP replies."""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(self._encode(self.server.run_command(args[0].upper(), args[1:])))
+
+    def _encode(self, reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, ValueError):
+            return b"-%s\r\n" % str(reply).encode()
+        if isinstance(reply, str):
+            return b"+%s\r\n" % reply.encode()
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, list):
+            return b"*%d\r\n" % len(reply) + b"".join(self._encode(item) for item in reply)
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+
+@pytest.fixture(name="resp_server")
+def fixture_resp_server():
+    """Run the stand-in server on a free local port."""
+    server = _RespStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def auth_headers():
+    """Register a new user and return authorization headers for them."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "pw"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_memory_backend_lru_ttl_and_tags():
+    """Test eviction order, expiry and tag invalidation of the in-process backend."""
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", b"1", ttl=60, tags=["t1"])
+    backend.set("b", b"2", ttl=60, tags=["t2"])
+    assert backend.get("a") == b"1"  # a is now the most recently used
+    backend.set("c", b"3", ttl=60, tags=["t2"])
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+
+    backend.invalidate_tags(["t2"])
+    assert backend.get("c") is None
+    assert len(backend) == 1
+
+    backend.set("d", b"4", ttl=0)
+    assert backend.get("d") is None
+
+
+def test_redis_backend_against_stand_in(resp_server):
+    """Test that the RESP backend stores, expires and invalidates entries by tag."""
+    host, port = resp_server.server_address
+    backend = RedisBackend(f"redis://{host}:{port}/0", max_ttl=60)
+    backend.set("course:1", b'{"id":1}', ttl=60, tags=["course:1", "courses"])
+    backend.set("course:2", b'{"id":2}', ttl=60, tags=["course:2", "courses"])
+    assert backend.get("course:1") == b'{"id":1}'
+
+    backend.invalidate_tags(["course:1"])
+    assert backend.get("course:1") is None
+    assert backend.get("course:2") == b'{"id":2}'
+    backend.invalidate_tags(["courses"])
+    assert backend.get("course:2") is None
+
+    backend.set("short", b"x", ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get("short") is None
+
+
+def test_redis_backend_unreachable_is_a_miss(resp_server):
+    """Test that a server that went away turns reads into misses instead of errors."""
+    host, port = resp_server.server_address
+    resp_server.shutdown()
+    resp_server.server_close()
+    cache = ResponseCache(RedisBackend(f"redis://{host}:{port}/0"), ttl=60)
+    resp = cache.respond("key", lambda: {"ok": True})
+    assert resp.body == b'{"ok":true}'
+    cache.invalidate("key")
+
+
+def test_build_racing_an_invalidation_is_not_stored():
+    """Test that a payload built across an invalidation is returned but not kept."""
+    cache = ResponseCache(MemoryBackend(), ttl=60)
+
+    def build():
+        cache.invalidate("course:1")
+        return {"id": 1}
+
+    assert cache.respond("course:1", build, tags=["course:1"]).headers["x-cache"] == "miss"
+    assert cache.backend.get("course:1") is None
+
+
+def test_course_cache_invalidated_by_comments_and_updates():
+    """Test that a cached course is served until a comment or an update changes it."""
+    headers = auth_headers()
+    title = unique_name("Cached")
+    course = client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": title, "youtube_url": f"https://youtube.com/{title}"},
+        headers=headers,
+    ).json()
+    url = f"{API_PREFIX}/courses/{course['id']}"
+
+    assert client.get(url).headers["x-cache"] == "miss"
+    cached = client.get(url)
+    assert cached.headers["x-cache"] == "hit"
+    assert cached.json()["comment_count"] == 0
+
+    client.post(f"{url}/comments/", json={"content": "first"}, headers=headers)
+    resp = client.get(url)
+    assert resp.headers["x-cache"] == "miss"
+    assert resp.json()["comment_count"] == 1
+    assert [c["content"] for c in client.get(f"{url}/comments/").json()] == ["first"]
+
+    client.put(url, json={"title": f"{title}_v2", "youtube_url": f"https://youtube.com/{title}"},
+               headers=headers)
+    assert client.get(url).json()["title"] == f"{title}_v2"
+    listed = client.get(f"{API_PREFIX}/courses/", params={"search": title}).json()
+    assert [item["title"] for item in listed["items"]] == [f"{title}_v2"]
+
+    client.delete(url, headers=headers)
+    assert client.get(url).status_code == 404
+
+
+def test_category_cache_invalidated_when_courses_move():
+    """Test that category counts and the moved course refresh after a category update."""
+    headers = auth_headers()
+    title = unique_name("Moved")
+    course = client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": title, "youtube_url": f"https://youtube.com/{title}"},
+        headers=headers,
+    ).json()
+    category = client.post(
+        f"{API_PREFIX}/categories/", json={"name": unique_name("Cat")}, headers=headers
+    ).json()
+    category_url = f"{API_PREFIX}/categories/{category['id']}"
+    assert client.get(category_url).json()["course_count"] == 0
+    assert client.get(f"{API_PREFIX}/courses/{course['id']}").json()["category_id"] is None
+
+    client.put(category_url, json={"add_course_ids": [course["id"]]}, headers=headers)
+    assert client.get(category_url).json()["course_count"] == 1
+    assert client.get(f"{API_PREFIX}/courses/{course['id']}").json()["category_id"] == \
+        category["id"]
+
+    client.delete(category_url, headers=headers)
+    assert client.get(f"{API_PREFIX}/courses/{course['id']}").json()["category_id"] is None
@@ -258,7 +258,7 @@ def test_create_category_with_courses(user_token):
     # Create category with these courses
     cat_name = unique_name("CatWithCourses")
     response = client.post(
-        f"{API_PREFIX}/categories/",
+        f"{API_PREFIX}/categories/?include_courses=true",
         json={"name": cat_name, "course_ids": [course_id1, course_id2]},
         headers=auth_headers(user_token)
     )
@@ -300,7 +300,7 @@ def test_update_category_add_and_remove_courses(user_token):
 
     # Add both courses to the category
     response = client.put(
-        f"{API_PREFIX}/categories/{category_id}",
+        f"{API_PREFIX}/categories/{category_id}?include_courses=true",
         json={"add_course_ids": [course_id1, course_id2]},
         headers=auth_headers(user_token)
     )
@@ -312,7 +312,7 @@ def test_update_category_add_and_remove_courses(user_token):
 
     # Remove one course from the category
     response = client.put(
-        f"{API_PREFIX}/categories/{category_id}",
+        f"{API_PREFIX}/categories/{category_id}?include_courses=true",
         json={"remove_course_ids": [course_id1]},
         headers=auth_headers(user_token)
     )
@@ -373,3 +373,270 @@ def test_category_get_id_and_to_dict():
     # If your Category model includes other fields (e.g., courses), check them as well
     if "courses" in d:
         assert isinstance(d["courses"], list)
+
+
+def test_list_categories_served_from_snapshot(user_token, monkeypatch):
+    """Test that repeated listings reuse the snapshot and writes invalidate it."""
+    from app.core.snapshots import CategorySnapshot, category_snapshot
+    builds = []
+    original_build = CategorySnapshot._build
+
+    def counting_build(db):
+        builds.append(1)
+        return original_build(db)
+
+    monkeypatch.setattr(CategorySnapshot, "_build", staticmethod(counting_build))
+    category_snapshot.invalidate()
+
+    client.get(f"{API_PREFIX}/categories/")
+    client.get(f"{API_PREFIX}/categories/")
+    assert len(builds) == 1
+
+    cat_name = unique_name("SnapshotCat")
+    category_id = client.post(
+        f"{API_PREFIX}/categories/", json={"name": cat_name}, headers=auth_headers(user_token)
+    ).json()["id"]
+    course = client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": unique_name("SnapCourse"), "youtube_url": unique_youtube_url(),
+              "category_id": category_id},
+        headers=auth_headers(user_token)
+    ).json()
+
+    data = client.get(f"{API_PREFIX}/categories/?include_courses=true").json()
+    assert len(builds) == 2
+    listed = next(cat for cat in data if cat["id"] == category_id)
+    assert [c["id"] for c in listed["courses"]] == [course["id"]]
+    assert listed["course_count"] == 1
+
+    data = client.get(f"{API_PREFIX}/categories/").json()
+    assert len(builds) == 2
+    listed = next(cat for cat in data if cat["id"] == category_id)
+    assert listed["courses"] == []
+    assert listed["course_count"] == 1
+
+
+def test_create_category_with_missing_courses_is_not_persisted(user_token):
+    """Test that a create rejected for missing courses leaves no category behind."""
+    cat_name = unique_name("RolledBackCat")
+    response = client.post(
+        f"{API_PREFIX}/categories/",
+        json={"name": cat_name, "course_ids": [987654]},
+        headers=auth_headers(user_token)
+    )
+    assert response.status_code == 404
+    names = [cat["name"] for cat in client.get(f"{API_PREFIX}/categories/").json()]
+    assert cat_name not in names
+
+
+def test_update_category_without_course_list(user_token):
+    """Test that course briefs are left out of update responses unless requested."""
+    category_id = client.post(
+        f"{API_PREFIX}/categories/", json={"name": unique_name("NoListCat")},
+        headers=auth_headers(user_token)
+    ).json()["id"]
+    course_id = client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": unique_name("NoListCourse"), "youtube_url": unique_youtube_url()},
+        headers=auth_headers(user_token)
+    ).json()["id"]
+
+    response = client.put(
+        f"{API_PREFIX}/categories/{category_id}",
+        json={"add_course_ids": [course_id]},
+        headers=auth_headers(user_token)
+    )
+    assert response.status_code == 200
+    assert response.json()["courses"] == []
+    course = client.get(f"{API_PREFIX}/courses/{course_id}").json()
+    assert course["category_id"] == category_id
+
+
+def create_category_named(token, name, parent_id=None):
+    """Create a category, optionally under a parent, and return its ID."""
+    response = client.post(
+        f"{API_PREFIX}/categories/", json={"name": name, "parent_id": parent_id},
+        headers=auth_headers(token)
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def find_node(nodes, category_id):
+    """Find a node by ID anywhere in a category tree."""
+    for node in nodes:
+        if node["id"] == category_id:
+            return node
+        found = find_node(node["children"], category_id)
+        if found:
+            return found
+    return None
+
+
+def test_category_tree_and_descendant_course_filter(user_token):
+    """Test nested categories in the tree and the subtree-wide course filter."""
+    programming = create_category_named(user_token, unique_name("Programming"))
+    python = create_category_named(user_token, unique_name("Python"), programming)
+    web = create_category_named(user_token, unique_name("Web"), python)
+    course_id = client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": unique_name("Django"), "youtube_url": unique_youtube_url(),
+              "category_id": web},
+        headers=auth_headers(user_token)
+    ).json()["id"]
+
+    tree = client.get(f"{API_PREFIX}/categories/tree").json()
+    root = find_node(tree, programming)
+    assert root["parent_id"] is None
+    assert [child["id"] for child in root["children"]] == [python]
+    assert [child["id"] for child in root["children"][0]["children"]] == [web]
+
+    for ancestor in (programming, python, web):
+        items = client.get(f"{API_PREFIX}/courses/?category_id={ancestor}").json()["items"]
+        assert [course["id"] for course in items] == [course_id]
+
+
+def test_move_category_subtree(user_token):
+    """Test moving a category carries its subtree and rejects cycles."""
+    first = create_category_named(user_token, unique_name("First"))
+    second = create_category_named(user_token, unique_name("Second"))
+    child = create_category_named(user_token, unique_name("Child"), first)
+    course_id = client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": unique_name("Moved"), "youtube_url": unique_youtube_url(),
+              "category_id": child},
+        headers=auth_headers(user_token)
+    ).json()["id"]
+
+    response = client.put(
+        f"{API_PREFIX}/categories/{first}", json={"parent_id": child},
+        headers=auth_headers(user_token)
+    )
+    assert response.status_code == 400
+
+    response = client.put(
+        f"{API_PREFIX}/categories/{first}", json={"parent_id": second},
+        headers=auth_headers(user_token)
+    )
+    assert response.status_code == 200
+    assert response.json()["parent_id"] == second
+    items = client.get(f"{API_PREFIX}/courses/?category_id={second}").json()["items"]
+    assert [course["id"] for course in items] == [course_id]
+
+    response = client.put(
+        f"{API_PREFIX}/categories/{first}", json={"parent_id": None},
+        headers=auth_headers(user_token)
+    )
+    assert response.json()["parent_id"] is None
+    assert client.get(f"{API_PREFIX}/courses/?category_id={second}").json()["items"] == []
+
+
+def test_delete_category_reparents_children(user_token):
+    """Test that deleting a category moves its children up to its parent."""
+    top = create_category_named(user_token, unique_name("Top"))
+    middle = create_category_named(user_token, unique_name("Middle"), top)
+    leaf = create_category_named(user_token, unique_name("Leaf"), middle)
+    client.delete(f"{API_PREFIX}/categories/{middle}", headers=auth_headers(user_token))
+
+    tree = client.get(f"{API_PREFIX}/categories/tree").json()
+    assert [child["id"] for child in find_node(tree, top)["children"]] == [leaf]
+
+
+def test_create_category_with_nonexistent_parent(user_token):
+    """Test creating a category under a missing parent returns 404."""
+    response = client.post(
+        f"{API_PREFIX}/categories/", json={"name": unique_name("Orphan"), "parent_id": 999999},
+        headers=auth_headers(user_token)
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Parent category not found"
+
+
+def test_category_course_count_and_keyset_listing(user_token):
+    """Test course_count, capped embedding and keyset pages of a category's courses."""
+    category_id = create_category_named(user_token, unique_name("Paged"))
+    course_ids = [
+        client.post(
+            f"{API_PREFIX}/courses/",
+            json={"title": unique_name("PagedCourse"), "youtube_url": unique_youtube_url(),
+                  "category_id": category_id},
+            headers=auth_headers(user_token)
+        ).json()["id"]
+        for _ in range(5)
+    ]
+
+    data = client.get(f"{API_PREFIX}/categories/{category_id}").json()
+    assert data["course_count"] == 5
+    assert data["courses"] == []
+    data = client.get(
+        f"{API_PREFIX}/categories/{category_id}?include_courses=true&courses_limit=2"
+    ).json()
+    assert [c["id"] for c in data["courses"]] == course_ids[:2]
+
+    seen = []
+    cursor = None
+    while True:
+        url = f"{API_PREFIX}/categories/{category_id}/courses?limit=2"
+        if cursor is not None:
+            url += f"&after_id={cursor}"
+        page = client.get(url).json()
+        seen += [c["id"] for c in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == course_ids
+
+
+def test_category_courses_direct_or_with_subcategories(user_token):
+    """Test that category courses are direct by default and include descendants on request."""
+    parent = create_category_named(user_token, unique_name("Parent"))
+    child = create_category_named(user_token, unique_name("Child"), parent)
+    course_ids = [
+        client.post(
+            f"{API_PREFIX}/courses/",
+            json={"title": unique_name("Nested"), "youtube_url": unique_youtube_url(),
+                  "category_id": category_id},
+            headers=auth_headers(user_token)
+        ).json()["id"]
+        for category_id in (parent, child)
+    ]
+
+    assert client.get(f"{API_PREFIX}/categories/{parent}").json()["course_count"] == 1
+    page = client.get(f"{API_PREFIX}/categories/{parent}/courses").json()
+    assert [c["id"] for c in page["items"]] == course_ids[:1]
+    page = client.get(
+        f"{API_PREFIX}/categories/{parent}/courses?include_subcategories=true"
+    ).json()
+    assert [c["id"] for c in page["items"]] == course_ids
+
+
+def test_list_courses_of_nonexistent_category():
+    """Test listing the courses of a missing category returns 404."""
+    response = client.get(f"{API_PREFIX}/categories/999999/courses")
+    assert response.status_code == 404
+
+
+def test_category_snapshot_expires_after_max_age(monkeypatch):
+    """Test that a snapshot is rebuilt once older than max_age, even without invalidation."""
+    from app.core.snapshots import CategorySnapshot
+    from app.db.session import SessionLocal
+    builds = []
+    original_build = CategorySnapshot._build
+
+    def counting_build(db):
+        builds.append(1)
+        return original_build(db)
+
+    monkeypatch.setattr(CategorySnapshot, "_build", staticmethod(counting_build))
+    snapshot = CategorySnapshot(max_age=30)
+    db = SessionLocal()
+    try:
+        snapshot.get(db)
+        snapshot.get(db)
+        assert len(builds) == 1
+        # Age the snapshot past max_age
+        snapshot._built_at -= 31
+        snapshot.get(db)
+        assert len(builds) == 2
+    finally:
+        db.close()
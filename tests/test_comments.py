@@ -1,4 +1,6 @@
 """Test cases for course comments API endpoints."""
+import asyncio
+import json
 import uuid
 from datetime import datetime, timezone
 
@@ -300,3 +302,119 @@ def test_comment_get_id_and_to_dict():
     assert d["content"] == "Test comment"
     assert d["created_at"] == now.isoformat()
     assert d["user_id"] == 7
+
+
+def test_comment_count_tracks_add_and_delete(user_token, course_id):
+    """Test that the course comment_count follows added and deleted comments."""
+    first = client.post(
+        f"{API_PREFIX}/courses/{course_id}/comments/",
+        json={"content": "First"},
+        headers=auth_headers(user_token)
+    ).json()
+    client.post(
+        f"{API_PREFIX}/courses/{course_id}/comments/",
+        json={"content": "Second"},
+        headers=auth_headers(user_token)
+    )
+    assert client.get(f"{API_PREFIX}/courses/{course_id}").json()["comment_count"] == 2
+
+    client.delete(
+        f"{API_PREFIX}/courses/{course_id}/comments/{first['id']}", headers=auth_headers(user_token)
+    )
+    assert client.get(f"{API_PREFIX}/courses/{course_id}").json()["comment_count"] == 1
+
+
+def test_comment_changes_are_published(user_token, course_id, monkeypatch):
+    """Test that add, edit and delete publish events on the course topic after commit."""
+    from app.core.pubsub import comment_hub
+    published = []
+    monkeypatch.setattr(comment_hub, "publish", lambda topic, event: published.append((topic, event)))
+
+    comment_id = client.post(
+        f"{API_PREFIX}/courses/{course_id}/comments/",
+        json={"content": "Live"},
+        headers=auth_headers(user_token)
+    ).json()["id"]
+    client.put(
+        f"{API_PREFIX}/courses/{course_id}/comments/{comment_id}",
+        json={"content": "Live edit"},
+        headers=auth_headers(user_token)
+    )
+    client.delete(
+        f"{API_PREFIX}/courses/{course_id}/comments/{comment_id}", headers=auth_headers(user_token)
+    )
+    assert [event["type"] for _, event in published] == ["created", "updated", "deleted"]
+    assert all(topic == f"course:{course_id}" for topic, _ in published)
+    assert published[1][1]["comment"]["content"] == "Live edit"
+
+
+def test_stream_comments_nonexistent_course():
+    """Test that streaming comments for a missing course returns 404."""
+    resp = client.get(f"{API_PREFIX}/courses/999999/comments/stream")
+    assert resp.status_code == 404
+
+
+def _stream_until(course_id, trigger, stop_marker):
+    """Open the comment stream over raw ASGI, run trigger once subscribed, collect frames."""
+    from app.core.pubsub import comment_hub
+    topic = f"course:{course_id}"
+    body = []
+
+    async def run():
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+                if stop_marker in b"".join(body):
+                    disconnected.set()
+
+        path = f"{API_PREFIX}/courses/{course_id}/comments/stream"
+        scope = {
+            "type": "http", "method": "GET", "path": path, "raw_path": path.encode(),
+            "query_string": b"", "root_path": "", "scheme": "http", "http_version": "1.1",
+            "server": ("test", 80), "client": ("test", 1234), "headers": [],
+        }
+        stream = asyncio.create_task(app(scope, receive, send))
+        for _ in range(200):
+            if comment_hub.subscriber_count(topic):
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.to_thread(trigger)
+        await asyncio.wait_for(stream, timeout=5)
+        assert comment_hub.subscriber_count(topic) == 0
+
+    asyncio.run(run())
+    return b"".join(body).decode()
+
+
+def test_stream_comments_delivers_created_event(user_token, course_id):
+    """Test that a subscribed stream receives a created frame for a new comment."""
+    frames = _stream_until(
+        course_id,
+        lambda: client.post(f"{API_PREFIX}/courses/{course_id}/comments/",
+                            json={"content": "Streamed"}, headers=auth_headers(user_token)),
+        b"event: created",
+    )
+    assert "event: created" in frames
+    data = json.loads(frames.split("event: created\ndata: ", 1)[1].split("\n", 1)[0])
+    assert data["content"] == "Streamed"
+    assert data["course_id"] == course_id
+
+
+def test_stream_comments_signals_truncated_events(course_id):
+    """Test that events too large to fan out reach clients as refetch frames."""
+    from app.core.pubsub import comment_hub
+    frames = _stream_until(
+        course_id,
+        lambda: comment_hub.publish(f"course:{course_id}", {
+            "type": "updated", "comment": {"id": 42, "course_id": course_id}, "truncated": True,
+        }),
+        b"event: refetch",
+    )
+    data = json.loads(frames.split("event: refetch\ndata: ", 1)[1].split("\n", 1)[0])
+    assert data == {"event": "updated", "comment": {"id": 42, "course_id": course_id}}
@@ -0,0 +1,186 @@
+"""Test cases for the response compression middleware."""
+import asyncio
+import gzip
+import uuid
+import zlib
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middleware.compression import CompressionMiddleware, parse_accept_encoding
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+LARGE_TEXT = "course " * 500
+
+demo = FastAPI()
+
+
+@demo.get("/large")
+def large():
+    """A body well above the threshold."""
+    return PlainTextResponse(LARGE_TEXT)
+
+
+@demo.get("/small")
+def small():
+    """A body below the threshold."""
+    return PlainTextResponse("tiny")
+
+
+@demo.get("/image")
+def image():
+    """A large body of a media type that is already compressed."""
+    return Response(b"\x89PNG" + b"\x00" * 2000, media_type="image/png")
+
+
+@demo.get("/encoded")
+def encoded():
+    """A large body the application compressed itself."""
+    return Response(gzip.compress(LARGE_TEXT.encode()), media_type="text/plain",
+                    headers={"Content-Encoding": "gzip"})
+
+
+@demo.get("/not-modified")
+def not_modified():
+    """A 304 response."""
+    return Response(status_code=304, headers={"ETag": '"v1"'})
+
+
+@demo.get("/stream")
+def stream():
+    """A streaming body sent in several chunks."""
+    return StreamingResponse(iter(["data: one\n\n", "data: two\n\n"]),
+                             media_type="text/event-stream")
+
+
+demo.add_middleware(CompressionMiddleware, minimum_size=500, gzip_level=6)
+demo_client = TestClient(demo)
+
+
+def test_parse_accept_encoding():
+    """Test that codings and q-values are parsed, tolerating odd spacing and bad values."""
+    assert parse_accept_encoding("gzip, br;q=0.5 , identity;q=x") == {
+        "gzip": 1.0, "br": 0.5, "identity": 0.0
+    }
+    assert parse_accept_encoding("") == {}
+
+
+def test_large_body_is_gzipped():
+    """Test that a large text body is gzipped when the client accepts it."""
+    resp = demo_client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert int(resp.headers["content-length"]) < len(LARGE_TEXT)
+    assert resp.text == LARGE_TEXT
+
+
+def test_identity_when_not_accepted():
+    """Test that nothing is compressed for clients that refuse every coding."""
+    for accept in ("identity", "gzip;q=0", "*;q=0"):
+        resp = demo_client.get("/large", headers={"Accept-Encoding": accept})
+        assert "content-encoding" not in resp.headers
+        assert resp.text == LARGE_TEXT
+
+
+def test_small_and_non_text_bodies_are_not_compressed():
+    """Test that bodies below the threshold and binary media types pass through."""
+    for path in ("/small", "/image"):
+        resp = demo_client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert "content-encoding" not in resp.headers
+    # A small text body could have been compressed, so caches must still key on the coding
+    resp = demo_client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["vary"] == "Accept-Encoding"
+    resp = demo_client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert "vary" not in demo_client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_brotli_is_preferred_when_available():
+    """Test that br is negotiated when installed, honouring q-values against gzip."""
+    pytest.importorskip("brotli")
+    resp = demo_client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["content-encoding"] == "br"
+    assert resp.text == LARGE_TEXT
+
+    resp = demo_client.get("/large", headers={"Accept-Encoding": "gzip;q=1.0, br;q=0.5"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.text == LARGE_TEXT
+
+
+def test_already_encoded_and_not_modified_are_skipped():
+    """Test that encoded bodies are not compressed twice and 304s are untouched."""
+    resp = demo_client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.text == LARGE_TEXT
+
+    resp = demo_client.get("/not-modified", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 304
+    assert "content-encoding" not in resp.headers
+    assert resp.headers["etag"] == '"v1"'
+
+
+def test_stream_is_compressed_incrementally():
+    """Test that each streamed chunk is flushed so it can be decoded on arrival."""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        # The client never disconnects; the response finishes on its own
+        await asyncio.Event().wait()
+
+    scope = {
+        "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream",
+        "query_string": b"", "root_path": "", "scheme": "http", "http_version": "1.1",
+        "server": ("test", 80), "client": ("test", 1234),
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    asyncio.run(demo(scope, receive, send))
+
+    start = sent[0]
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    bodies = [message for message in sent[1:] if message["type"] == "http.response.body"]
+    assert decoder.decompress(bodies[0]["body"]) == b"data: one\n\n"
+    assert decoder.decompress(bodies[1]["body"]) == b"data: two\n\n"
+    assert bodies[-1]["more_body"] is False
+    decoder.decompress(bodies[-1]["body"])
+    assert decoder.eof
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def test_api_list_is_compressed():
+    """Test that the application compresses large JSON responses."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "pw"}
+    ).json()["access_token"]
+    prefix = unique_name("Compressed")
+    for index in range(10):
+        client.post(
+            f"{API_PREFIX}/courses/",
+            json={"title": f"{prefix}_{index}", "description": "x" * 100,
+                  "youtube_url": f"https://youtube.com/{prefix}_{index}"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    resp = client.get(f"{API_PREFIX}/courses/", params={"search": prefix, "page_size": 100},
+                      headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.json()["total"] == 10
@@ -457,3 +457,50 @@ def test_course_get_id_and_to_dict():
     d = course.to_dict()
     assert d["category"] is None
     assert d["creator"] is None
+
+
+def test_list_courses_matches_single_course_payload(user_token, category_id):
+    """Test that the column-based listing encodes courses exactly like the model path."""
+    title = unique_name("FastPathCourse")
+    course_id = client.post(
+        f"{API_PREFIX}/courses/",
+        json={
+            "title": title,
+            "description": "desc",
+            "youtube_url": "https://youtube.com/test",
+            "category_id": category_id
+        },
+        headers=auth_headers(user_token)
+    ).json()["id"]
+
+    resp = client.get(f"{API_PREFIX}/courses/", params={"search": title})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    data = resp.json()
+    assert data["total"] == 1
+    assert data["items"] == [client.get(f"{API_PREFIX}/courses/{course_id}").json()]
+
+
+def test_course_page_reads_rows_without_tracking(user_token, category_id):
+    """Test that the read-only layer returns slotted rows and leaves the session empty."""
+    from app.db.readers import CourseRow, course_page
+    from app.db.session import SessionLocal
+
+    title = unique_name("ReaderCourse")
+    client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": title, "youtube_url": "https://youtube.com/test",
+              "category_id": category_id},
+        headers=auth_headers(user_token)
+    )
+    db = SessionLocal()
+    try:
+        total, rows = course_page(db, [Course.title == title])
+        assert total == 1
+        assert isinstance(rows[0], CourseRow)
+        assert not hasattr(rows[0], "__dict__")
+        assert rows[0].title == title
+        assert rows[0].creator.username
+        assert len(db.identity_map) == 0
+    finally:
+        db.close()
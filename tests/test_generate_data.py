@@ -0,0 +1,102 @@
+"""Test cases for the synthetic data generator."""
+import random
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+
+from app.db.models.comment import Comment
+from app.db.models.course import Course
+from app.db.models.rating import Rating
+from app.db.models.user import User
+from app.generate_data import generate, popularity, spread
+
+SIZES = {"users": 30, "categories": 6, "courses": 40, "comments": 300, "ratings": 400}
+
+
+def dump(engine):
+    """Return every row of the generated tables, in a stable order."""
+    with engine.connect() as conn:
+        return {
+            table: conn.execute(text(f"SELECT * FROM {table} ORDER BY 1, 2")).all()
+            for table in ("users", "categories", "category_closure", "courses", "comments",
+                          "ratings")
+        }
+
+
+@pytest.fixture(name="database")
+def database_fixture(tmp_path):
+    """Return a factory of engines on fresh SQLite files."""
+    engines = []
+
+    def make(name):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+def test_same_seed_same_rows(database):
+    """Test that a seed always produces the same dataset and another seed a different one."""
+    first, second, other = database("a.db"), database("b.db"), database("c.db")
+    written = generate(first, seed=7, **SIZES)
+    generate(second, seed=7, **SIZES)
+    generate(other, seed=8, **SIZES)
+    assert dump(first) == dump(second)
+    assert dump(first)["ratings"] != dump(other)["ratings"]
+    assert written["users"] == 30
+    assert written["courses"] == 40
+    assert abs(written["comments"] - 300) < 30
+    assert abs(written["ratings"] - 400) < 40
+
+
+def test_rows_respect_the_constraints(database):
+    """Test one rating per user and course, matching counters and a consistent closure."""
+    engine = database("data.db")
+    written = generate(engine, **SIZES)
+    with engine.connect() as conn:
+        pairs = conn.execute(select(Rating.user_id, Rating.course_id)).all()
+        assert len(pairs) == len(set(pairs)) == written["ratings"]
+        mismatched = conn.execute(
+            select(func.count()).select_from(Course).where(
+                (Course.comment_count != select(func.count()).where(
+                    Comment.course_id == Course.id).scalar_subquery())
+                | (Course.rating_count != select(func.count()).where(
+                    Rating.course_id == Course.id).scalar_subquery())
+                | (Course.rating_sum != select(func.coalesce(func.sum(Rating.value), 0)).where(
+                    Rating.course_id == Course.id).scalar_subquery())
+            )
+        ).scalar()
+        assert mismatched == 0
+        # Every category reaches itself at depth 0 and its parent at depth 1
+        categories = conn.execute(text("SELECT id, parent_id FROM categories")).all()
+        closure = set(conn.execute(
+            text("SELECT ancestor_id, descendant_id, depth FROM category_closure")
+        ).all())
+        expected = {(category, category, 0) for category, _ in categories}
+        expected |= {(parent, category, 1) for category, parent in categories if parent}
+        assert closure == expected
+        assert conn.execute(select(User.role).where(User.id == 1)).scalar() == "ADMIN"
+
+
+def test_refuses_a_database_with_data(database):
+    """Test that generating into a populated database fails without writing."""
+    engine = database("data.db")
+    generate(engine, **SIZES)
+    with pytest.raises(ValueError, match="not empty"):
+        generate(engine, **SIZES)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(User)).scalar() == 30
+
+
+def test_activity_is_skewed_and_capped():
+    """Test that a few items take most events and no count exceeds the cap."""
+    rng = random.Random(0)
+    counts = spread(rng, popularity(rng, 1000, 1.0), 100000, cap=500)
+    assert max(counts) == 500
+    assert abs(sum(counts) - 100000) < 1000
+    ordered = sorted(counts, reverse=True)
+    # A tenth of the items get four times their even share
+    assert sum(ordered[:100]) > 0.4 * sum(ordered)
@@ -0,0 +1,91 @@
+"""Test cases for the cross-worker cache invalidation bus."""
+import json
+import threading
+
+import pytest
+
+from app.core.cache import MemoryBackend as MemoryCacheBackend
+from app.core.cache import ResponseCache
+from app.core.invalidation import InvalidationBus, MemoryBackend, PostgresBackend
+from app.db.session import engine
+
+
+def worker(backend, origin):
+    """Build one simulated worker: a bus on the shared backend feeding its own cache."""
+    cache = ResponseCache(MemoryCacheBackend(), ttl=60)
+    bus = InvalidationBus(backend, origin=origin)
+    bus.subscribe(cache.apply_invalidation, cache.flush)
+    bus.start()
+    return bus, cache
+
+
+def event(origin, seq, *tags):
+    """Encode an event as a backend would deliver it."""
+    return json.dumps({"origin": origin, "seq": seq, "tags": list(tags)})
+
+
+def test_publish_reaches_every_worker():
+    """Test that tags published by one worker are dropped from every worker's cache."""
+    backend = MemoryBackend()
+    workers = [worker(backend, origin) for origin in ("a", "b", "c")]
+    for _, cache in workers:
+        cache.respond("course:1", lambda: {"id": 1}, tags=["course:1"])
+        cache.respond("course:2", lambda: {"id": 2}, tags=["course:2"])
+
+    workers[0][0].publish("course:1")
+    for bus, cache in workers:
+        assert cache.backend.get("course:1") is None
+        assert cache.backend.get("course:2") is not None
+        assert bus.flushes == 0
+    assert [bus.received for bus, _ in workers] == [0, 1, 1]
+
+
+def test_sequence_gap_flushes_and_duplicates_are_ignored():
+    """Test that a skipped sequence number flushes and a replayed event does nothing."""
+    bus, cache = worker(MemoryBackend(), "me")
+    cache.respond("course:1", lambda: {"id": 1}, tags=["course:1"])
+    cache.respond("course:2", lambda: {"id": 2}, tags=["course:2"])
+
+    bus._receive(event("other", 1, "course:1"))  # pylint: disable=protected-access
+    assert cache.backend.get("course:1") is None
+    assert cache.backend.get("course:2") is not None
+
+    bus._receive(event("other", 1, "course:2"))  # pylint: disable=protected-access
+    assert cache.backend.get("course:2") is not None
+    assert bus.flushes == 0
+
+    bus._receive(event("other", 3, "course:9"))  # pylint: disable=protected-access
+    assert bus.flushes == 1
+    assert cache.backend.get("course:2") is None
+
+
+def test_oversized_event_becomes_a_flush():
+    """Test that an event too large for NOTIFY tells the other workers to flush."""
+    backend = MemoryBackend()
+    publisher, _ = worker(backend, "a")
+    receiver, cache = worker(backend, "b")
+    cache.respond("course:1", lambda: {"id": 1}, tags=["course:1"])
+
+    publisher.publish(*(f"course:{course_id}" for course_id in range(2000)))
+    assert receiver.flushes == 1
+    assert cache.backend.get("course:1") is None
+
+
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="needs LISTEN/NOTIFY")
+def test_postgres_backend_delivers_between_buses():
+    """Test that an event NOTIFYed by one bus is applied by another LISTENing bus."""
+    received = threading.Event()
+    publisher = InvalidationBus(PostgresBackend(engine, channel="test_invalidation"))
+    listener = InvalidationBus(PostgresBackend(engine, channel="test_invalidation"))
+    listener.subscribe(lambda tags, local: received.set(), lambda: None)
+    listener.start()
+    try:
+        # Retry until the LISTEN thread is connected
+        for _ in range(20):
+            publisher.publish("course:1")
+            if received.wait(timeout=0.5):
+                break
+        assert received.is_set()
+        assert listener.received >= 1
+    finally:
+        listener.stop()
@@ -0,0 +1,121 @@
+"""Test cases for MessagePack content negotiation."""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middleware import messagepack
+from app.middleware.messagepack import wants_msgpack
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+requires_msgpack = pytest.mark.skipif(messagepack.msgpack is None, reason="msgpack not installed")
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def user_token():
+    """Fixture to create a user and return an authentication token."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+    resp = client.post(f"{API_PREFIX}/auth/login", json={"username": username, "password": "pw"})
+    return resp.json()["access_token"]
+
+
+def auth_headers(token):
+    """Generate authorization headers for authenticated requests."""
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_wants_msgpack():
+    """Test Accept negotiation: explicit opt-in, q-values respected, JSON by default."""
+    assert wants_msgpack("application/msgpack")
+    assert wants_msgpack("application/json, application/x-msgpack")
+    assert wants_msgpack("application/msgpack, */*;q=0.1")
+    assert not wants_msgpack("application/json;q=1, application/msgpack;q=0.5")
+    assert not wants_msgpack("*/*")
+    assert not wants_msgpack("")
+
+
+@requires_msgpack
+def test_course_round_trip_in_msgpack(user_token):
+    """Test creating a course from a MessagePack body and reading CourseOut back as MessagePack."""
+    msgpack = messagepack.msgpack
+    title = unique_name("PackedCourse")
+    resp = client.post(
+        f"{API_PREFIX}/courses/",
+        content=msgpack.packb({"title": title, "youtube_url": "https://youtube.com/packed"}),
+        headers={**auth_headers(user_token), "Content-Type": "application/msgpack",
+                 "Accept": "application/msgpack"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/msgpack"
+    created = msgpack.unpackb(resp.content)
+    assert created["title"] == title
+
+    resp = client.get(f"{API_PREFIX}/courses/{created['id']}",
+                      headers={"Accept": "application/msgpack"})
+    assert msgpack.unpackb(resp.content) == client.get(
+        f"{API_PREFIX}/courses/{created['id']}"
+    ).json()
+
+
+@requires_msgpack
+def test_comment_and_rating_lists_in_msgpack(user_token):
+    """Test that CommentOut and RatingOut lists are served as MessagePack on request."""
+    msgpack = messagepack.msgpack
+    course_id = client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": unique_name("Packed"), "youtube_url": "https://youtube.com/packed2"},
+        headers=auth_headers(user_token),
+    ).json()["id"]
+    client.post(f"{API_PREFIX}/courses/{course_id}/comments/",
+                content=msgpack.packb({"content": "binary hello"}),
+                headers={**auth_headers(user_token), "Content-Type": "application/msgpack"})
+    client.post(f"{API_PREFIX}/courses/{course_id}/ratings/", json={"value": 5},
+                headers=auth_headers(user_token))
+
+    for path in ("comments", "ratings"):
+        resp = client.get(f"{API_PREFIX}/courses/{course_id}/{path}/",
+                          headers={"Accept": "application/msgpack"})
+        assert resp.headers["content-type"] == "application/msgpack"
+        assert resp.headers["vary"] == "Accept"
+        assert msgpack.unpackb(resp.content) == client.get(
+            f"{API_PREFIX}/courses/{course_id}/{path}/"
+        ).json()
+
+
+@requires_msgpack
+def test_malformed_msgpack_body_is_rejected(user_token):
+    """Test that an undecodable MessagePack body gets 400."""
+    resp = client.post(
+        f"{API_PREFIX}/courses/", content=b"\xc1",
+        headers={**auth_headers(user_token), "Content-Type": "application/msgpack"},
+    )
+    assert resp.status_code == 400
+
+
+def test_json_stays_the_default():
+    """Test that clients that do not ask for MessagePack get JSON."""
+    resp = client.get(f"{API_PREFIX}/courses/?page_size=1")
+    assert resp.headers["content-type"] == "application/json"
+
+
+@pytest.mark.skipif(messagepack.msgpack is not None, reason="msgpack is installed")
+def test_without_msgpack_bodies_are_refused_and_json_served(user_token):
+    """Test the fallback when the optional msgpack package is missing."""
+    resp = client.post(
+        f"{API_PREFIX}/courses/", content=b"\x80",
+        headers={**auth_headers(user_token), "Content-Type": "application/msgpack"},
+    )
+    assert resp.status_code == 415
+    resp = client.get(f"{API_PREFIX}/courses/?page_size=1",
+                      headers={"Accept": "application/msgpack"})
+    assert resp.headers["content-type"] == "application/json"
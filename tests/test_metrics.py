@@ -0,0 +1,63 @@
+"""Test cases for the Prometheus metrics endpoint."""
+import re
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Counter, Histogram
+from app.main import app
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+
+def sample(text, name, **labels):
+    """Return the value of one sample in an exposition, or None if absent."""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(wanted)}\}} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else None
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that bucket counts accumulate and sum and count are rendered."""
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "/a")
+    text = "\n".join(histogram.render())
+    assert sample(text, "demo_seconds_bucket", route="/a", le="0.1") == 1
+    assert sample(text, "demo_seconds_bucket", route="/a", le="1.0") == 3
+    assert sample(text, "demo_seconds_bucket", route="/a", le="+Inf") == 4
+    assert sample(text, "demo_seconds_count", route="/a") == 4
+    assert sample(text, "demo_seconds_sum", route="/a") == 6.05
+
+
+def test_label_values_are_escaped():
+    """Test that quotes, backslashes and newlines cannot break the exposition."""
+    counter = Counter("demo_total", "Demo.", ("route",))
+    counter.inc('a"b\\c\nd')
+    assert counter.render()[-1] == 'demo_total{route="a\\"b\\\\c\\nd"} 1'
+
+
+def test_requests_are_labelled_by_route_template():
+    """Test request, query, pool and threadpool metrics after a few requests."""
+    before = sample(client.get("/metrics").text, "http_requests_total", method="GET",
+                    route="/api/v1/courses/{course_id}", status="404") or 0
+    client.get(f"{API_PREFIX}/courses/987654321")
+    client.get(f"{API_PREFIX}/no-such-route")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert sample(text, "http_requests_total", method="GET",
+                  route="/api/v1/courses/{course_id}", status="404") == before + 1
+    assert sample(text, "http_requests_total", method="GET", route="unmatched",
+                  status="404") >= 1
+    assert "/api/v1/courses/987654321" not in text
+    assert sample(text, "http_request_duration_seconds_count", method="GET",
+                  route="/api/v1/courses/{course_id}", status="404") >= 1
+    assert sample(text, "db_queries_total", route="/api/v1/courses/{course_id}") >= 1
+    # The scrape itself is in flight while it renders
+    assert sample(text, "http_requests_in_flight", method="GET") == 1
+    assert sample(text, "threadpool_threads", state="limit") > 0
+    assert sample(text, "db_pool_connections", state="checkedout") is not None
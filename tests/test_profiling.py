@@ -0,0 +1,112 @@
+"""Test cases for the on-demand request profiler and its admin routes."""
+import collections
+import re
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.core.profiling import Profile, ProfileStore, SamplingProfiler
+from app.db.models.user import User, UserRole
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def auth_headers(role=UserRole.USER):
+    """Register a new user with the given role and return authorization headers for them."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+    db = SessionLocal()
+    db.query(User).filter_by(username=username).update({User.role: role})
+    db.commit()
+    db.close()
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "pw"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def spin(seconds):
+    """Keep the CPU busy for a while."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_sees_busy_threads():
+    """Test that stacks of a busy thread are sampled with their function names."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    spin(0.1)
+    samples = profiler.stop()
+    assert any(stack[-1].startswith("spin (test_profiling.py:") for stack in samples)
+    assert all(isinstance(frame, str) for stack in samples for frame in stack)
+
+
+def test_store_keeps_the_newest_profiles_as_files(tmp_path):
+    """Test that the store writes folded files and deletes those it drops."""
+    store = ProfileStore(keep=1, directory=str(tmp_path))
+    samples = collections.Counter({("MainThread", "main (app.py:1)", "work (app.py:9)"): 3})
+    first = Profile("first", "GET", "/a", "/a", 200, 0.01, 0.002, samples)
+    second = Profile("second", "GET", "/b", "/b", 200, 0.01, 0.002, samples)
+    store.add(first)
+    store.add(second)
+    assert [profile.id for profile in store.list()] == ["second"]
+    assert not (tmp_path / "first.folded").exists()
+    assert (tmp_path / "second.folded").read_text() == (
+        "MainThread;main (app.py:1);work (app.py:9) 3\n"
+    )
+    speedscope = second.speedscope()["profiles"][0]
+    assert speedscope["samples"] == [[0, 1, 2]]
+    assert speedscope["weights"] == [6.0]
+
+
+def test_only_admins_can_ask_for_a_profile():
+    """Test that X-Profile from a regular user is ignored and the routes are admin only."""
+    headers = {**auth_headers(), "X-Profile": "1"}
+    resp = client.get(f"{API_PREFIX}/courses/", headers=headers)
+    assert resp.status_code == 200
+    assert "x-profile-id" not in resp.headers
+    assert client.get(f"{API_PREFIX}/admin/profiles", headers=headers).status_code == 403
+
+
+def test_admin_profile_is_stored_and_retrievable():
+    """Test that an admin's profiled request can be listed and fetched in both formats."""
+    headers = auth_headers(UserRole.ADMIN)
+    resp = client.get(f"{API_PREFIX}/courses/", headers={**headers, "X-Profile": "1"})
+    assert resp.status_code == 200
+    profile_id = resp.headers["x-profile-id"]
+
+    listed = client.get(f"{API_PREFIX}/admin/profiles", headers=headers).json()
+    assert listed[0]["id"] == profile_id
+    assert listed[0]["route"] == "/api/v1/courses/"
+    assert listed[0]["status"] == 200
+
+    folded = client.get(f"{API_PREFIX}/admin/profiles/{profile_id}", headers=headers)
+    assert folded.headers["content-type"].startswith("text/plain")
+    assert all(re.fullmatch(r".+ \d+", line) for line in folded.text.splitlines())
+    speedscope = client.get(
+        f"{API_PREFIX}/admin/profiles/{profile_id}?format=speedscope", headers=headers
+    ).json()
+    assert speedscope["profiles"][0]["type"] == "sampled"
+    assert client.get(f"{API_PREFIX}/admin/profiles/missing", headers=headers).status_code == 404
+
+
+def test_speedscope_profile_is_returned_inline():
+    """Test that X-Profile: speedscope replaces the response with the profile."""
+    headers = {**auth_headers(UserRole.ADMIN), "X-Profile": "speedscope"}
+    resp = client.get(f"{API_PREFIX}/categories/", headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    assert body["profiles"][0]["unit"] == "milliseconds"
+    assert resp.headers["x-profile-id"]
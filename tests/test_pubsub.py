@@ -0,0 +1,46 @@
+"""Test cases for the in-process comment pub/sub hub."""
+import asyncio
+
+from app.core.pubsub import DROPPED, Hub
+
+
+def test_hub_delivers_to_topic_subscribers_only():
+    """Test that events reach subscribers of the published topic and no one else."""
+    async def scenario():
+        hub = Hub(max_queue=10)
+        mine = hub.subscribe("course:1")
+        other = hub.subscribe("course:2")
+        hub.publish("course:1", {"type": "created", "comment": {"id": 1}})
+        event = await mine.get(timeout=1)
+        assert event["comment"]["id"] == 1
+        assert other.queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_hub_publish_from_worker_thread():
+    """Test that events published from another thread reach the subscriber's loop."""
+    async def scenario():
+        hub = Hub(max_queue=10)
+        subscription = hub.subscribe("course:1")
+        await asyncio.to_thread(hub.publish, "course:1", {"type": "updated", "comment": {"id": 7}})
+        event = await subscription.get(timeout=1)
+        assert event["type"] == "updated"
+
+    asyncio.run(scenario())
+
+
+def test_hub_drops_slow_consumer():
+    """Test that a subscriber whose queue overflows is dropped and told so."""
+    async def scenario():
+        hub = Hub(max_queue=2)
+        subscription = hub.subscribe("course:1")
+        for i in range(5):
+            hub.publish("course:1", {"type": "created", "comment": {"id": i}})
+        await asyncio.sleep(0)
+        events = [await subscription.get(timeout=1) for _ in range(3)]
+        assert events[-1] is DROPPED
+        assert subscription.dropped
+        assert hub.subscriber_count("course:1") == 0
+
+    asyncio.run(scenario())
@@ -263,3 +263,29 @@ def test_userrole_get_id():
     from app.db.models.user import User
     user = User(id=123, username="testuser")
     assert user.get_id() == 123
+
+
+def test_rating_counters_track_rate_update_and_delete(user_token, course_id):
+    """Test that rating_count and rating_sum follow new, changed and deleted ratings."""
+    resp = client.post(
+        f"{API_PREFIX}/courses/{course_id}/ratings/",
+        json={"value": 2},
+        headers=auth_headers(user_token)
+    )
+    rating_id = resp.json()["id"]
+    course = client.get(f"{API_PREFIX}/courses/{course_id}").json()
+    assert (course["rating_count"], course["rating_sum"]) == (1, 2)
+
+    client.post(
+        f"{API_PREFIX}/courses/{course_id}/ratings/",
+        json={"value": 5},
+        headers=auth_headers(user_token)
+    )
+    course = client.get(f"{API_PREFIX}/courses/{course_id}").json()
+    assert (course["rating_count"], course["rating_sum"]) == (1, 5)
+
+    client.delete(
+        f"{API_PREFIX}/courses/{course_id}/ratings/{rating_id}", headers=auth_headers(user_token)
+    )
+    course = client.get(f"{API_PREFIX}/courses/{course_id}").json()
+    assert (course["rating_count"], course["rating_sum"]) == (0, 0)
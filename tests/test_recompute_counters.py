@@ -0,0 +1,98 @@
+"""Test cases for the course counter repair command."""
+import uuid
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.models.course import Course
+from app.db.session import SessionLocal
+from app.recompute_counters import recompute
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def auth_headers(token):
+    """Generate authorization headers for authenticated requests."""
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_recompute_repairs_drifted_counters():
+    """Test that recompute() restores counters that drifted from the source tables."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "testpass"})
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "testpass"}
+    ).json()["access_token"]
+    course_id = client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": unique_name("Course"), "youtube_url": "https://youtube.com/counters"},
+        headers=auth_headers(token)
+    ).json()["id"]
+    client.post(f"{API_PREFIX}/courses/{course_id}/comments/", json={"content": "Hi"},
+                headers=auth_headers(token))
+    client.post(f"{API_PREFIX}/courses/{course_id}/ratings/", json={"value": 4},
+                headers=auth_headers(token))
+
+    db = SessionLocal()
+    try:
+        db.query(Course).filter(Course.id == course_id).update(
+            {Course.comment_count: 9, Course.rating_count: 9, Course.rating_sum: 9}
+        )
+        db.commit()
+        assert recompute(db) >= 1
+        course = db.query(Course).filter(Course.id == course_id).first()
+        assert (course.comment_count, course.rating_count, course.rating_sum) == (1, 1, 4)
+    finally:
+        db.close()
+
+
+def test_counters_do_not_touch_updated_at():
+    """Test that comments, ratings and recompute() leave a course's updated_at alone."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "testpass"})
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "testpass"}
+    ).json()["access_token"]
+    course_id, idle_id = (
+        client.post(
+            f"{API_PREFIX}/courses/",
+            json={"title": unique_name("Course"), "youtube_url": "https://youtube.com/touch"},
+            headers=auth_headers(token)
+        ).json()["id"]
+        for _ in range(2)
+    )
+    edited = datetime(2020, 1, 1, 12, 0, 0)
+    db = SessionLocal()
+    try:
+        db.query(Course).filter(Course.id.in_([course_id, idle_id])).update(
+            {Course.updated_at: edited}, synchronize_session=False
+        )
+        # A drifted counter on a course without any activity
+        db.query(Course).filter(Course.id == idle_id).update(
+            {Course.comment_count: 3, Course.updated_at: edited}, synchronize_session=False
+        )
+        db.commit()
+
+        client.post(f"{API_PREFIX}/courses/{course_id}/comments/", json={"content": "Hi"},
+                    headers=auth_headers(token))
+        client.post(f"{API_PREFIX}/courses/{course_id}/ratings/", json={"value": 5},
+                    headers=auth_headers(token))
+        recompute(db)
+        db.expire_all()
+
+        course = db.query(Course).filter(Course.id == course_id).first()
+        idle = db.query(Course).filter(Course.id == idle_id).first()
+        assert (course.comment_count, course.rating_count, course.rating_sum) == (1, 1, 5)
+        assert idle.comment_count == 0
+        assert course.updated_at == edited
+        assert idle.updated_at == edited
+    finally:
+        db.close()
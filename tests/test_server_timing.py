@@ -0,0 +1,70 @@
+"""Test cases for the Server-Timing header and the debug query log."""
+import logging
+import re
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.timing import operation_tracer_provider
+from app.main import app
+from app.middleware.server_timing import ServerTimingMiddleware
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def auth_headers():
+    """Register a new user and return authorization headers for them."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "pw"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def metrics(resp):
+    """Parse a response's Server-Timing header into {name: (milliseconds, description)}."""
+    parsed = {}
+    for entry in resp.headers["server-timing"].split(", "):
+        match = re.fullmatch(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', entry)
+        assert match, entry
+        parsed[match.group(1)] = (float(match.group(2)), match.group(3))
+    return parsed
+
+
+def test_authenticated_request_reports_every_phase():
+    """Test that auth, queries and response-model serialization are all timed."""
+    resp = client.get(f"{API_PREFIX}/users/me", headers=auth_headers())
+    assert resp.status_code == 200
+    timings = metrics(resp)
+    assert list(timings) == ["auth", "db", "serialize", "total"]
+    assert timings["db"][1] == "1 queries"
+    assert timings["total"][0] >= timings["auth"][0] + timings["db"][0]
+
+
+def test_cached_response_reports_no_database_time():
+    """Test that a cache hit shows neither queries nor serialization."""
+    client.get(f"{API_PREFIX}/categories/")
+    resp = client.get(f"{API_PREFIX}/categories/")
+    assert resp.headers["x-cache"] == "hit"
+    assert list(metrics(resp)) == ["total"]
+
+
+def test_query_log_lists_each_statement(caplog):
+    """Test that with the query log on, a request's statements are logged once it ends."""
+    logged = FastAPI(telemetry={"tracer_provider": operation_tracer_provider})
+    logged.add_middleware(ServerTimingMiddleware, log_queries=True)
+    logged.router.routes.extend(app.router.routes)
+    with caplog.at_level(logging.INFO, logger="app.core.timing"):
+        TestClient(logged).get(f"{API_PREFIX}/courses/987654321")
+    record = caplog.records[-1].getMessage()
+    assert record.startswith(f"GET {API_PREFIX}/courses/987654321: 1 queries in ")
+    assert "SELECT" in record
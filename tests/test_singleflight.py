@@ -0,0 +1,103 @@
+"""Test cases for request coalescing and its admin stats."""
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from app.core.singleflight import SingleFlight, flight_group
+from app.db.models.user import User, UserRole
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def auth_headers(role=UserRole.USER):
+    """Register a new user with the given role and return authorization headers for them."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+    db = SessionLocal()
+    db.query(User).filter_by(username=username).update({User.role: role})
+    db.commit()
+    db.close()
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "pw"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _run_concurrently(group, key, function, callers=8):
+    """Call group.do from several threads at once and return each result or exception."""
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        futures = [pool.submit(group.do, key, function) for _ in range(callers)]
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test that callers arriving while a call is in flight get its result without running it."""
+    group = SingleFlight("test")
+    release = threading.Event()
+    runs = []
+
+    def query():
+        runs.append(1)
+        release.wait(timeout=5)
+        return {"id": 1}
+
+    def release_when_all_waiting():
+        while group.stats()["coalesced"] < 7:
+            threading.Event().wait(0.01)
+        release.set()
+
+    threading.Thread(target=release_when_all_waiting).start()
+    results = _run_concurrently(group, "course:1", query)
+    assert runs == [1]
+    assert all(result is results[0] for result in results)
+    assert group.stats() == {
+        "name": "test", "enabled": True, "executed": 1, "coalesced": 7, "in_flight": 0
+    }
+
+    # Once the call has returned nothing is remembered
+    assert group.do("course:1", lambda: "fresh") == "fresh"
+
+
+def test_errors_are_shared_and_disabled_groups_run_every_call():
+    """Test that followers see the leader's exception and a disabled group never coalesces."""
+    group = SingleFlight("test")
+    release = threading.Event()
+
+    def missing():
+        release.wait(timeout=5)
+        raise LookupError("missing")
+
+    threading.Timer(0.2, release.set).start()
+    results = _run_concurrently(group, "course:404", missing, callers=4)
+    assert all(isinstance(result, LookupError) for result in results)
+    assert group.stats()["in_flight"] == 0
+
+    disabled = SingleFlight("off", enabled=False)
+    assert [disabled.do("key", lambda: 1) for _ in range(3)] == [1, 1, 1]
+    assert disabled.stats()["executed"] == 0
+
+
+def test_routes_are_configurable_and_reported_to_admins():
+    """Test that the configured routes coalesce and the stats are admin only."""
+    assert flight_group("get_course").enabled
+    assert flight_group("list_comments").enabled
+
+    resp = client.get(f"{API_PREFIX}/admin/coalescing", headers=auth_headers())
+    assert resp.status_code == 403
+
+    client.get(f"{API_PREFIX}/courses/0")
+    resp = client.get(f"{API_PREFIX}/admin/coalescing", headers=auth_headers(UserRole.ADMIN))
+    assert resp.status_code == 200
+    stats = {group["name"]: group for group in resp.json()}
+    assert stats["get_course"]["executed"] >= 1
@@ -0,0 +1,101 @@
+"""Test cases for the slow query log and its admin view."""
+import logging
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.slow_queries import SlowQueryLog, fingerprint, normalize, slow_query_log
+from app.db.models.user import User, UserRole
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def auth_headers(role=UserRole.USER):
+    """Register a new user with the given role and return authorization headers for them."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+    db = SessionLocal()
+    db.query(User).filter_by(username=username).update({User.role: role})
+    db.commit()
+    db.close()
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "pw"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_fingerprint_ignores_values_and_list_lengths():
+    """Test that literals, placeholder styles and IN-list lengths share a fingerprint."""
+    assert normalize("SELECT * FROM courses WHERE id IN (?, ?, ?) AND title = 'a''b'") == (
+        "SELECT * FROM courses WHERE id IN (...) AND title = ?"
+    )
+    assert fingerprint(normalize("SELECT x FROM t WHERE id IN (%(id_1)s, %(id_2)s) LIMIT 10")) \
+        == fingerprint(normalize("SELECT x FROM t WHERE id IN (?)  LIMIT 5"))
+    assert normalize("SELECT CAST(x AS TEXT)::TEXT FROM t WHERE y = :y") == (
+        "SELECT CAST(x AS TEXT)::TEXT FROM t WHERE y = ?"
+    )
+
+
+def test_slow_statements_are_grouped_and_explained(caplog):
+    """Test that statements over the threshold are logged once per call and planned once."""
+    engine = create_engine(settings.database_url)
+    log = SlowQueryLog(threshold_ms=0, top_k=10)
+    log.instrument(engine)
+    with caplog.at_level(logging.WARNING, logger="app.core.slow_queries"):
+        with engine.connect() as conn:
+            for course_id in (1, 2, 3):
+                conn.execute(text("SELECT title FROM courses WHERE id = :id"), {"id": course_id})
+        log.drain()
+    engine.dispose()
+
+    entries = [entry for entry in log.top() if "FROM courses" in entry["statement"]]
+    assert len(entries) == 1
+    entry = entries[0]
+    assert entry["statement"] == "SELECT title FROM courses WHERE id = ?"
+    assert entry["calls"] == 3
+    assert entry["routes"] == ["none"]
+    assert entry["plan"]
+    assert "courses" in entry["plan"].lower()
+    slow = [record for record in caplog.records if "FROM courses" in record.getMessage()]
+    assert len(slow) == 3
+    assert "Plan:" in slow[0].getMessage()
+
+
+def test_table_keeps_the_top_k_by_total_time():
+    """Test that the fingerprint with the least total time is dropped first."""
+    log = SlowQueryLog(threshold_ms=0, top_k=2)
+    log.record("SELECT 1 FROM a", (), 0.3, "/a")
+    log.record("SELECT 1 FROM b", (), 0.1, "/b")
+    log.record("SELECT 1 FROM c", (), 0.2, "/c")
+    log.drain()
+    assert [entry["statement"] for entry in log.top()] == [
+        "SELECT ? FROM a", "SELECT ? FROM c",
+    ]
+
+
+def test_admins_see_the_slow_query_table():
+    """Test that the table is served to admins only and can be cleared."""
+    slow_query_log.record("SELECT id FROM categories WHERE name = ?", ("x",), 0.5, "/test")
+    slow_query_log.drain()
+    assert client.get(f"{API_PREFIX}/admin/slow-queries", headers=auth_headers()).status_code \
+        == 403
+
+    headers = auth_headers(UserRole.ADMIN)
+    entries = client.get(f"{API_PREFIX}/admin/slow-queries", headers=headers).json()
+    entry = next(e for e in entries if e["statement"] == "SELECT id FROM categories WHERE name = ?")
+    assert entry["routes"] == ["/test"]
+    assert entry["parameters"] == "('x',)"
+
+    assert client.delete(f"{API_PREFIX}/admin/slow-queries", headers=headers).status_code == 200
+    assert client.get(f"{API_PREFIX}/admin/slow-queries", headers=headers).json() == []
@@ -0,0 +1,138 @@
+"""Test cases for request tracing and its exporters."""
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import FileExporter, MemoryExporter, Tracer, instrument_engine
+from app.db.models.user import User, UserRole
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+pytestmark = pytest.mark.skipif(settings.trace_exporter != "memory",
+                                reason="needs TRACE_EXPORTER=memory")
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def auth_headers(role=UserRole.USER):
+    """Register a new user with the given role and return authorization headers for them."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+    db = SessionLocal()
+    db.query(User).filter_by(username=username).update({User.role: role})
+    db.commit()
+    db.close()
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "pw"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def traceparent(sampled=True):
+    """Return a new trace id and a traceparent header continuing it from a remote span."""
+    trace_id, parent_id = uuid.uuid4().hex, uuid.uuid4().hex[:16]
+    return trace_id, parent_id, f"00-{trace_id}-{parent_id}-{'01' if sampled else '00'}"
+
+
+def test_request_continues_an_incoming_trace():
+    """Test that a sampled traceparent gets request, dependency, SQL and serialization spans."""
+    headers = auth_headers()
+    trace_id, parent_id, header = traceparent()
+    response = client.get(f"{API_PREFIX}/users/me", headers={**headers, "traceparent": header})
+    assert response.status_code == 200
+
+    spans = tracing.exporter.spans(trace_id)
+    by_id = {span["span_id"]: span for span in spans}
+    names = [span["name"] for span in spans]
+    server = next(span for span in spans if span["kind"] == "SERVER")
+    assert server["name"] == "GET /api/v1/users/me"
+    assert server["parent_id"] == parent_id
+    assert server["attributes"]["http.response.status_code"] == 200
+    for name in ("fastapi.dependencies", "get_db", "get_current_user", "fastapi.endpoint",
+                 "fastapi.serialization", "SELECT"):
+        assert name in names
+    user_span = next(span for span in spans if span["name"] == "get_current_user")
+    assert user_span["attributes"]["enduser.id"]
+    query = next(span for span in spans if span["name"] == "SELECT")
+    assert query["kind"] == "CLIENT"
+    assert "users" in query["attributes"]["db.query.text"]
+    # Every span hangs off the request's span
+    for span in spans:
+        ancestor = span
+        while ancestor["parent_id"] in by_id:
+            ancestor = by_id[ancestor["parent_id"]]
+        assert ancestor is server
+
+
+def test_unsampled_traceparent_records_nothing():
+    """Test that a request whose traceparent is not sampled leaves no spans."""
+    trace_id, _, header = traceparent(sampled=False)
+    assert client.get(f"{API_PREFIX}/categories/", headers={"traceparent": header}) \
+        .status_code == 200
+    assert tracing.exporter.spans(trace_id) == []
+
+
+def test_admins_read_traces():
+    """Test that admins can fetch a recorded trace, and that unknown ones are not found."""
+    trace_id, _, header = traceparent()
+    client.get(f"{API_PREFIX}/categories/", headers={"traceparent": header})
+    assert client.get(f"{API_PREFIX}/admin/traces/{trace_id}", headers=auth_headers()) \
+        .status_code == 403
+
+    headers = auth_headers(UserRole.ADMIN)
+    spans = client.get(f"{API_PREFIX}/admin/traces/{trace_id}", headers=headers).json()
+    assert {span["trace_id"] for span in spans} == {trace_id}
+    assert "GET /api/v1/categories/" in [span["name"] for span in spans]
+    missing = client.get(f"{API_PREFIX}/admin/traces/{uuid.uuid4().hex}", headers=headers)
+    assert missing.status_code == 404
+
+
+def test_statement_spans_and_file_export(tmp_path):
+    """Test statement spans, a failing one marked as an error, written to a JSON Lines file."""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(FileExporter(str(path)), sample_rate=1.0)
+    engine = create_engine(settings.database_url)
+    instrument_engine(engine, tracer)
+    with tracer.start_as_current_span("job"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with pytest.raises((OperationalError, ProgrammingError)):
+                conn.execute(text("SELECT * FROM no_such_table"))
+    engine.dispose()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    job = spans[-1]
+    assert job["name"] == "job"
+    assert job["parent_id"] is None
+    statements = [span for span in spans if span["name"] == "SELECT"]
+    assert [span["status"] for span in statements] == ["UNSET", "ERROR"]
+    assert all(span["parent_id"] == job["span_id"] for span in statements)
+    assert statements[1]["events"][0]["name"] == "exception"
+
+
+def test_sample_rate_decides_for_new_traces():
+    """Test that traces without a parent start at the sample rate and children follow."""
+    exporter = MemoryExporter()
+    with Tracer(exporter, sample_rate=0.0).start_as_current_span("skipped"):
+        pass
+    assert exporter.spans() == []
+    tracer = Tracer(exporter, sample_rate=1.0)
+    with tracer.start_as_current_span("parent"):
+        with tracer.start_as_current_span("child"):
+            pass
+    child, parent = exporter.spans()
+    assert child["parent_id"] == parent["span_id"]
+    assert child["trace_id"] == parent["trace_id"]
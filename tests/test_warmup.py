@@ -0,0 +1,63 @@
+"""Test cases for startup cache warming."""
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.api.warmup import top_course_ids, warm
+from app.core.cache import response_cache
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+API_PREFIX = "/api/v1"
+
+
+def unique_name(prefix):
+    """Generate a unique name with a given prefix for testing purposes."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def auth_headers():
+    """Register a new user and return authorization headers for them."""
+    username = unique_name("user")
+    client.post(f"{API_PREFIX}/auth/register", json={"username": username, "password": "pw"})
+    token = client.post(
+        f"{API_PREFIX}/auth/login", json={"username": username, "password": "pw"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_warm_fills_the_cache_with_the_most_engaged_courses():
+    """Test that warming caches the category list, first page and top courses."""
+    headers = auth_headers()
+    title = unique_name("Hot")
+    course = client.post(
+        f"{API_PREFIX}/courses/",
+        json={"title": title, "youtube_url": f"https://youtube.com/{title}"},
+        headers=headers,
+    ).json()
+    for index in range(3):
+        client.post(f"{API_PREFIX}/courses/{course['id']}/comments/",
+                    json={"content": f"comment {index}"}, headers=headers)
+    db = SessionLocal()
+    try:
+        assert course["id"] in top_course_ids(db, 1000)
+    finally:
+        db.close()
+
+    response_cache.clear()
+    warmed = warm(top_courses=1000, connections=2)
+    assert warmed["connections"] == 2
+    assert warmed["courses"] >= 1
+
+    for path in (f"/courses/{course['id']}", f"/courses/{course['id']}/comments/",
+                 f"/courses/{course['id']}/ratings/", "/categories/", "/courses/"):
+        assert client.get(f"{API_PREFIX}{path}").headers["x-cache"] == "hit", path
+
+
+def test_lifespan_warms_before_serving():
+    """Test that the application starts, warmed, and serves from the cache."""
+    response_cache.clear()
+    with TestClient(app) as started:
+        assert started.get(f"{API_PREFIX}/categories/").headers["x-cache"] == "hit"